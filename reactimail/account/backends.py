@@ -0,0 +1,52 @@
+"""The authentication backend, with the logged in user cached.
+
+`AuthenticationMiddleware` loads the user of the session on every request.
+Here it is cached for `AUTH_USER_CACHE_TIMEOUT` seconds, so an authenticated
+page only runs its own queries. Saving or deleting a user drops its cache
+entry (see `account.signals`), so a password change still logs out the other
+sessions (their session hash no longer matches) and a deactivated account is
+rejected right away. Bulk `update()`s don't: their users are stale until the
+entry expires.
+
+Like sessions (see `reactimail.sessions`), cache errors are logged and fall
+back to the database, so requests and user saves keep working while Redis is
+unavailable. An entry that could not be dropped then stays until it expires.
+"""
+
+import logging
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+def user_cache_key(user_id) -> str:
+    return f"account:user:{user_id}"
+
+
+def _cache_call(method: str, *args):
+    try:
+        return getattr(cache, method)(*args)
+    except Exception:
+        logger.exception("Error using the cache (%s)", cache)
+        return None
+
+
+def invalidate_cached_user(user_id) -> None:
+    _cache_call("delete", user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        timeout = settings.AUTH_USER_CACHE_TIMEOUT
+        if not timeout:
+            return super().get_user(user_id)
+        user = _cache_call("get", user_cache_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            _cache_call("set", user_cache_key(user_id), user, timeout)
+        return user if self.user_can_authenticate(user) else None
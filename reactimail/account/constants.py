@@ -1,5 +1,8 @@
 LOGIN_MAX_TIMES_PER_MINUTE = 5
 """Number of login attempts per minute."""
 
+LOGIN_RATELIMIT_GROUP = "account.login"
+"""The rate limit counter shared by the login views."""
+
 SESSION_EXPIRE_SECONDS = 60 * 60
 """The seconds until session timeout."""
@@ -2,6 +2,10 @@
 from django import forms
 from django.contrib.auth import authenticate
 
+from .hashing import aauthenticate
+
+INVALID_LOGIN = "Email or password is incorrect."
+
 
 class EmailLoginForm(forms.Form):
     email = forms.EmailField(
@@ -24,10 +28,33 @@ class EmailLoginForm(forms.Form):
         user = authenticate(email=email, password=password)
 
         if not user:
-            raise forms.ValidationError("Email or password is incorrect.")
+            raise forms.ValidationError(INVALID_LOGIN)
 
         self.user = user
         return self.cleaned_data
 
     def get_user(self):
         return self.user
+
+
+class AsyncEmailLoginForm(EmailLoginForm):
+    """EmailLoginForm for async views: validate it with `ais_valid()`.
+
+    The password is checked by `aauthenticate()`, in the login hashing threads.
+    """
+
+    def clean(self):
+        return self.cleaned_data
+
+    async def ais_valid(self, request) -> bool:
+        """Validate the fields, then the credentials. Raises HashingBusy."""
+        self.user = None
+        # Like authenticate(), incomplete credentials are not hashed.
+        if self.is_valid():
+            self.user = await aauthenticate(
+                request, self.cleaned_data["email"], self.cleaned_data["password"]
+            )
+        if self.user is None:
+            self.add_error(None, INVALID_LOGIN)
+            return False
+        return True
@@ -0,0 +1,164 @@
+"""Password checks of logins, in a bounded pool of hashing threads.
+
+Password hashers are deliberately slow: a PBKDF2 check is tens of
+milliseconds of CPU. `hashlib` releases the GIL while hashing, so threads do
+hash in parallel, but under ASGI a sync view gets a thread per request: a
+login spike then hashes in as many threads as there are logins, and takes the
+CPU from every other request of the process.
+
+Here the checks run in `LOGIN_HASHING_WORKERS` threads per process. At most
+`LOGIN_HASHING_MAX_QUEUE` checks wait for a thread, further ones raise
+`HashingBusy` right away instead of queueing for seconds.
+`login_hashing_stats()` answers the queue depth and counters.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model, user_login_failed
+from django.contrib.auth.hashers import (
+    UNUSABLE_PASSWORD_PREFIX,
+    make_password,
+    verify_password,
+)
+from django.db import connection
+
+from .backends import CachedModelBackend
+
+BACKEND = f"{CachedModelBackend.__module__}.{CachedModelBackend.__qualname__}"
+"""The backend path `alogin()` saves in the session."""
+
+
+class HashingBusy(Exception):
+    """Too many password checks already wait for a hashing thread."""
+
+
+class BoundedHashingExecutor:
+    """A thread pool whose queue of waiting calls is bounded and measured."""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix="login-hashing"
+        )
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, func: Callable, *args):
+        """Await `func(*args)`, run in a hashing thread.
+
+        Raises HashingBusy if `max_queue` calls already wait for a thread.
+        """
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise HashingBusy
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        future = self._executor.submit(self._call, func, args)
+        future.add_done_callback(self._forget_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _call(self, func: Callable, args: tuple):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def _forget_cancelled(self, future: Future) -> None:
+        # A call cancelled while queued (e.g. the client left) never started.
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "max_queued": self.max_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+_login_hashing: BoundedHashingExecutor | None = None
+_login_hashing_lock = threading.Lock()
+
+
+def login_hashing() -> BoundedHashingExecutor:
+    """The hashing threads of this process, started on first use."""
+    global _login_hashing
+    with _login_hashing_lock:
+        if _login_hashing is None:
+            _login_hashing = BoundedHashingExecutor(
+                settings.LOGIN_HASHING_WORKERS, settings.LOGIN_HASHING_MAX_QUEUE
+            )
+        return _login_hashing
+
+
+def login_hashing_stats() -> dict[str, int]:
+    """The hashing threads of this process and their queue.
+
+    `queued` is the number of password checks waiting for a thread (the queue
+    depth), `running` the ones hashing. `max_queued` and the counters are
+    since the process started.
+    """
+    return login_hashing().stats()
+
+
+def _get_user(email: str):
+    User = get_user_model()
+    try:
+        return User._default_manager.get_by_natural_key(email)
+    except User.DoesNotExist:
+        return None
+    finally:
+        # Give the connection back to the pool rather than holding it while
+        # waiting for a hashing thread: a spike of logins would take them all.
+        if connection.pool is not None and not connection.in_atomic_block:
+            connection.close()
+
+
+async def aauthenticate(request, email: str, password: str):
+    """`authenticate()` of `CachedModelBackend`, hashing in the hashing threads.
+
+    As with the backend, a missing account is hashed too, so it can't be
+    told from a wrong password by the response time. An outdated hash is
+    upgraded. Answers the user, or None.
+
+    Raises HashingBusy.
+    """
+    user = await sync_to_async(_get_user)(email)
+    # verify_password() hashes once for an unusable password too.
+    encoded = user.password if user is not None else UNUSABLE_PASSWORD_PREFIX
+    is_correct, must_update = await login_hashing().run(
+        verify_password, password, encoded
+    )
+    backend = CachedModelBackend()
+    if user is None or not is_correct or not backend.user_can_authenticate(user):
+        await user_login_failed.asend(
+            sender=__name__, credentials={"email": email}, request=request
+        )
+        return None
+    if must_update:
+        user.password = await login_hashing().run(make_password, password)
+        await user.asave(update_fields=["password"])
+    user.backend = BACKEND
+    return user
@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account.provisioning import provision_accounts
+
+
+class Command(BaseCommand):
+    help = (
+        "Create accounts from a CSV file with an email column, and optional "
+        "nickname and password columns. Accounts without a password get an "
+        "unusable one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="The CSV file of accounts")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="The processes hashing passwords (default: 1, in this process)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        with Path(options["input"]).open(newline="", encoding="utf-8") as src:
+            try:
+                stats = provision_accounts(
+                    src, workers=options["workers"], chunk_size=options["chunk_size"]
+                )
+            except ValueError as e:
+                raise CommandError(str(e)) from e
+
+        for error in stats.errors:
+            self.stderr.write(json.dumps(error, ensure_ascii=False))
+        self.stderr.write(
+            f"Created {stats.created} of {stats.rows} accounts "
+            f"({stats.skipped} already used, {stats.failed} failed) "
+            f"in {stats.seconds:.2f}s ({stats.rows_per_second:.0f} rows/sec)"
+        )
@@ -0,0 +1,167 @@
+"""Bulk provisioning of accounts from a CSV of emails.
+
+The CSV has an `email` column, and optionally `nickname` and `password`
+columns. Rows are processed in chunks:
+
+- Emails are normalized like `create_user()` does, and validated.
+- Emails already used, by an account or an earlier row, are skipped. Accounts
+  are looked up with one query per chunk.
+- Passwords are hashed in a process pool, as hashing is deliberately slow.
+  Rows without a password get an unusable one, which costs no hashing (the
+  account sets its password with a reset).
+- Missing nicknames are random ones, from a preloaded word list.
+- Accounts are saved with `bulk_create()`.
+"""
+
+import csv
+import secrets
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from itertools import islice
+from time import perf_counter
+from typing import IO, Iterator, Mapping
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import (
+    UNUSABLE_PASSWORD_PREFIX,
+    UNUSABLE_PASSWORD_SUFFIX_LENGTH,
+    make_password,
+)
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+from reactimail.models import generate_random_nickname
+from reactimail.workers import django_process_pool
+
+MAX_REPORTED_ERRORS = 100
+
+
+@dataclass(frozen=True)
+class AccountRow:
+    email: str
+    nickname: str
+    password: str | None
+
+
+@dataclass
+class ProvisionStats:
+    rows: int = 0
+    created: int = 0
+    skipped: int = 0
+    """Rows whose email is already used."""
+    failed: int = 0
+    seconds: float = 0.0
+    errors: list[dict] = field(default_factory=list)
+    """The first `MAX_REPORTED_ERRORS` errors, as `{"line": n, "error": ...}`."""
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def parse_row(row: Mapping[str, str | None]) -> AccountRow:
+    """Validate one row, like `ReactiMailUserManager.create_user()` does.
+
+    Raises ValueError with the reason if the row is invalid.
+    """
+    User = get_user_model()
+    email = User.objects.normalize_email((row.get("email") or "").strip())
+    if not email:
+        raise ValueError("The email is required.")
+    try:
+        validate_email(email)
+    except ValidationError as e:
+        raise ValueError(f"Invalid email: {email}") from e
+    if len(email) > User._meta.get_field("email").max_length:
+        raise ValueError("The email is too long.")
+    nickname = (row.get("nickname") or "").strip() or generate_random_nickname()
+    if len(nickname) > User._meta.get_field("nickname").max_length:
+        raise ValueError("The nickname is too long.")
+    return AccountRow(email, nickname, row.get("password") or None)
+
+
+def _hash_passwords(chunk: list[AccountRow], executor: Executor | None) -> list[str]:
+    passwords = [row.password for row in chunk if row.password]
+    hashed: Iterator[str]
+    if executor is None:
+        hashed = map(make_password, passwords)
+    else:
+        hashed = executor.map(make_password, passwords, chunksize=16)
+    return [next(hashed) if row.password else _unusable_password() for row in chunk]
+
+
+def _unusable_password() -> str:
+    # What make_password(None) answers, without its slow per-character choice.
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_hex(
+        UNUSABLE_PASSWORD_SUFFIX_LENGTH // 2
+    )
+
+
+def _provision_chunk(
+    chunk: list[AccountRow], executor: Executor | None, stats: ProvisionStats
+) -> None:
+    User = get_user_model()
+    existing = set(
+        User.objects.filter(email__in=[row.email for row in chunk]).values_list(
+            "email", flat=True
+        )
+    )
+    new = [row for row in chunk if row.email not in existing]
+    stats.skipped += len(chunk) - len(new)
+    if not new:
+        return
+    passwords = _hash_passwords(new, executor)
+    with transaction.atomic():
+        User.objects.bulk_create(
+            User(email=row.email, nickname=row.nickname, password=password)
+            for row, password in zip(new, passwords)
+        )
+    stats.created += len(new)
+
+
+def provision_accounts(
+    source: IO[str], workers: int = 1, chunk_size: int = 5_000
+) -> ProvisionStats:
+    """Create an account for every valid row of the CSV `source`.
+
+    Each chunk is committed on its own. Invalid rows are skipped and reported
+    in the returned stats, and so are used emails (in `skipped`).
+
+    Example:
+        with open("accounts.csv", newline="") as src:
+            stats = provision_accounts(src, workers=8)
+    """
+    stats = ProvisionStats()
+    started = perf_counter()
+    reader = csv.DictReader(source)
+    if reader.fieldnames is None or "email" not in reader.fieldnames:
+        raise ValueError("The CSV must have an email column.")
+    seen: set[str] = set()
+    numbered = enumerate(reader, start=2)
+
+    executor = django_process_pool(workers) if workers > 1 else None
+    try:
+        while rows := list(islice(numbered, chunk_size)):
+            chunk = []
+            for line, row in rows:
+                stats.rows += 1
+                try:
+                    account = parse_row(row)
+                except ValueError as e:
+                    stats.failed += 1
+                    if len(stats.errors) < MAX_REPORTED_ERRORS:
+                        stats.errors.append({"line": line, "error": str(e)})
+                    continue
+                if account.email in seen:
+                    stats.skipped += 1
+                    continue
+                seen.add(account.email)
+                chunk.append(account)
+            if chunk:
+                _provision_chunk(chunk, executor, stats)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    stats.seconds = perf_counter() - started
+    return stats
@@ -0,0 +1,15 @@
+from functools import partial
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidate_cached_user
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_cached_user(instance.pk)
+    # Again once committed, should a request have cached the old row meanwhile.
+    transaction.on_commit(partial(invalidate_cached_user, instance.pk))
@@ -0,0 +1,80 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from account.backends import CachedModelBackend, user_cache_key
+from .factories import AccountFactory
+
+
+@pytest.mark.django_db
+class TestCachedModelBackend:
+    def test_cached(self, django_assert_num_queries):
+        account = AccountFactory()
+        backend = CachedModelBackend()
+        backend.get_user(account.pk)
+
+        with django_assert_num_queries(0):
+            assert backend.get_user(account.pk) == account
+
+    def test_save_invalidates(self):
+        account = AccountFactory(nickname="before")
+        backend = CachedModelBackend()
+        backend.get_user(account.pk)
+
+        account.nickname = "after"
+        account.save()
+
+        assert cache.get(user_cache_key(account.pk)) is None
+        assert backend.get_user(account.pk).nickname == "after"
+
+    def test_deactivated(self):
+        account = AccountFactory()
+        backend = CachedModelBackend()
+        backend.get_user(account.pk)
+
+        account.is_active = False
+        account.save()
+
+        assert backend.get_user(account.pk) is None
+
+    def test_disabled(self, settings, django_assert_num_queries):
+        settings.AUTH_USER_CACHE_TIMEOUT = 0
+        account = AccountFactory()
+        backend = CachedModelBackend()
+        backend.get_user(account.pk)
+
+        with django_assert_num_queries(1):
+            backend.get_user(account.pk)
+
+    def test_cache_error_falls_back_to_database(self):
+        """Should load the user, and save it, while the cache fails."""
+        account = AccountFactory()
+        backend = CachedModelBackend()
+
+        with mock.patch.multiple(
+            cache,
+            get=mock.Mock(side_effect=ConnectionError),
+            set=mock.Mock(side_effect=ConnectionError),
+            delete=mock.Mock(side_effect=ConnectionError),
+        ):
+            assert backend.get_user(account.pk) == account
+            account.nickname = "after"
+            account.save()
+
+        account.refresh_from_db()
+        assert account.nickname == "after"
+
+    def test_password_change_logs_out_other_sessions(self, client):
+        """Should not keep a session alive with the cached user's old password."""
+        account = AccountFactory()
+        client.force_login(account)
+        assert client.get(reverse("tag:list")).status_code == 200
+
+        account.set_password("newpassword")
+        account.save()
+        response = client.get(reverse("tag:list"))
+
+        assert response.status_code == 302
+        assert "_auth_user_id" not in client.session
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+from unittest import mock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.urls import reverse
+
+from account.hashing import BoundedHashingExecutor, HashingBusy, aauthenticate
+from account.views import AsyncEmailLoginView
+from .factories import AccountFactory
+
+
+class TestBoundedHashingExecutor:
+    def test_run(self):
+        executor = BoundedHashingExecutor(max_workers=1, max_queue=1)
+
+        assert async_to_sync(executor.run)(pow, 2, 10) == 1024
+        assert executor.stats() == {
+            "workers": 1,
+            "max_queue": 1,
+            "queued": 0,
+            "running": 0,
+            "max_queued": 1,
+            "completed": 1,
+            "rejected": 0,
+        }
+
+    def test_full_queue(self):
+        """Should be rejected while `max_queue` calls wait for a thread."""
+        executor = BoundedHashingExecutor(max_workers=1, max_queue=1)
+        started, release = threading.Event(), threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        async def run():
+            running = executor._executor.submit(block)
+            started.wait(5)
+            waiting = asyncio.ensure_future(executor.run(pow, 2, 10))
+            await asyncio.sleep(0)
+            with pytest.raises(HashingBusy):
+                await executor.run(pow, 2, 10)
+            stats = executor.stats()
+            release.set()
+            running.result()
+            return await waiting, stats
+
+        result, stats = async_to_sync(run)()
+
+        assert result == 1024
+        assert stats["queued"] == 1
+        assert stats["rejected"] == 1
+        assert executor.stats()["queued"] == 0
+
+
+@pytest.mark.django_db
+class TestAuthenticate:
+    def authenticate(self, email, password):
+        return async_to_sync(aauthenticate)(None, email, password)
+
+    def test_success(self):
+        account = AccountFactory(email="testuser@example.com", password="testpassword")
+
+        user = self.authenticate("testuser@example.com", "testpassword")
+
+        assert user == account
+        assert user.backend == "account.backends.CachedModelBackend"
+
+    def test_missing_account_is_hashed(self):
+        """Should take a hash like a wrong password, not to leak accounts."""
+        with mock.patch(
+            "account.hashing.verify_password", return_value=(False, False)
+        ) as verify_password:
+            assert self.authenticate("missing@example.com", "testpassword") is None
+
+        verify_password.assert_called_once()
+
+    def test_inactive(self):
+        AccountFactory(
+            email="testuser@example.com", password="testpassword", is_active=False
+        )
+
+        assert self.authenticate("testuser@example.com", "testpassword") is None
+
+    def test_outdated_hash(self, settings):
+        """Should upgrade a hash of another hasher."""
+        settings.PASSWORD_HASHERS = [
+            "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+            "django.contrib.auth.hashers.MD5PasswordHasher",
+        ]
+        account = AccountFactory(email="testuser@example.com")
+        account.password = make_password("testpassword", hasher="md5")
+        account.save()
+
+        assert self.authenticate("testuser@example.com", "testpassword") == account
+
+        account.refresh_from_db()
+        assert account.password.startswith("pbkdf2_sha256$")
+        assert check_password("testpassword", account.password)
+
+
+@pytest.mark.django_db
+class TestAsyncLogin:
+    def test_view_is_async(self):
+        assert AsyncEmailLoginView.view_is_async
+
+    def test_busy(self, client):
+        """Should be answered 503 while too many logins wait for hashing."""
+        AccountFactory(email="testuser@example.com", password="testpassword")
+        cache.clear()  # reset ratelimit.
+
+        with mock.patch.object(BoundedHashingExecutor, "run", side_effect=HashingBusy):
+            response = client.post(
+                reverse("account:login"),
+                {"email": "testuser@example.com", "password": "testpassword"},
+            )
+
+        assert response.status_code == 503
+        assert response["Retry-After"] == "1"
+        assert "Too many logins" in response.content.decode()
+        assert "_auth_user_id" not in client.session
+
+    def test_metrics(self, client):
+        client.force_login(AccountFactory(is_staff=True))
+
+        response = client.get(reverse("login_hashing_metrics"))
+
+        assert response.status_code == 200
+        assert {"queued", "running", "rejected"} <= response.json().keys()
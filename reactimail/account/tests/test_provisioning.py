@@ -0,0 +1,97 @@
+import re
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from account.models import ReactiMailUser
+from account.provisioning import parse_row, provision_accounts
+from reactimail.models import generate_random_nickname
+from .factories import AccountFactory
+
+CSV = (
+    "email,nickname,password\n"
+    "New@EXAMPLE.com,newbie,\n"
+    "not-an-email,,\n"
+    "taken@example.com,,\n"
+    "New@example.com,again,\n"
+    "secret@example.com,,s3cret\n"
+)
+
+
+def test_generate_random_nickname():
+    assert re.fullmatch(r"\w+-\w+-\d{6}", generate_random_nickname())
+
+
+class TestParseRow:
+    def test_valid(self):
+        row = parse_row({"email": " Someone@EXAMPLE.COM ", "nickname": ""})
+
+        assert row.email == "Someone@example.com"
+        assert re.fullmatch(r"\w+-\w+-\d{6}", row.nickname)
+        assert row.password is None
+
+    @pytest.mark.parametrize(
+        "row, error",
+        [
+            ({"email": ""}, "The email is required."),
+            ({"email": "nobody"}, "Invalid email: nobody"),
+            ({"email": "a@example.com", "nickname": "n" * 201}, "too long"),
+        ],
+    )
+    def test_invalid(self, row, error):
+        with pytest.raises(ValueError, match=error):
+            parse_row(row)
+
+
+@pytest.mark.django_db
+class TestProvisionAccounts:
+    def test_provision(self):
+        AccountFactory(email="taken@example.com")
+
+        stats = provision_accounts(StringIO(CSV), chunk_size=2)
+
+        assert (stats.rows, stats.created, stats.skipped, stats.failed) == (5, 2, 2, 1)
+        assert stats.errors == [{"line": 3, "error": "Invalid email: not-an-email"}]
+        new = ReactiMailUser.objects.get(email="New@example.com")
+        assert new.nickname == "newbie"
+        assert not new.has_usable_password()
+        assert ReactiMailUser.objects.get(email="secret@example.com").check_password(
+            "s3cret"
+        )
+
+    def test_without_email_column(self):
+        with pytest.raises(ValueError, match="email column"):
+            provision_accounts(StringIO("name\nsomeone\n"))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_provision_hashing_in_worker_processes():
+    source = StringIO("email,password\na@example.com,first\nb@example.com,second\n")
+
+    stats = provision_accounts(source, workers=2)
+
+    assert stats.created == 2
+    assert ReactiMailUser.objects.get(email="b@example.com").check_password("second")
+
+
+@pytest.mark.django_db
+class TestProvisionCommand:
+    def test_provision(self, tmp_path):
+        source = tmp_path / "accounts.csv"
+        source.write_text(CSV)
+        stderr = StringIO()
+
+        call_command("provision_accounts", str(source), stderr=stderr)
+
+        assert ReactiMailUser.objects.count() == 3
+        assert '"line": 3' in stderr.getvalue()
+        assert "Created 3 of 5 accounts (1 already used, 1 failed)" in stderr.getvalue()
+
+    def test_invalid_file(self, tmp_path):
+        source = tmp_path / "accounts.csv"
+        source.write_text("name\nsomeone\n")
+
+        with pytest.raises(CommandError):
+            call_command("provision_accounts", str(source))
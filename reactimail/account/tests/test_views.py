@@ -97,6 +97,26 @@ class TestAuth:
         response = client.post(url, login_data)
         assert response.status_code == 403
 
+    def test_blocked_attempt_does_not_authenticate(self, client):
+        """Should reject over-limit attempts before hashing the password."""
+        from unittest import mock
+
+        from account.constants import LOGIN_MAX_TIMES_PER_MINUTE
+
+        AccountFactory(email="testuser@example.com", password="testpassword")
+        cache.clear()  # reset ratelimit.
+
+        url = reverse("account:login")
+        login_data = {"email": "testuser@example.com", "password": "incorrectpassword"}
+        for _ in range(LOGIN_MAX_TIMES_PER_MINUTE):
+            client.post(url, login_data)
+
+        with mock.patch("account.hashing.verify_password") as verify_password:
+            response = client.post(url, login_data)
+
+        assert response.status_code == 403
+        verify_password.assert_not_called()
+
     def test_session_expiry(self, client):
         from django.utils import timezone
         from freezegun import freeze_time
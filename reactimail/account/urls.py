@@ -1,8 +1,8 @@
 from django.contrib.auth.views import LogoutView
 from django.urls import path
-from .views import EmailLoginView
+from .views import AsyncEmailLoginView
 
 urlpatterns = [
-    path("login/", EmailLoginView.as_view(), name="login"),
+    path("login/", AsyncEmailLoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(next_page="account:login"), name="logout"),
 ]
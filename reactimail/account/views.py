@@ -1,15 +1,33 @@
-from django.contrib.auth import login
+from asgiref.sync import sync_to_async
+from django.contrib.auth import alogin, login
+from django.http import HttpResponseRedirect
+from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
+from django.views import View
 from django.views.generic import FormView
+from django_ratelimit.core import is_ratelimited
 from django_ratelimit.decorators import ratelimit
+from django_ratelimit.exceptions import Ratelimited
 
-from .constants import LOGIN_MAX_TIMES_PER_MINUTE, SESSION_EXPIRE_SECONDS
-from .forms import EmailLoginForm
+from .constants import (
+    LOGIN_MAX_TIMES_PER_MINUTE,
+    LOGIN_RATELIMIT_GROUP,
+    SESSION_EXPIRE_SECONDS,
+)
+from .forms import AsyncEmailLoginForm, EmailLoginForm
+from .hashing import HashingBusy
 
 
+# The counter is checked (and incremented) before the form runs, so blocked
+# attempts are rejected without hashing the password in `authenticate()`.
 @method_decorator(
-    ratelimit(key="ip", rate=f"{LOGIN_MAX_TIMES_PER_MINUTE}/m", method=("POST",)),
+    ratelimit(
+        group=LOGIN_RATELIMIT_GROUP,
+        key="ip",
+        rate=f"{LOGIN_MAX_TIMES_PER_MINUTE}/m",
+        method=("POST",),
+    ),
     name="post",
 )
 class EmailLoginView(FormView):
@@ -22,3 +40,47 @@ class EmailLoginView(FormView):
         self.request.session.cycle_key()  # Prevent session fixation.
         self.request.session.set_expiry(SESSION_EXPIRE_SECONDS)  # Set session timeout.
         return super().form_valid(form)
+
+
+class AsyncEmailLoginView(View):
+    """EmailLoginView whose password hashing doesn't take a thread per request.
+
+    Passwords are hashed in the login hashing threads (see `account.hashing`).
+    When too many logins already wait for them, the login is answered with
+    503 and a Retry-After header, rather than queued.
+    """
+
+    template_name = "account/login.html"
+    form_class = AsyncEmailLoginForm
+    success_url = reverse_lazy("home:home")
+    busy_message = "Too many logins at the moment, please try again."
+    busy_retry_after = 1
+
+    async def get(self, request, *args, **kwargs):
+        return render(request, self.template_name, {"form": self.form_class()})
+
+    async def post(self, request, *args, **kwargs):
+        # Shares the counter of EmailLoginView, and is checked before hashing.
+        if await sync_to_async(is_ratelimited)(
+            request,
+            group=LOGIN_RATELIMIT_GROUP,
+            key="ip",
+            rate=f"{LOGIN_MAX_TIMES_PER_MINUTE}/m",
+            method=("POST",),
+            increment=True,
+        ):
+            raise Ratelimited()
+        form = self.form_class(data=request.POST)
+        try:
+            valid = await form.ais_valid(request)
+        except HashingBusy:
+            form.add_error(None, self.busy_message)
+            response = render(request, self.template_name, {"form": form}, status=503)
+            response["Retry-After"] = str(self.busy_retry_after)
+            return response
+        if not valid:
+            return render(request, self.template_name, {"form": form})
+        await alogin(request, form.get_user())
+        await request.session.acycle_key()  # Prevent session fixation.
+        await request.session.aset_expiry(SESSION_EXPIRE_SECONDS)
+        return HttpResponseRedirect(str(self.success_url))
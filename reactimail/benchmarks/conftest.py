@@ -0,0 +1,77 @@
+"""Benchmarks run with pytest, but only when selected with `-m benchmark`.
+
+    pytest benchmarks -m benchmark
+
+Each benchmark records its measurements with the `benchmark_results` fixture,
+and all of them are written as JSON to `$BENCHMARK_OUTPUT` (default:
+`benchmark-results.json`), so runs can be compared between commits.
+"""
+
+import json
+import platform
+import subprocess
+from datetime import datetime, timezone
+from os import getenv
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+
+from account.tests.factories import AccountFactory
+from .utils import SCALES, seed_templates
+
+
+def pytest_collection_modifyitems(config, items):
+    for item in items:
+        if Path(__file__).parent in Path(item.fspath).parents:
+            item.add_marker(pytest.mark.benchmark)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@pytest.fixture(scope="session")
+def benchmark_results():
+    """A list to append one dict per measurement to."""
+    results: list[dict] = []
+    yield results
+    if not results:
+        return
+    output = Path(getenv("BENCHMARK_OUTPUT", "benchmark-results.json"))
+    output.write_text(
+        json.dumps(
+            {
+                "commit": _git_commit(),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+
+
+@pytest.fixture(scope="session", params=SCALES, ids=lambda scale: f"{scale}rows")
+def seeded_account(request, django_db_setup, django_db_blocker):
+    """An account with `request.param` message templates, committed once.
+
+    Benchmarks using it are grouped by scale, so each scale is seeded once.
+    """
+    with django_db_blocker.unblock():
+        account = AccountFactory()
+        seed_templates(account, request.param)
+        cache.clear()
+        yield account
+        account.delete()
+
+
+@pytest.fixture
+def scale(request, seeded_account) -> int:
+    """The number of message templates of `seeded_account`."""
+    return request.node.callspec.params["seeded_account"]
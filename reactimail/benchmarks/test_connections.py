@@ -0,0 +1,67 @@
+"""Tag list throughput with and without reused database connections.
+
+The test client keeps the connection open between requests, so each request
+here is wrapped in `close_old_connections()` like a server does. Without
+reuse every request then connects (and authenticates) to Postgres again.
+Run against the docker-compose Postgres for numbers close to production.
+"""
+
+from time import perf_counter
+
+import pytest
+from django.db import close_old_connections, connections
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+from tag.tests.factories import TagFactory
+
+REQUESTS = 200
+
+MODES = {
+    "per_request": {"CONN_MAX_AGE": 0, "OPTIONS": {}},
+    "persistent": {"CONN_MAX_AGE": 60, "OPTIONS": {}},
+    "pool": {"CONN_MAX_AGE": 0, "OPTIONS": {"pool": {"min_size": 1, "max_size": 4}}},
+}
+
+
+@pytest.fixture
+def database_mode(request):
+    connection = connections["default"]
+    original = {
+        key: connection.settings_dict[key] for key in ("CONN_MAX_AGE", "OPTIONS")
+    }
+    connection.close()
+    connection.close_pool()
+    connection.settings_dict.update(MODES[request.param])
+    yield request.param
+    connection.close()
+    connection.close_pool()
+    connection.settings_dict.update(original)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("database_mode", list(MODES), indirect=True)
+def test_tag_list_throughput(client, benchmark_results, database_mode):
+    account = AccountFactory()
+    TagFactory.create_batch(20, account=account)
+    client.force_login(account)
+    url = reverse("tag:list")
+
+    connections["default"].close()
+    started = perf_counter()
+    for _ in range(REQUESTS):
+        close_old_connections()
+        response = client.get(url)
+        close_old_connections()
+        assert response.status_code == 200
+    seconds = perf_counter() - started
+
+    benchmark_results.append(
+        {
+            "name": "tag_list_connections",
+            "mode": database_mode,
+            "requests": REQUESTS,
+            "seconds": seconds,
+            "requests_per_second": REQUESTS / seconds,
+        }
+    )
@@ -0,0 +1,84 @@
+"""Full requests to the list views at realistic scale.
+
+The first page and a page deep into the list are requested with a cold cache
+(every request misses the listing cache) and a warm one.
+"""
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+from reactimail.pagination import encode_cursor
+from .utils import measure
+
+VIEWS = {
+    "tag:list": ("name", "id"),
+    "message_template:list": ("title", "id"),
+}
+
+
+def deep_cursor(account, view: str) -> str:
+    """The cursor of the row in the middle of the account's list."""
+    keyset = VIEWS[view]
+    if view == "tag:list":
+        queryset = account.tags.all()
+    else:
+        queryset = account.message_templates.all()
+    queryset = queryset.order_by(*keyset).values_list(*keyset)
+    return encode_cursor(queryset[queryset.count() // 2])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("view", list(VIEWS))
+@pytest.mark.parametrize("page", ["first", "deep"])
+def test_list_view(client, benchmark_results, seeded_account, scale, view, page):
+    client.force_login(seeded_account)
+    url = reverse(view)
+    params = {"after": deep_cursor(seeded_account, view)} if page == "deep" else {}
+
+    def get():
+        response = client.get(url, params)
+        assert response.status_code == 200
+
+    def cold_get():
+        cache.clear()
+        get()
+
+    cold = measure(cold_get, repeat=5)
+    warm = measure(get, repeat=5, number=5)
+
+    for cache_state, stats in (("cold", cold), ("warm", warm)):
+        benchmark_results.append(
+            {
+                "name": "list_view",
+                "view": view,
+                "rows": scale,
+                "page": page,
+                "cache": cache_state,
+                **stats,
+            }
+        )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("match", ["all", "any"])
+def test_tag_filter(client, benchmark_results, seeded_account, scale, match):
+    """The template list filtered by two tags, with a cold cache."""
+    client.force_login(seeded_account)
+    url = reverse("message_template:list")
+    tag_ids = seeded_account.tags.order_by("name").values_list("id", flat=True)[:2]
+    params = {"tag": [str(tag_id) for tag_id in tag_ids], "match": match}
+
+    def cold_get():
+        cache.clear()
+        response = client.get(url, params)
+        assert response.status_code == 200
+
+    benchmark_results.append(
+        {
+            "name": "tag_filter",
+            "match": match,
+            "rows": scale,
+            **measure(cold_get, repeat=5),
+        }
+    )
@@ -0,0 +1,182 @@
+"""Login throughput under a credential-stuffing load, and login spikes.
+
+Many attempts with different emails come from a few IP addresses. With rate
+limiting, attempts over the limit are rejected before the password is hashed,
+so the number of hashes (the CPU cost of the load) stays bounded.
+
+During a spike of logins, other pages of the process should stay fast: the
+sync `EmailLoginView` is compared with the async one, served by Django's ASGI
+handler as uvicorn would.
+"""
+
+import asyncio
+from statistics import median
+from time import perf_counter
+from unittest import mock
+from urllib.parse import urlencode
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.urls import include, path, reverse
+from freezegun import freeze_time
+
+from account.constants import LOGIN_MAX_TIMES_PER_MINUTE
+from account.tests.factories import AccountFactory
+from account.views import EmailLoginView
+from tag.tests.factories import TagFactory
+
+ATTEMPTS = 40
+ADDRESSES = 4
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ratelimit_enabled", [True, False])
+def test_credential_stuffing(client, settings, benchmark_results, ratelimit_enabled):
+    settings.RATELIMIT_ENABLE = ratelimit_enabled
+    AccountFactory(email="victim@example.com", password="testpassword")
+    cache.clear()  # reset ratelimit.
+    url = reverse("account:login")
+
+    statuses = []
+    # Rate limit windows are per minute, ending at another second for each
+    # address: freeze the clock so none resets during the attempts. Timings
+    # of this module keep the real clock.
+    with freeze_time(ignore=[__name__]), mock.patch.object(
+        PBKDF2PasswordHasher,
+        "encode",
+        autospec=True,
+        side_effect=PBKDF2PasswordHasher.encode,
+    ) as encode:
+        started = perf_counter()
+        for n in range(ATTEMPTS):
+            response = client.post(
+                url,
+                {"email": f"user{n}@example.com", "password": "guess"},
+                REMOTE_ADDR=f"10.0.0.{n % ADDRESSES}",
+            )
+            statuses.append(response.status_code)
+        seconds = perf_counter() - started
+
+    blocked = statuses.count(403)
+    benchmark_results.append(
+        {
+            "name": "login_credential_stuffing",
+            "ratelimit": ratelimit_enabled,
+            "attempts": ATTEMPTS,
+            "blocked": blocked,
+            "hashes": encode.call_count,
+            "seconds": seconds,
+            "attempts_per_second": ATTEMPTS / seconds,
+        }
+    )
+    if ratelimit_enabled:
+        assert blocked == ATTEMPTS - ADDRESSES * LOGIN_MAX_TIMES_PER_MINUTE
+        assert encode.call_count == ADDRESSES * LOGIN_MAX_TIMES_PER_MINUTE
+    else:
+        assert blocked == 0
+
+
+# The views behind `ROOT_URLCONF = __name__`: the app, and the sync login view.
+urlpatterns = [
+    path("sync-login/", EmailLoginView.as_view(), name="sync_login"),
+    path("", include("reactimail.urls")),
+]
+
+SPIKE_LOGINS = 16
+PAGE_REQUESTS = 20
+LOGIN_PATHS = {"sync": "/sync-login/", "async": "/login/"}
+
+
+async def asgi_request(
+    app, method: str, path: str, body: bytes = b"", cookie: str = ""
+) -> tuple[int, float]:
+    """Send a request to the ASGI `app`, answering its status and seconds."""
+    headers = [(b"content-type", b"application/x-www-form-urlencoded")]
+    if cookie:
+        headers.append((b"cookie", cookie.encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": headers,
+        "client": ("10.0.0.1", 1234),
+        "server": ("testserver", 80),
+    }
+    started = perf_counter()
+    communicator = ApplicationCommunicator(app, scope)
+    await communicator.send_input({"type": "http.request", "body": body})
+    start = await communicator.receive_output(timeout=120)
+    while (await communicator.receive_output(timeout=120)).get("more_body"):
+        pass
+    await communicator.wait()
+    return start["status"], perf_counter() - started
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("view", list(LOGIN_PATHS))
+def test_login_spike(client, settings, benchmark_results, view):
+    """Tag list latency under ASGI while a spike of logins is hashed.
+
+    The sync view hashes in a thread per login (all at once), the async one in
+    `LOGIN_HASHING_WORKERS` threads.
+    """
+    settings.ROOT_URLCONF = __name__
+    settings.RATELIMIT_ENABLE = False
+    # Requests are sent without the CSRF cookie and token.
+    settings.MIDDLEWARE = [m for m in settings.MIDDLEWARE if "Csrf" not in m]
+    AccountFactory(email="victim@example.com", password="testpassword")
+    account = AccountFactory()
+    TagFactory.create_batch(20, account=account)
+    client.force_login(account)
+    session = client.cookies[settings.SESSION_COOKIE_NAME]
+    cookie = f"{session.key}={session.value}"
+    app = ASGIHandler()
+    page = reverse("tag:list")
+    body = urlencode({"email": "victim@example.com", "password": "guess"}).encode()
+
+    async def pages() -> list[float]:
+        seconds = []
+        for _ in range(PAGE_REQUESTS):
+            status, elapsed = await asgi_request(app, "GET", page, cookie=cookie)
+            assert status == 200
+            seconds.append(elapsed)
+        return seconds
+
+    async def spike():
+        idle = await pages()
+        started = perf_counter()
+        logins = asyncio.gather(
+            *(
+                asgi_request(app, "POST", LOGIN_PATHS[view], body)
+                for _ in range(SPIKE_LOGINS)
+            )
+        )
+        busy = await pages()
+        statuses = [status for status, _ in await logins]
+        return idle, busy, statuses, perf_counter() - started
+
+    idle, busy, statuses, seconds = async_to_sync(spike)()
+
+    assert statuses.count(200) + statuses.count(503) == SPIKE_LOGINS
+    benchmark_results.append(
+        {
+            "name": "login_spike_page_latency",
+            "view": view,
+            "logins": SPIKE_LOGINS,
+            "hashing_workers": settings.LOGIN_HASHING_WORKERS,
+            "rejected": statuses.count(503),
+            "spike_seconds": seconds,
+            "idle_median": median(idle),
+            "spike_median": median(busy),
+            "spike_max": max(busy),
+        }
+    )
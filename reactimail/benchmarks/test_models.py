@@ -0,0 +1,118 @@
+"""Model helpers and form validation at realistic scale."""
+
+import pytest
+from django.db import connection
+
+from account.tests.factories import AccountFactory
+from message_template.compiler import compile_body
+from message_template.forms import MessageTemplateForm
+from message_template.models import MessageTemplate
+from message_template.tests.factories import MessageTemplateFactory
+from .utils import SCALES, large_body, measure
+
+BODY_SIZES = [1_000, 100_000, 1_000_000]
+
+
+@pytest.mark.parametrize("size", BODY_SIZES)
+def test_body_parameters_extraction(benchmark_results, size):
+    """What `MessageTemplate.save()` runs to fill `body_parameters`."""
+    body = large_body(size)
+
+    stats = measure(lambda: compile_body(body).parameters)
+
+    benchmark_results.append(
+        {"name": "body_parameters_extraction", "body_size": len(body), **stats}
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("size", BODY_SIZES)
+def test_form_clean_body(benchmark_results, size):
+    account = AccountFactory()
+    body = large_body(size)
+    data = {"type": "text", "title": "Large", "body": body}
+
+    def validate():
+        form = MessageTemplateForm(data, account=account)
+        assert form.is_valid(), form.errors
+
+    stats = measure(validate)
+
+    benchmark_results.append(
+        {"name": "form_clean_body", "body_size": len(body), **stats}
+    )
+
+
+@pytest.mark.django_db
+def test_body_parameters(
+    benchmark_results, seeded_account, scale, django_assert_num_queries
+):
+    """`body_parameters` of every template, as loaded by the default manager."""
+    templates = MessageTemplate.objects.filter(account=seeded_account)
+
+    read = measure(lambda: [t.body_parameters for t in templates.iterator()])
+    with django_assert_num_queries(1):  # The bodies are loaded with the templates.
+        [t.body_parameters for t in templates[:50]]
+    lookup = measure(lambda: list(templates.using_parameter("order_3")[:50]))
+
+    benchmark_results.append({"name": "body_parameters_read", "rows": scale, **read})
+    benchmark_results.append(
+        {"name": "body_parameters_using_parameter", "rows": scale, **lookup}
+    )
+
+
+@pytest.mark.django_db
+def test_tag_names(benchmark_results, seeded_account, scale):
+    """`tag_names` of every template, and of one page without the annotation."""
+    templates = MessageTemplate.objects.filter(account=seeded_account)
+
+    annotated = measure(
+        lambda: [t.tag_names for t in templates.with_tag_names().iterator()]
+    )
+    page = measure(lambda: [t.tag_names for t in templates.order_by("title")[:50]])
+
+    benchmark_results.append(
+        {"name": "tag_names_annotated", "rows": scale, **annotated}
+    )
+    benchmark_results.append(
+        {"name": "tag_names_page_unannotated", "rows": scale, **page}
+    )
+
+
+SEARCH_INDEXES = (
+    "message_template_search_gin",
+    "message_template_body_idx",
+    "message_template_title_trgm",
+)
+"""The index answering each condition of `MessageTemplateQuerySet.search()`."""
+
+
+@pytest.mark.django_db
+def test_search(benchmark_results, seeded_account, scale):
+    """Searches whose conditions are answered by indexes, within the account.
+
+    "zebra" matches no template. "ships" matches every template of
+    `seeded_account`, but is searched for by another account with one match.
+    """
+    other = AccountFactory()
+    MessageTemplateFactory(account=other, title="Shipping", body="It ships today.")
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")  # As autovacuum would after seeding.
+    search = MessageTemplate.objects.filter(account=seeded_account).search("zebra")
+    others = MessageTemplate.objects.filter(account=other).search("ships")
+
+    stats = measure(lambda: list(search[:50]))
+    other_stats = measure(lambda: list(others[:50]))
+
+    assert [template.title for template in others] == ["Shipping"]
+    if scale == max(SCALES):
+        plan = search.explain()
+        for index in SEARCH_INDEXES:
+            assert index in plan, plan
+        # The outer query and each branch of the UNION are of the account.
+        plan = others.explain()
+        assert plan.count(f"account_id = {other.pk}") >= 4, plan
+    benchmark_results.append({"name": "search", "rows": scale, **stats})
+    benchmark_results.append(
+        {"name": "search_matching_other_account", "rows": scale, **other_stats}
+    )
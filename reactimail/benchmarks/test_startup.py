@@ -0,0 +1,31 @@
+"""The cold start of a new worker, and the import time of the project.
+
+Wall-clock timings depend on the machine and its load, so the import budget
+is checked here rather than in the unit suite (see `profiling/startup.py`).
+"""
+
+from profiling.startup import PROJECT_IMPORT_BUDGET_SECONDS, profile_startup
+
+
+def test_project_import_budget(benchmark_results, django_db_setup, django_db_blocker):
+    """Should not make a cold start slower by importing more at module level."""
+    with django_db_blocker.unblock():
+        startup = profile_startup()
+
+    benchmark_results.append(
+        {
+            "name": "startup",
+            "project_import_seconds": startup.project_import_seconds,
+            "first_request_seconds": startup.first_request_seconds,
+            "process_seconds": startup.process_seconds,
+            **startup.phases,
+        }
+    )
+    slowest = sorted(
+        (module for module in startup.imports if module.project_seconds),
+        key=lambda module: module.project_seconds,
+        reverse=True,
+    )[:5]
+    assert startup.project_import_seconds < PROJECT_IMPORT_BUDGET_SECONDS, [
+        (module.name, module.project_seconds) for module in slowest
+    ]
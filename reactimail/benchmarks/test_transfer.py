@@ -0,0 +1,57 @@
+"""Bulk import throughput and memory use of message templates.
+
+Memory use should stay flat as the input grows, as rows are read and loaded
+in chunks. Each chunk is committed like in production, instead of running in
+one test transaction.
+"""
+
+import json
+import tracemalloc
+from time import perf_counter
+
+import pytest
+
+from account.tests.factories import AccountFactory
+from message_template.models import MessageTemplate
+from message_template.transfer import import_templates
+
+TAGS = 50
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("rows", [10_000, 50_000])
+def test_import_templates(tmp_path, benchmark_results, rows):
+    source = tmp_path / "templates.jsonl"
+    with source.open("w") as dst:
+        for n in range(rows):
+            row = {
+                "title": f"Template {n}",
+                "body": f"Dear ${{name}}, your order {n} ships ${{date}}.",
+                "tags": [f"tag{n % TAGS}", f"tag{(n + 1) % TAGS}"],
+            }
+            dst.write(json.dumps(row) + "\n")
+    account = AccountFactory()
+
+    started = perf_counter()
+    with source.open() as src:
+        stats = import_templates(account, src)
+    seconds = perf_counter() - started
+
+    # tracemalloc slows the import down, so memory is measured in another run.
+    tracemalloc.start()
+    with source.open() as src:
+        import_templates(AccountFactory(), src)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    benchmark_results.append(
+        {
+            "name": "import_templates",
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds,
+            "peak_memory_bytes": peak,
+        }
+    )
+    assert stats.failed == 0
+    assert MessageTemplate.objects.filter(account=account).count() == rows
@@ -0,0 +1,66 @@
+"""Timing and seeding helpers shared by the benchmarks."""
+
+from statistics import fmean, median
+from time import perf_counter
+from typing import Callable
+
+from message_template.models import MessageTemplate
+from message_template.tests.factories import MessageTemplateFactory
+from tag.tests.factories import TagFactory
+
+SCALES = [10, 1_000, 100_000]
+"""Message templates per account."""
+
+TAGS_PER_ACCOUNT = 20
+TAGS_PER_TEMPLATE = 2
+
+
+def measure(func: Callable[[], object], repeat: int = 5, number: int = 1) -> dict:
+    """Time `func` like `timeit`: `repeat` runs of `number` calls each.
+
+    Returns seconds per call, to be merged into a benchmark result.
+    """
+    times = []
+    for _ in range(repeat):
+        started = perf_counter()
+        for _ in range(number):
+            func()
+        times.append((perf_counter() - started) / number)
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min": min(times),
+        "median": median(times),
+        "mean": fmean(times),
+    }
+
+
+def seed_templates(account, count: int, batch_size: int = 5_000) -> None:
+    """Create `count` templates with tags for the account.
+
+    Instances are built with the factories but saved with `bulk_create`. The
+    bodies repeat every 10 templates, so only 10 bodies are stored.
+    """
+    tags = TagFactory.create_batch(TAGS_PER_ACCOUNT, account=account)
+    Through = MessageTemplate.tags.through
+    for start in range(0, count, batch_size):
+        templates = MessageTemplateFactory.build_batch(
+            min(batch_size, count - start), account=account
+        )
+        for n, template in enumerate(templates, start=start):
+            template.body = f"Dear ${{name}}, your order ${{order_{n % 10}}} ships."
+        MessageTemplate.objects.bulk_create(templates)
+        Through.objects.bulk_create(
+            Through(
+                messagetemplate_id=template.id,
+                tag_id=tags[(n + i) % TAGS_PER_ACCOUNT].id,
+            )
+            for n, template in enumerate(templates, start=start)
+            for i in range(TAGS_PER_TEMPLATE)
+        )
+
+
+def large_body(size: int) -> str:
+    """A body of about `size` characters, with a placeholder every ~50."""
+    line = "Lorem ipsum dolor sit amet, $$5 off for ${name_%d}.\n"
+    return "".join(line % (n % 1_000) for n in range(size // len(line) + 1))
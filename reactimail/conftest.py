@@ -0,0 +1,15 @@
+import pytest
+
+from profiling.middleware import armed_rules
+
+
+@pytest.fixture(autouse=True)
+def no_armed_profiling_rules():
+    """Start every test with no armed profiling rule, already loaded.
+
+    Otherwise a request loads the rules when they are stale, which depends on
+    the tests run before and adds a query to the counted ones.
+    """
+    armed_rules._loaded([])
+    yield
+    armed_rules.expire()
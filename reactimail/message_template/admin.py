@@ -1,6 +1,17 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.helpers import ActionForm
+
+from tag.models import Tag
 from .models import MessageTemplate
 from .forms import MessageTemplateForm
+from .tagging import add_tags, remove_tags
+
+
+class TagsActionForm(ActionForm):
+    tag_names = forms.CharField(
+        required=False, help_text="Comma separated tag names, for the tag actions"
+    )
 
 
 @admin.register(MessageTemplate)
@@ -14,10 +25,39 @@ class MessageTemplateAdmin(admin.ModelAdmin):
         "tags_list",
     )
     ordering = ("account", "title")
-    search_fields = ("account", "title")
-    filter_horizontal = ("tags",)
+    search_fields = ("title", "message_body__text")
+    # Searched by TagAdmin, instead of rendering every tag.
+    autocomplete_fields = ("tags",)
+    action_form = TagsActionForm
+    actions = ["add_named_tags", "remove_named_tags"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("account").with_tag_names()
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the full-text and trigram indexes instead of ILIKE scans.
+        if not search_term:
+            return queryset, False
+        return queryset.search(search_term), False
 
     def tags_list(self, obj):
         return obj.tag_names
 
     tags_list.short_description = "Tags"  # type: ignore
+
+    def _named_tags(self, request):
+        # Each template's account has its own tags of these names.
+        names = {n.strip() for n in request.POST.get("tag_names", "").split(",")}
+        return Tag.objects.filter(name__in=names - {""})
+
+    @admin.action(description="Add the named tags to the selected message templates")
+    def add_named_tags(self, request, queryset):
+        updated = add_tags(queryset, self._named_tags(request))
+        self.message_user(request, f"Added tags to {updated} message templates.")
+
+    @admin.action(
+        description="Remove the named tags from the selected message templates"
+    )
+    def remove_named_tags(self, request, queryset):
+        updated = remove_tags(queryset, self._named_tags(request))
+        self.message_user(request, f"Removed tags from {updated} message templates.")
@@ -0,0 +1,94 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import RequestDataTooBig
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.views import View
+
+from reactimail.api import JSONDetailMixin, JSONListMixin, parse_ids, read_json
+from reactimail.views import AsyncLoginRequiredMixin
+from tag.models import Tag
+from .models import MessageTemplate
+from .tagging import add_tags, remove_tags
+from .views import MessageTemplateDetailView, MessageTemplateListView
+
+
+def serialize_message_template(template) -> dict:
+    return {
+        "id": template.pk,
+        "type": template.type,
+        "title": template.title,
+        "body": template.body,
+        "body_parameters": template.body_parameters,
+        "tags": template.tag_list,
+        "created_at": template.created_at,
+        "updated_at": template.updated_at,
+    }
+
+
+class MessageTemplateListAPIView(JSONListMixin, MessageTemplateListView):
+    # Cached apart from the HTML pages, which annotate tag names differently.
+    listing_name = "api_message_templates"
+
+    def get_queryset(self):
+        # The scoping and tag filter of the HTML view, with tag names as a list.
+        return (
+            MessageTemplate.objects.filter(account=self.request.user)
+            .with_tags(*self.tag_filter)
+            .with_tag_list()
+        )
+
+    def serialize(self, obj):
+        return serialize_message_template(obj)
+
+
+class MessageTemplateDetailAPIView(JSONDetailMixin, MessageTemplateDetailView):
+    def get_queryset(self):
+        # The scoping of the HTML view, with tag names as a list.
+        return MessageTemplate.objects.filter(account=self.request.user).with_tag_list()
+
+    def serialize(self, obj):
+        return serialize_message_template(obj)
+
+
+class MessageTemplateTagsAPIView(AsyncLoginRequiredMixin, View):
+    """Add and remove tags of many templates at once.
+
+    POST `{"templates": [id, ...], "add": [tag id, ...], "remove": [...]}`.
+    Answers `{"added": n, "removed": n}`, the numbers of changed templates.
+    Ids of other accounts' templates and tags are ignored.
+    """
+
+    raise_exception = True
+    http_method_names = ["post"]
+    max_templates = 10_000
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = read_json(request)
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object.")
+            template_ids = parse_ids(data.get("templates", []))
+            add_ids = parse_ids(data.get("add", []))
+            remove_ids = parse_ids(data.get("remove", []))
+        except RequestDataTooBig as e:
+            return HttpResponse(str(e), status=413)
+        except ValueError as e:
+            return HttpResponseBadRequest(f"Invalid request: {e}")
+        if len(template_ids) > self.max_templates:
+            return HttpResponseBadRequest(
+                f"At most {self.max_templates} templates per request."
+            )
+
+        templates = MessageTemplate.objects.filter(
+            account=request.user, pk__in=template_ids
+        )
+        tags = Tag.objects.filter(account=request.user)
+        added = removed = 0
+        if template_ids and add_ids:
+            added = await sync_to_async(add_tags)(
+                templates, tags.filter(pk__in=add_ids)
+            )
+        if template_ids and remove_ids:
+            removed = await sync_to_async(remove_tags)(
+                templates, tags.filter(pk__in=remove_ids)
+            )
+        return JsonResponse({"added": added, "removed": removed})
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import api
+
+app_name = "message_template_api"
+
+urlpatterns = [
+    path("", api.MessageTemplateListAPIView.as_view(), name="list"),
+    path("tags/", api.MessageTemplateTagsAPIView.as_view(), name="tags"),
+    path("<uuid:pk>/", api.MessageTemplateDetailAPIView.as_view(), name="detail"),
+]
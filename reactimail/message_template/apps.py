@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MessageTemplateConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "message_template"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,158 @@
+"""Parsing and caching of message template bodies.
+
+A body is compiled once into literal segments and placeholder slots, so that
+parameter extraction and rendering do not have to scan the text again.
+"""
+
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
+from threading import Lock
+from typing import Mapping
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+placeholder_pattern = re.compile(
+    r"\$(?:(?P<escaped>\$)|\{(?P<named>\w+)\}|(?P<invalid>\{))"
+)
+"""`$$` is a literal dollar, `${name}` is a parameter, any other `${` is an error."""
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A parsed body: `segments` always has one more item than `slots`."""
+
+    segments: tuple[str, ...]
+    slots: tuple[str, ...]
+
+    @property
+    def parameters(self) -> list[str]:
+        """Parameter names in sorted order, as shown to users."""
+        return sorted(self.slots)
+
+    def render(self, parameters: Mapping[str, object]) -> str:
+        """Substitute every slot. Raises KeyError for a missing parameter."""
+        parts = [self.segments[0]]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            parts.append(str(parameters[slot]))
+            parts.append(segment)
+        return "".join(parts)
+
+
+def compile_body(body: str) -> CompiledTemplate:
+    """Parse a body into a CompiledTemplate.
+
+    Raises:
+        ValueError: If the body contains a malformed `${` placeholder.
+    """
+    segments = []
+    slots = []
+    literal = []
+    position = 0
+    for match in placeholder_pattern.finditer(body):
+        literal.append(body[position : match.start()])
+        position = match.end()
+        if match.group("escaped") is not None:
+            literal.append("$")
+        elif match.group("named") is not None:
+            segments.append("".join(literal))
+            slots.append(match.group("named"))
+            literal = []
+        else:
+            line = body.count("\n", 0, match.start()) + 1
+            column = match.start() - body.rfind("\n", 0, match.start())
+            raise ValueError(
+                f"Invalid placeholder in string: line {line}, col {column}"
+            )
+    literal.append(body[position:])
+    segments.append("".join(literal))
+    return CompiledTemplate(segments=tuple(segments), slots=tuple(slots))
+
+
+def escape_invalid_placeholders(body: str) -> str:
+    """The body with each malformed `${` escaped as `$${`, to render as is."""
+    return placeholder_pattern.sub(
+        lambda match: "$${" if match.group("invalid") is not None else match[0], body
+    )
+
+
+def body_digest(body: str) -> str:
+    """The content address of a body: its SHA-256, which Postgres computes too."""
+    return sha256(body.encode()).hexdigest()
+
+
+class CompiledTemplateCache:
+    """A bounded in-process LRU of compiled bodies, backed by an optional
+    Django cache (e.g. Redis) shared between workers.
+
+    Entries are keyed by `body_digest()`, so templates sharing a body share
+    its entry, and an edited body gets a new one.
+    """
+
+    key_prefix = "message_template:compiled"
+
+    def __init__(self, maxsize: int, alias: str | None = None):
+        self.maxsize = maxsize
+        self.alias = alias
+        self._entries: OrderedDict[str, CompiledTemplate] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, digest: str, body: str) -> CompiledTemplate:
+        with self._lock:
+            compiled = self._entries.get(digest)
+            if compiled is not None:
+                self._entries.move_to_end(digest)
+                return compiled
+
+        compiled = self._get_shared(digest)
+        if compiled is None:
+            compiled = compile_body(body)
+            self._set_shared(digest, compiled)
+
+        with self._lock:
+            self._entries[digest] = compiled
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get_shared(self, digest: str) -> CompiledTemplate | None:
+        if not self.alias:
+            return None
+        try:
+            return caches[self.alias].get(f"{self.key_prefix}:{digest}")
+        except Exception:
+            logger.warning("Compiled template cache is unavailable.", exc_info=True)
+            return None
+
+    def _set_shared(self, digest: str, compiled: CompiledTemplate) -> None:
+        if not self.alias:
+            return
+        try:
+            caches[self.alias].set(f"{self.key_prefix}:{digest}", compiled)
+        except Exception:
+            logger.warning("Compiled template cache is unavailable.", exc_info=True)
+
+
+compiled_templates = CompiledTemplateCache(
+    maxsize=settings.MESSAGE_TEMPLATE_CACHE_SIZE,
+    alias=settings.MESSAGE_TEMPLATE_CACHE_ALIAS,
+)
+
+
+def get_compiled(body: str, digest: str | None = None) -> CompiledTemplate:
+    """Return the compiled body, cached by its digest (computed if not given).
+
+    Raises:
+        ValueError: If the body contains a malformed `${` placeholder.
+    """
+    return compiled_templates.get(digest or body_digest(body), body)
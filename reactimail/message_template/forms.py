@@ -1,13 +1,31 @@
-from string import Template
-from re import compile
+from pathlib import Path
+from uuid import UUID
 
-from django.forms import ModelForm, ValidationError
+from django.forms import (
+    CharField,
+    ChoiceField,
+    FileField,
+    Form,
+    ModelForm,
+    Textarea,
+    ValidationError,
+)
+from tag.models import Tag
+from tag.widgets import TagAutocompleteWidget
+from .compiler import get_compiled
 from .models import MessageTemplate
-
-pattern = compile(r"\$\{(\w+)\}")
+from .transfer import FORMATS
 
 
 class MessageTemplateForm(ModelForm):
+    # Not a model field: bodies are stored in `MessageBody`.
+    body = CharField(
+        widget=Textarea,
+        strip=False,
+        label="Message Body",
+        help_text="The body of the message template",
+    )
+
     class Meta:
         model = MessageTemplate
         fields = ["type", "title", "body", "tags"]
@@ -16,17 +34,61 @@ class MessageTemplateForm(ModelForm):
         # Capture the account from the view's context
         self.account = kwargs.pop("account", None)
         super().__init__(*args, **kwargs)
+        if self.instance.message_body_id is not None:
+            self.initial.setdefault("body", self.instance.body)
+        if self.account is not None:
+            # Accept only the account's tags, and render only the selected
+            # ones: others are found with the autocomplete API.
+            tags = Tag.objects.filter(account=self.account)
+            field = self.fields["tags"]
+            field.queryset = tags
+            field.widget = TagAutocompleteWidget(attrs=field.widget.attrs)
+            field.widget.choices = self._selected_tag_choices(tags)
+
+    def _selected_tag_choices(self, tags) -> list:
+        selected = []
+        for value in self["tags"].value() or ():
+            try:
+                selected.append(UUID(str(value)))
+            except ValueError:
+                continue  # Reported by the field's validation.
+        if not selected:
+            return []
+        return list(tags.filter(pk__in=selected).values_list("id", "name"))
 
     def clean_body(self):
         body = self.cleaned_data.get("body")
 
         # Syntax checking and parameter extraction.
         try:
-            tmpl = Template(body)
-            parameters = pattern.findall(tmpl.template)
+            compiled = get_compiled(body)
             # For checking the parameter list
-            self.cleaned_data["parameters"] = parameters
+            self.cleaned_data["parameters"] = compiled.parameters
         except ValueError as e:
             raise ValidationError(f"Template syntax error: {e}") from e
 
         return body
+
+    def save(self, commit=True):
+        self.instance.body = self.cleaned_data["body"]
+        return super().save(commit)
+
+
+class MessageTemplateImportForm(Form):
+    file = FileField(
+        help_text="CSV with a type,title,body,tags header, or JSON lines",
+    )
+    format = ChoiceField(
+        choices=[("", "From the file name"), *((f, f.upper()) for f in FORMATS)],
+        required=False,
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get("file")
+        if upload is not None and not cleaned_data.get("format"):
+            format = Path(upload.name).suffix.lstrip(".").lower()
+            if format not in FORMATS:
+                raise ValidationError("Cannot infer the format, choose one.")
+            cleaned_data["format"] = format
+        return cleaned_data
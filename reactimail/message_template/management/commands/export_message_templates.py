@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from message_template.transfer import FORMATS, export_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the message templates of an account as CSV or JSONL, which "
+        "import_message_templates can read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="The email of the account")
+        parser.add_argument("--format", choices=FORMATS, default="jsonl")
+        parser.add_argument("--output", help="The file to write (default: stdout)")
+
+    def handle(self, *args, **options):
+        try:
+            account = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist as e:
+            raise CommandError(f"Account not found: {options['email']}") from e
+
+        lines = export_templates(account, format=options["format"])
+        if options["output"]:
+            with open(options["output"], "w", newline="", encoding="utf-8") as dst:
+                dst.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending="")
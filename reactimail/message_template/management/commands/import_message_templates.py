@@ -0,0 +1,47 @@
+import json
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from message_template.transfer import FORMATS, import_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Create message templates of an account from a CSV or JSONL file, "
+        "creating their missing tags."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("email", help="The email of the account")
+        parser.add_argument("input", help="The CSV or JSONL file of templates")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="The input format (default: from the file extension)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            account = get_user_model().objects.get(email=options["email"])
+        except get_user_model().DoesNotExist as e:
+            raise CommandError(f"Account not found: {options['email']}") from e
+
+        source = Path(options["input"])
+        format = options["format"] or source.suffix.lstrip(".").lower()
+        if format not in FORMATS:
+            raise CommandError(f"Cannot infer the format of {source}, use --format.")
+
+        with source.open(newline="", encoding="utf-8") as src:
+            stats = import_templates(
+                account, src, format=format, chunk_size=options["chunk_size"]
+            )
+
+        for error in stats.errors:
+            self.stderr.write(json.dumps(error, ensure_ascii=False))
+        self.stderr.write(
+            f"Imported {stats.created} of {stats.rows} rows ({stats.failed} failed) "
+            f"in {stats.seconds:.2f}s ({stats.rows_per_second:.0f} rows/sec)"
+        )
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from message_template.models import MessageBody
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the stored message bodies that no template uses anymore, "
+        "e.g. after edits. Run it periodically."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-minutes",
+            type=int,
+            default=60,
+            help="Keep bodies stored more recently, for templates being saved",
+        )
+
+    def handle(self, *args, **options):
+        min_age = timedelta(minutes=options["min_age_minutes"])
+        try:
+            unused = MessageBody.objects.unused(min_age)
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        deleted, _ = unused.delete()
+        self.stderr.write(f"Deleted {deleted} unused message bodies")
@@ -0,0 +1,69 @@
+import csv
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from message_template.models import MessageTemplate
+from message_template.render import FORMATS, bulk_render
+
+
+class Command(BaseCommand):
+    help = (
+        "Render one message template for every row of a CSV or JSONL file of "
+        "parameters, writing one JSON object per row."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("template_id", help="The id of the message template")
+        parser.add_argument("input", help="The CSV or JSONL file of parameters")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="The input format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--output", help="The JSONL file to write (default: stdout)"
+        )
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            template = MessageTemplate.objects.get(pk=options["template_id"])
+        except (MessageTemplate.DoesNotExist, ValueError) as e:
+            raise CommandError(f"Message template not found: {e}") from e
+
+        try:
+            compiled = template.compiled_body
+        except ValueError as e:
+            raise CommandError(f"Template syntax error: {e}") from e
+
+        source = Path(options["input"])
+        format = options["format"] or source.suffix.lstrip(".").lower()
+        if format not in FORMATS:
+            raise CommandError(f"Cannot infer the format of {source}, use --format.")
+
+        try:
+            with source.open(newline="", encoding="utf-8") as src:
+                if options["output"]:
+                    with open(options["output"], "w", encoding="utf-8") as dst:
+                        stats = self._render(compiled, src, dst, format, options)
+                else:
+                    stats = self._render(compiled, src, self.stdout, format, options)
+        except (OSError, UnicodeError, csv.Error) as e:
+            raise CommandError(f"Cannot render {source}: {e}") from e
+
+        self.stderr.write(
+            f"Rendered {stats.rows} rows ({stats.failed} failed) in "
+            f"{stats.seconds:.2f}s ({stats.rows_per_second:.0f} rows/sec)"
+        )
+
+    def _render(self, compiled, src, dst, format, options):
+        return bulk_render(
+            compiled,
+            src,
+            dst,
+            format=format,
+            workers=options["workers"],
+            chunk_size=options["chunk_size"],
+        )
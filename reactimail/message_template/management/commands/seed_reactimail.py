@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from message_template.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Create synthetic accounts, tags and message templates for load tests. "
+        "Accounts are named seed-<run>-<n>@example.com and share one password."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--accounts", type=int, default=10)
+        parser.add_argument("--tags", type=int, default=50, help="The tags per account")
+        parser.add_argument(
+            "--templates",
+            type=int,
+            default=1_000,
+            help="The message templates per account",
+        )
+        parser.add_argument("--password", default="password")
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument("--job-size", type=int, default=10_000)
+        parser.add_argument(
+            "--seed", help="Reproduce the content (and emails) of an earlier run"
+        )
+
+    def handle(self, *args, **options):
+        if min(options["accounts"], options["tags"], options["templates"]) < 0:
+            raise CommandError("The numbers of rows must not be negative.")
+        if options["job_size"] < 1:
+            raise CommandError("--job-size must be positive.")
+
+        try:
+            stats = seed(
+                accounts=options["accounts"],
+                tags=options["tags"],
+                templates=options["templates"],
+                password=options["password"],
+                workers=options["workers"],
+                job_size=options["job_size"],
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+        self.stderr.write(
+            f"Created {stats.accounts} accounts, {stats.tags} tags and "
+            f"{stats.templates} message templates in {stats.seconds:.2f}s "
+            f"({stats.templates_per_second:.0f} templates/sec)"
+        )
@@ -0,0 +1,58 @@
+# Generated by Django 5.1.2 on 2026-10-18 14:05
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+from message_template.compiler import compile_body, escape_invalid_placeholders
+
+
+def fill_body_parameters(apps, schema_editor):
+    MessageTemplate = apps.get_model("message_template", "MessageTemplate")
+    batch = []
+    for message_template in MessageTemplate.objects.only("id", "body").iterator(
+        chunk_size=2000
+    ):
+        # As the compiler parses them: `$${name}` is no parameter. A malformed
+        # `${` is escaped by 0006, which keeps the other parameters.
+        message_template.body_parameters = compile_body(
+            escape_invalid_placeholders(message_template.body)
+        ).parameters
+        batch.append(message_template)
+        if len(batch) >= 2000:
+            MessageTemplate.objects.bulk_update(batch, ["body_parameters"])
+            batch = []
+    MessageTemplate.objects.bulk_update(batch, ["body_parameters"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("message_template", "0001_initial"),
+        ("tag", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="messagetemplate",
+            name="body_parameters",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=200),
+                blank=True,
+                default=list,
+                editable=False,
+                help_text="The sorted parameter names in the body, kept in sync on save",
+                size=None,
+                verbose_name="Body Parameters",
+            ),
+        ),
+        migrations.RunPython(fill_body_parameters, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="messagetemplate",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["body_parameters"], name="message_template_params_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.1.2 on 2026-10-18 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("message_template", "0002_messagetemplate_body_parameters"),
+        ("tag", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="messagetemplate",
+            index=models.Index(
+                fields=["account", "title", "id"], name="message_template_keyset_idx"
+            ),
+        ),
+    ]
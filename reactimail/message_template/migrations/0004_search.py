@@ -0,0 +1,53 @@
+# Generated by Django 5.1.2 on 2026-10-18 14:14
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("message_template", "0003_keyset_index"),
+        ("tag", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name="messagetemplate",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "title", config="english", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "body", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                verbose_name="Search Vector",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="messagetemplate",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="message_template_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="messagetemplate",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["title"],
+                name="message_template_title_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
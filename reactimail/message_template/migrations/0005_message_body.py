@@ -0,0 +1,183 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:15
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Must match `message_template.compiler.body_digest()`.
+DIGEST = "encode(sha256(convert_to(body, 'UTF8')), 'hex')"
+
+STORE_BODIES = f"""
+INSERT INTO message_template_messagebody (digest, text, parameters, created_at)
+SELECT DISTINCT ON (digest) digest, body, body_parameters, now()
+FROM (
+    SELECT {DIGEST} AS digest, body, body_parameters
+    FROM message_template_messagetemplate
+) AS bodies;
+
+UPDATE message_template_messagetemplate SET message_body_id = {DIGEST};
+
+-- Check the foreign keys now, as the table is altered next.
+SET CONSTRAINTS ALL IMMEDIATE;
+"""
+
+RESTORE_BODIES = """
+UPDATE message_template_messagetemplate AS template
+SET body = body.text, body_parameters = body.parameters
+FROM message_template_messagebody AS body
+WHERE body.digest = template.message_body_id;
+
+SET CONSTRAINTS ALL IMMEDIATE;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("message_template", "0004_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MessageBody",
+            fields=[
+                (
+                    "digest",
+                    models.CharField(
+                        editable=False,
+                        help_text="The SHA-256 of the text, in hex",
+                        max_length=64,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Digest",
+                    ),
+                ),
+                ("text", models.TextField(verbose_name="Text")),
+                (
+                    "parameters",
+                    django.contrib.postgres.fields.ArrayField(
+                        base_field=models.CharField(max_length=200),
+                        blank=True,
+                        default=list,
+                        help_text="The sorted parameter names in the text",
+                        size=None,
+                        verbose_name="Parameters",
+                    ),
+                ),
+                (
+                    "search_vector",
+                    models.GeneratedField(
+                        db_persist=True,
+                        expression=django.contrib.postgres.search.SearchVector(
+                            "text", config="english", weight="B"
+                        ),
+                        output_field=django.contrib.postgres.search.SearchVectorField(),
+                        verbose_name="Search Vector",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name": "Message Body",
+                "verbose_name_plural": "Message Bodies",
+            },
+        ),
+        migrations.AddField(
+            model_name="messagetemplate",
+            name="message_body",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                help_text="The body of the message template, shared by equal bodies",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="message_templates",
+                to="message_template.messagebody",
+                verbose_name="Message Body",
+            ),
+        ),
+        # Nullable while bodies are moved, so that this migration can be reversed.
+        migrations.AlterField(
+            model_name="messagetemplate",
+            name="body",
+            field=models.TextField(
+                help_text="The body of the message template",
+                null=True,
+                verbose_name="Message Body",
+            ),
+        ),
+        migrations.RunSQL(STORE_BODIES, RESTORE_BODIES),
+        migrations.AlterField(
+            model_name="messagetemplate",
+            name="message_body",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                help_text="The body of the message template, shared by equal bodies",
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="message_templates",
+                to="message_template.messagebody",
+                verbose_name="Message Body",
+            ),
+        ),
+        # The search vector uses the body, so it goes first.
+        migrations.RemoveIndex(
+            model_name="messagetemplate",
+            name="message_template_search_gin",
+        ),
+        migrations.RemoveField(
+            model_name="messagetemplate",
+            name="search_vector",
+        ),
+        migrations.RemoveIndex(
+            model_name="messagetemplate",
+            name="message_template_params_gin",
+        ),
+        migrations.RemoveField(
+            model_name="messagetemplate",
+            name="body",
+        ),
+        migrations.RemoveField(
+            model_name="messagetemplate",
+            name="body_parameters",
+        ),
+        migrations.AddField(
+            model_name="messagetemplate",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.SearchVector(
+                    "title", config="english", weight="A"
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                verbose_name="Search Vector",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="messagetemplate",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="message_template_search_gin"
+            ),
+        ),
+        # Indexed after loading the bodies, which is faster.
+        migrations.AddIndex(
+            model_name="messagetemplate",
+            index=models.Index(
+                fields=["message_body"], name="message_template_body_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="messagebody",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["parameters"], name="message_body_params_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="messagebody",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="message_body_search_gin"
+            ),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.2 on 2026-10-18 18:40
+
+from django.db import migrations
+
+from message_template.compiler import (
+    body_digest,
+    compile_body,
+    escape_invalid_placeholders,
+)
+
+
+def escape_bodies(apps, schema_editor):
+    """Escape the malformed `${` of bodies saved before they were rejected.
+
+    E.g. `${user.name}` becomes `$${user.name}`, which still renders as
+    `${user.name}`. Templates are moved to the escaped body.
+    """
+    MessageBody = apps.get_model("message_template", "MessageBody")
+    MessageTemplate = apps.get_model("message_template", "MessageTemplate")
+    invalid = []
+    bodies = MessageBody.objects.filter(text__contains="${").only("text")
+    for body in bodies.iterator(chunk_size=2000):
+        try:
+            compile_body(body.text)
+        except ValueError:
+            invalid.append(body)
+    for body in invalid:
+        text = escape_invalid_placeholders(body.text)
+        escaped, _ = MessageBody.objects.get_or_create(
+            digest=body_digest(text),
+            defaults={"text": text, "parameters": compile_body(text).parameters},
+        )
+        MessageTemplate.objects.filter(message_body_id=body.digest).update(
+            message_body=escaped
+        )
+        body.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("message_template", "0005_message_body"),
+    ]
+
+    operations = [
+        migrations.RunPython(escape_bodies, migrations.RunPython.noop),
+    ]
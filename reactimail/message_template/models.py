@@ -1,12 +1,26 @@
-import re
-from string import Template
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.expressions import ArraySubquery
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramSimilarity,
+)
+from datetime import timedelta
+from typing import Iterable, Literal
 
+from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import Exists, F, Func, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 from tag.models import Tag
 from reactimail.models import BaseModelMixin
-
-body_parameter_pattern = re.compile(r"\$\{(\w+)\}")
+from .compiler import CompiledTemplate, body_digest, get_compiled
 
 
 class MessageTemplateTypes(models.TextChoices):
@@ -16,6 +30,249 @@ class MessageTemplateTypes(models.TextChoices):
     HTML = "html"
 
 
+SEARCH_CONFIG = "english"
+"""The text search configuration of the title and body search vectors."""
+
+
+STORE_REFRESH_AGE = timedelta(minutes=10)
+"""How old a stored body gets before storing it again refreshes its `created_at`."""
+
+MIN_PRUNE_AGE = 2 * STORE_REFRESH_AGE
+"""The least age of the bodies `unused()` answers."""
+
+
+class MessageBodyQuerySet(models.QuerySet):
+    def store(self, bodies: Iterable[str]) -> dict[str, "MessageBody"]:
+        """Save the bodies not stored yet, and return all of them by text.
+
+        Only new bodies are parsed, and their compiled form is cached. Stored
+        bodies older than `STORE_REFRESH_AGE` get a new `created_at` first, so
+        that pruning them (see `unused()`) can't race with saving the templates
+        about to use them: a body pruned meanwhile is not found, and stored
+        again.
+
+        Raises:
+            ValueError: If a body contains a malformed `${` placeholder.
+        """
+        digests = {body: body_digest(body) for body in bodies}
+        now = timezone.now()
+        self.filter(
+            digest__in=digests.values(), created_at__lt=now - STORE_REFRESH_AGE
+        ).update(created_at=now)
+        stored = dict(
+            self.filter(digest__in=digests.values()).values_list("digest", "parameters")
+        )
+        new = [
+            MessageBody(
+                digest=digest,
+                text=body,
+                parameters=get_compiled(body, digest).parameters,
+            )
+            for body, digest in digests.items()
+            if digest not in stored
+        ]
+        # Another process may store the same body meanwhile.
+        self.bulk_create(new, ignore_conflicts=True)
+        stored.update((body.digest, body.parameters) for body in new)
+
+        result = {}
+        for body, digest in digests.items():
+            instance = MessageBody(digest=digest, text=body, parameters=stored[digest])
+            instance._state.adding = False
+            result[body] = instance
+        return result
+
+    def unused(self, min_age: timedelta = timedelta(hours=1)):
+        """Bodies no template uses, stored at least `min_age` ago.
+
+        The age keeps bodies stored for templates being saved right now.
+
+        Raises:
+            ValueError: If `min_age` is under `MIN_PRUNE_AGE`.
+        """
+        if min_age < MIN_PRUNE_AGE:
+            raise ValueError(f"The age must be at least {MIN_PRUNE_AGE}.")
+        return self.filter(
+            message_templates__isnull=True, created_at__lt=timezone.now() - min_age
+        )
+
+
+class MessageBody(models.Model):
+    """A message body, stored once however many templates use it."""
+
+    digest = models.CharField(
+        primary_key=True,
+        max_length=64,
+        editable=False,
+        verbose_name="Digest",
+        help_text="The SHA-256 of the text, in hex",
+    )
+    text = models.TextField(verbose_name="Text")
+    parameters = ArrayField(
+        models.CharField(max_length=200),
+        default=list,
+        blank=True,
+        verbose_name="Parameters",
+        help_text="The sorted parameter names in the text",
+    )
+    search_vector = models.GeneratedField(
+        expression=SearchVector("text", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="Search Vector",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = MessageBodyQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["parameters"], name="message_body_params_gin"),
+            GinIndex(fields=["search_vector"], name="message_body_search_gin"),
+        ]
+        verbose_name = "Message Body"
+        verbose_name_plural = "Message Bodies"
+
+    def __str__(self):
+        return self.digest
+
+
+class TagMatches(models.TextChoices):
+    ALL = "all", "All tags"
+    ANY = "any", "Any tag"
+
+
+def _store_bodies(bodies: Iterable[str]) -> dict[str, MessageBody]:
+    """`MessageBody.objects.store()` for templates.
+
+    Raises:
+        ValidationError: Of the body field, if a body contains a malformed
+            `${` placeholder.
+    """
+    try:
+        return MessageBody.objects.store(bodies)
+    except ValueError as e:
+        raise ValidationError({"body": f"Template syntax error: {e}"}) from e
+
+
+class MessageTemplateQuerySet(models.QuerySet):
+    def search(self, query: str):
+        """Full-text search over title and body, plus fuzzy title matches.
+
+        Matches are the UNION of the templates matching each condition, each
+        answered by an index: the title and body vectors and the title trigrams
+        by their GIN indexes, the templates of matching bodies by the body
+        index. Each branch keeps the filters of the queryset (e.g. the
+        account), so only those templates are collected. An OR of the
+        conditions (on the joined body) would make Postgres scan every template
+        instead. Results are ordered by rank, then by title similarity.
+        """
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        vector = Func(
+            F("search_vector"),
+            F("message_body__search_vector"),
+            arg_joiner=" || ",
+            template="(%(expressions)s)",
+            output_field=SearchVectorField(),
+        )
+        templates = self.order_by()
+        return (
+            self.filter(
+                pk__in=templates.filter(search_vector=search_query)
+                .values("pk")
+                .union(
+                    templates.filter(
+                        message_body_id__in=MessageBody.objects.filter(
+                            search_vector=search_query
+                        ).values("digest")
+                    ).values("pk"),
+                    templates.filter(title__trigram_similar=query).values("pk"),
+                )
+            )
+            .annotate(
+                rank=SearchRank(vector, search_query),
+                similarity=TrigramSimilarity("title", query),
+            )
+            .order_by("-rank", "-similarity", "title", "id")
+        )
+
+    def using_parameter(self, name: str):
+        """Templates whose body has `${name}`, answered by the GIN index."""
+        return self.filter(message_body__parameters__contains=[name])
+
+    def with_tags(self, tag_ids: Iterable, match: Literal["all", "any"] = "all"):
+        """Templates having all (or with `match="any"`, any) of the tags.
+
+        Answered in the same query by the indexes of the tags table of
+        templates: "any" is one semi-join on its tag index, "all" one EXISTS
+        per tag on its unique (template, tag) index. Unlike grouping the rows
+        of all tags by template, this lets Postgres either probe each template
+        of the page in order or scan the rows of a rare tag, whichever is
+        cheaper.
+        """
+        tag_ids = set(tag_ids)
+        links = self.model.tags.through.objects
+        if match == TagMatches.ANY or len(tag_ids) == 1:
+            if not tag_ids:
+                return self
+            return self.filter(
+                pk__in=links.filter(tag_id__in=tag_ids).values("messagetemplate_id")
+            )
+        return self.filter(
+            *(
+                Exists(links.filter(messagetemplate_id=OuterRef("pk"), tag_id=tag_id))
+                for tag_id in tag_ids
+            )
+        )
+
+    def with_tag_names(self):
+        """Aggregate sorted tag names in the same query, for `tag_names`.
+
+        A correlated subquery rather than a join with GROUP BY, so that it is
+        only evaluated for the rows of a page (see `KeysetPaginationMixin`).
+        """
+        tag_names = (
+            Tag.objects.filter(message_templates=OuterRef("pk"))
+            .order_by()
+            .values("message_templates")
+            .annotate(names=StringAgg("name", delimiter=",", ordering="name"))
+            .values("names")
+        )
+        return self.annotate(
+            tag_names_agg=Coalesce(
+                Subquery(tag_names), Value(""), output_field=models.TextField()
+            )
+        )
+
+    def with_tag_list(self):
+        """Annotate `tag_list`, the list of sorted tag names, in the same query."""
+        tag_names = Tag.objects.filter(message_templates=OuterRef("pk")).values("name")
+        return self.annotate(tag_list=ArraySubquery(tag_names.order_by("name")))
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # Store the bodies set on the templates, like save() does.
+        objs = list(objs)
+        if pending := [obj for obj in objs if obj._body is not None]:
+            bodies = _store_bodies({obj._body for obj in pending})
+            for obj in pending:
+                obj.message_body = bodies[obj._body]
+                obj._body = None
+        return super().bulk_create(objs, *args, **kwargs)
+
+
+class MessageTemplateManager(
+    models.Manager.from_queryset(MessageTemplateQuerySet)  # type: ignore[misc]
+):
+    def get_queryset(self):
+        # Bodies are read through `body`, and search vectors only used in SQL.
+        return (
+            super()
+            .get_queryset()
+            .select_related("message_body")
+            .defer("search_vector", "message_body__search_vector")
+        )
+
+
 class MessageTemplate(BaseModelMixin):
 
     TYPES = MessageTemplateTypes
@@ -38,8 +295,15 @@ class MessageTemplate(BaseModelMixin):
         verbose_name="Message Title",
         help_text="The title of the message template",
     )
-    body = models.TextField(
-        verbose_name="Message Body", help_text="The body of the message template"
+    message_body = models.ForeignKey(
+        MessageBody,
+        on_delete=models.PROTECT,
+        related_name="message_templates",
+        editable=False,
+        # Indexed in Meta, without the LIKE index of text columns.
+        db_index=False,
+        verbose_name="Message Body",
+        help_text="The body of the message template, shared by equal bodies",
     )
     tags = models.ManyToManyField(
         Tag,
@@ -48,18 +312,79 @@ class MessageTemplate(BaseModelMixin):
         verbose_name="Tags",
         help_text="Tags associated with this message template",
     )
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name="Search Vector",
+    )
+
+    _body: str | None = None
+    """A body set on the instance, stored on save."""
+
+    objects = MessageTemplateManager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["account", "title", "id"], name="message_template_keyset_idx"
+            ),
+            models.Index(fields=["message_body"], name="message_template_body_idx"),
+            GinIndex(fields=["search_vector"], name="message_template_search_gin"),
+            GinIndex(
+                fields=["title"],
+                name="message_template_title_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ]
+
+    @property
+    def body(self) -> str:
+        if self._body is not None:
+            return self._body
+        return self.message_body.text
+
+    @body.setter
+    def body(self, text: str) -> None:
+        self._body = text
 
     @property
     def body_parameters(self) -> list[str]:
-        tmpl = Template(self.body)
-        return sorted(body_parameter_pattern.findall(tmpl.template))
+        """The sorted parameter names in the body."""
+        if self._body is not None:
+            return self.compiled_body.parameters
+        return self.message_body.parameters
+
+    def save(self, *args, **kwargs):
+        if self._body is not None:
+            [self.message_body] = _store_bodies([self._body]).values()
+            self._body = None
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "body" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "message_body"} - {"body"}
+        super().save(*args, **kwargs)
+
+    @property
+    def compiled_body(self) -> CompiledTemplate:
+        if self._body is not None:
+            return get_compiled(self._body)
+        return get_compiled(self.message_body.text, self.message_body_id)
 
     @property
     def tag_names(self) -> str:
-        return ",".join(tag.name for tag in self.tags.order_by("name").all())
+        """Comma separated tag names, sorted by name.
+
+        Uses the `with_tag_names()` annotation or prefetched tags when present,
+        otherwise runs one query.
+        """
+        if hasattr(self, "tag_names_agg"):
+            return self.tag_names_agg
+        # Tags are ordered by name by default, which also keeps prefetches usable.
+        return ",".join(tag.name for tag in self.tags.all())
 
     def __str__(self):
         v = self.title
-        if self.tag_names != "":
-            v = v + f" (tags={self.tag_names})"
+        tag_names = self.tag_names
+        if tag_names != "":
+            v = v + f" (tags={tag_names})"
         return v
@@ -0,0 +1,193 @@
+"""Streaming bulk rendering of one message template over many parameter rows.
+
+The pipeline is a chain of generators (read rows, validate, substitute,
+write), so memory use stays constant however large the input is. Rendering
+can be fanned out to worker processes in chunks.
+"""
+
+import csv
+import json
+from collections import deque
+from dataclasses import dataclass
+from itertools import islice
+from time import perf_counter
+from typing import IO, Iterable, Iterator, Mapping
+
+from .compiler import CompiledTemplate
+
+FORMATS = ("csv", "jsonl")
+"""Supported formats of the parameter rows."""
+
+
+@dataclass(frozen=True)
+class InvalidRow:
+    """An input line that is not a row, e.g. malformed JSON."""
+
+    error: str
+
+
+@dataclass(frozen=True)
+class RenderedRow:
+    """The result for one input row. `line` counts data rows from 1."""
+
+    line: int
+    body: str | None = None
+    missing: tuple[str, ...] = ()
+    error: str | None = None
+    """Why the row is invalid, if it is."""
+
+    def as_dict(self) -> dict:
+        if self.error is not None:
+            return {"line": self.line, "error": self.error}
+        if self.body is None:
+            return {
+                "line": self.line,
+                "error": f"Missing parameters: {', '.join(self.missing)}",
+            }
+        return {"line": self.line, "body": self.body}
+
+
+@dataclass
+class RenderStats:
+    rows: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def read_rows(
+    stream: IO[str], format: str
+) -> Iterator[Mapping[str, object] | InvalidRow]:
+    """Yield parameter rows from a CSV (with header) or JSONL stream.
+
+    A malformed JSON line is yielded as an InvalidRow, so the other rows are
+    still read. A JSON line may be any value, not only an object.
+
+    Raises ValueError for an unsupported format, and the errors of reading
+    the stream (e.g. UnicodeDecodeError, csv.Error).
+    """
+    if format == "csv":
+        yield from csv.DictReader(stream)
+    elif format == "jsonl":
+        for line in stream:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield InvalidRow(f"Invalid JSON: {e}")
+    else:
+        raise ValueError(f"Unsupported format: {format}")
+
+
+def render_row(
+    compiled: CompiledTemplate, line: int, row: Mapping[str, object] | InvalidRow
+) -> RenderedRow:
+    """Validate one row against the template's parameters and substitute it.
+
+    A None value (e.g. of a short CSV row) is a missing parameter.
+    """
+    if isinstance(row, InvalidRow):
+        return RenderedRow(line=line, error=row.error)
+    if not isinstance(row, Mapping):
+        return RenderedRow(line=line, error="A row must be an object.")
+    missing = tuple(sorted({slot for slot in compiled.slots if row.get(slot) is None}))
+    if missing:
+        return RenderedRow(line=line, missing=missing)
+    return RenderedRow(line=line, body=compiled.render(row))
+
+
+def preview_row(compiled: CompiledTemplate, row: Mapping[str, object]) -> dict:
+    """Render one parameter set for a preview.
+
+    Returns the body (None if parameters are missing), and the `missing` and
+    `extra` (not in the body) parameter names.
+    """
+    result = render_row(compiled, 1, row)
+    return {
+        "body": result.body,
+        "missing": list(result.missing),
+        "extra": sorted(set(row) - set(compiled.slots)),
+    }
+
+
+_worker_template: CompiledTemplate | None = None
+
+
+def _init_worker(compiled: CompiledTemplate) -> None:
+    global _worker_template
+    _worker_template = compiled
+
+
+def _render_chunk(
+    chunk: list[tuple[int, Mapping[str, object] | InvalidRow]]
+) -> list[RenderedRow]:
+    assert _worker_template is not None
+    return [render_row(_worker_template, line, row) for line, row in chunk]
+
+
+def render_rows(
+    compiled: CompiledTemplate,
+    rows: Iterable[Mapping[str, object] | InvalidRow],
+    workers: int = 1,
+    chunk_size: int = 1000,
+) -> Iterator[RenderedRow]:
+    """Render rows in input order.
+
+    With more than one worker, chunks of `chunk_size` rows are sent to a
+    process pool, and at most two chunks per worker are in flight at a time.
+    """
+    numbered = enumerate(rows, start=1)
+    if workers <= 1:
+        for line, row in numbered:
+            yield render_row(compiled, line, row)
+        return
+
+    # Not imported by the web workers, which never render in a pool.
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(compiled,)
+    ) as executor:
+        pending: deque = deque()
+        while chunk := list(islice(numbered, chunk_size)):
+            pending.append(executor.submit(_render_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def write_rows(
+    results: Iterable[RenderedRow], stream: IO[str], stats: RenderStats
+) -> None:
+    """Write one JSON object per result and count them into `stats`."""
+    for result in results:
+        stats.rows += 1
+        if result.body is None:
+            stats.failed += 1
+        stream.write(json.dumps(result.as_dict(), ensure_ascii=False) + "\n")
+
+
+def bulk_render(
+    compiled: CompiledTemplate,
+    source: IO[str],
+    destination: IO[str],
+    format: str = "csv",
+    workers: int = 1,
+    chunk_size: int = 1000,
+) -> RenderStats:
+    """Render every row of `source` into `destination` as JSON lines.
+
+    Example:
+        with open("rows.csv") as src, open("out.jsonl", "w") as dst:
+            stats = bulk_render(template.compiled_body, src, dst)
+    """
+    stats = RenderStats()
+    started = perf_counter()
+    rows = read_rows(source, format)
+    write_rows(render_rows(compiled, rows, workers, chunk_size), destination, stats)
+    stats.seconds = perf_counter() - started
+    return stats
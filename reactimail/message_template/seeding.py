@@ -0,0 +1,191 @@
+"""Synthetic data for load tests: accounts, their tags and message templates.
+
+Rows are generated from a preloaded word list (no `Faker()` per row) and all
+accounts share one pre-hashed password. Accounts and tags are saved with
+`bulk_create()`. Message templates are generated in jobs of `job_size` rows,
+which worker processes run in parallel, and loaded with Postgres COPY like
+imports are (their bodies with `MessageBody.objects.store()`).
+
+Tags are used with a realistic fan-out: a few tags are on most templates,
+most tags are on a few (Zipf-like popularity), and a template has 0 to 5 tags.
+"""
+
+import random
+from dataclasses import dataclass
+from itertools import accumulate
+from time import perf_counter
+from uuid import UUID, uuid4
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from reactimail.words import load_words, random_nickname
+from reactimail.workers import django_process_pool
+from tag.models import Tag
+from .models import MessageBody, MessageTemplate, MessageTemplateTypes
+from .transfer import COPY_COLUMNS, copy_rows
+
+PARAMETERS = (
+    "first_name",
+    "last_name",
+    "company",
+    "order_id",
+    "amount",
+    "date",
+    "coupon_code",
+    "plan",
+    "url",
+)
+"""The parameter names used in generated bodies."""
+
+TAGS_PER_TEMPLATE_WEIGHTS = (20, 35, 25, 12, 5, 3)
+"""The relative frequency of templates with 0, 1, 2, ... tags."""
+
+
+def tag_names(rng: random.Random, words: tuple[str, ...], count: int) -> list[str]:
+    """`count` distinct tag names."""
+    if count <= len(words):
+        return rng.sample(words, count)
+    return [f"{rng.choice(words)}-{n}" for n in range(count)]
+
+
+def random_body(rng: random.Random, words: tuple[str, ...]) -> str:
+    sentences = []
+    for _ in range(rng.randint(2, 6)):
+        sentence = rng.choices(words, k=rng.randint(5, 12))
+        sentence[rng.randrange(len(sentence))] = f"${{{rng.choice(PARAMETERS)}}}"
+        sentences.append(" ".join(sentence).capitalize() + ".")
+    return f"Dear ${{first_name}},\n\n{' '.join(sentences)}\n"
+
+
+@dataclass
+class SeedStats:
+    accounts: int = 0
+    tags: int = 0
+    templates: int = 0
+    seconds: float = 0.0
+
+    @property
+    def templates_per_second(self) -> float:
+        return self.templates / self.seconds if self.seconds else 0.0
+
+
+@dataclass(frozen=True)
+class _TemplateJob:
+    account_id: UUID
+    tag_ids: tuple
+    start: int
+    count: int
+    seed: str
+
+
+def _seed_templates(job: _TemplateJob) -> int:
+    rng = random.Random(f"{job.seed}:{job.account_id}:{job.start}")
+    words = load_words()
+    types = MessageTemplateTypes.values
+    # The first tags are the most popular ones.
+    tag_weights = list(accumulate(1 / rank for rank in range(1, len(job.tag_ids) + 1)))
+    tag_counts = range(len(TAGS_PER_TEMPLATE_WEIGHTS))
+
+    templates = []
+    tag_links: list[tuple[UUID, int]] = []
+    for n in range(job.start, job.start + job.count):
+        pk = uuid4()
+        title = f"{' '.join(rng.choices(words, k=3)).capitalize()} {n}"
+        templates.append((pk, rng.choice(types), title, random_body(rng, words)))
+        if job.tag_ids:
+            [count] = rng.choices(tag_counts, weights=TAGS_PER_TEMPLATE_WEIGHTS)
+            tags = set(rng.choices(job.tag_ids, cum_weights=tag_weights, k=count))
+            tag_links.extend((pk, tag_id) for tag_id in tags)
+
+    bodies = MessageBody.objects.store({body for *_, body in templates})
+    now = timezone.now()
+    tags_field = MessageTemplate.tags.field
+    with transaction.atomic(), connection.cursor() as cursor:
+        copy_rows(
+            cursor,
+            MessageTemplate,
+            COPY_COLUMNS,
+            (
+                (pk, now, now, job.account_id, type, title, bodies[body].digest)
+                for pk, type, title, body in templates
+            ),
+        )
+        copy_rows(
+            cursor,
+            tags_field.remote_field.through,
+            (tags_field.m2m_column_name(), tags_field.m2m_reverse_name()),
+            tag_links,
+        )
+    return len(templates)
+
+
+def seed(
+    accounts: int,
+    tags: int,
+    templates: int,
+    password: str = "password",
+    workers: int = 1,
+    job_size: int = 10_000,
+    seed: str | None = None,
+) -> SeedStats:
+    """Create `accounts` accounts, each with `tags` tags and `templates` templates.
+
+    Accounts are named `seed-<run>-<n>@example.com`. `seed` makes the
+    generated content reproducible.
+
+    Raises ValueError if the accounts of run `seed` already exist.
+
+    Example:
+        stats = seed(accounts=100, tags=50, templates=10_000, workers=4)
+    """
+    stats = SeedStats()
+    started = perf_counter()
+    run = seed or uuid4().hex[:8]
+    rng = random.Random(run)
+    words = load_words()
+    User = get_user_model()
+    emails = [f"seed-{run}-{n}@example.com" for n in range(accounts)]
+    if User.objects.filter(email__in=emails).exists():
+        raise ValueError(
+            f"The accounts of seed {run} already exist, use another --seed."
+        )
+
+    # One hash for every account, as hashing is deliberately slow.
+    encoded_password = make_password(password)
+    users = User.objects.bulk_create(
+        (
+            User(
+                email=email,
+                nickname=random_nickname(rng, words),
+                password=encoded_password,
+            )
+            for email in emails
+        ),
+        batch_size=2_000,
+    )
+    stats.accounts = len(users)
+
+    jobs: list[_TemplateJob] = []
+    for user in users:
+        account_tags = [
+            Tag(account_id=user.pk, name=name) for name in tag_names(rng, words, tags)
+        ]
+        Tag.objects.bulk_create(account_tags, batch_size=2_000)
+        stats.tags += len(account_tags)
+        tag_ids = tuple(tag.pk for tag in account_tags)
+        jobs.extend(
+            _TemplateJob(user.pk, tag_ids, start, min(job_size, templates - start), run)
+            for start in range(0, templates, job_size)
+        )
+
+    if workers <= 1:
+        stats.templates = sum(map(_seed_templates, jobs))
+    else:
+        with django_process_pool(workers) as executor:
+            stats.templates = sum(executor.map(_seed_templates, jobs))
+
+    stats.seconds = perf_counter() - started
+    return stats
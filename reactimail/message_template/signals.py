@@ -0,0 +1,36 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reactimail.cache import invalidate_listings
+
+from .models import MessageTemplate
+
+
+@receiver([post_save, post_delete], sender=MessageTemplate)
+def invalidate_message_template_listings(sender, instance, **kwargs):
+    invalidate_listings(instance.account_id)
+
+
+@receiver(m2m_changed, sender=MessageTemplate.tags.through)
+def invalidate_message_template_tags_listings(sender, instance, action, **kwargs):
+    # The instance is a message template or a tag, both belong to one account.
+    if action.startswith("post_"):
+        invalidate_listings(instance.account_id)
+
+
+@receiver(m2m_changed, sender=MessageTemplate.tags.through)
+def touch_message_templates_of_changed_tags(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    # The tags are part of a message template (e.g. of its API ETag), so
+    # changing them updates the template.
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        templates = MessageTemplate.objects.filter(pk=instance.pk)
+    elif reverse and action in ("post_add", "post_remove"):
+        templates = MessageTemplate.objects.filter(pk__in=pk_set)
+    elif reverse and action == "pre_clear":
+        templates = instance.message_templates.all()
+    else:
+        return
+    templates.update(updated_at=timezone.now())
@@ -0,0 +1,149 @@
+"""Set-based changes of the tags of many message templates at once.
+
+Each operation is one SQL statement on the tags table of message templates.
+It also sets `updated_at` of the changed templates, as the `m2m_changed`
+handlers do, and answers the number of changed templates per account.
+Inserts are conflict-safe (ON CONFLICT DO NOTHING), so concurrent changes and
+templates already having a tag are fine.
+
+No signal is sent per row: the listings of the changed accounts are
+invalidated once, after the statement.
+"""
+
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from reactimail.cache import invalidate_listings
+from tag.models import Tag
+from .models import MessageTemplate
+
+_TOUCH = """
+touched AS (
+    UPDATE {templates} SET {updated_at} = %s
+    WHERE {id} IN (SELECT {template_id} FROM changed)
+    RETURNING {account_id}
+)
+SELECT {account_id}, COUNT(*) FROM touched GROUP BY {account_id}
+"""
+
+
+def _names() -> dict[str, str]:
+    quote = connection.ops.quote_name
+    field = MessageTemplate.tags.field
+    return {
+        "templates": quote(MessageTemplate._meta.db_table),
+        "tags": quote(Tag._meta.db_table),
+        "links": quote(field.remote_field.through._meta.db_table),
+        "template_id": quote(field.m2m_column_name()),
+        "tag_id": quote(field.m2m_reverse_name()),
+        "id": quote("id"),
+        "account_id": quote("account_id"),
+        "updated_at": quote("updated_at"),
+    }
+
+
+def _subquery(queryset: QuerySet) -> tuple[str, tuple]:
+    """`(SELECT id, account_id ...)` of the queryset, as `sql, params`."""
+    sql, params = (
+        queryset.order_by().values_list("pk", "account_id").query.sql_with_params()
+    )
+    return f"({sql})", params
+
+
+def _run(sql: str, params, *account_ids) -> dict:
+    """Run a statement ending with `_TOUCH`, then invalidate listings once."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        changed = dict(cursor.fetchall())
+    invalidate_listings(*changed, *account_ids)
+    return changed
+
+
+def add_tags(templates: QuerySet, tags: QuerySet) -> int:
+    """Add `tags` to the `templates`, and answer the number of changed templates.
+
+    A template only gets the tags of its own account.
+
+    Example:
+        add_tags(
+            MessageTemplate.objects.filter(account=account, title__startswith="Spring"),
+            Tag.objects.filter(account=account, name__in=["campaign", "spring"]),
+        )
+    """
+    templates_sql, templates_params = _subquery(templates)
+    tags_sql, tags_params = _subquery(tags)
+    sql = (
+        """
+        WITH changed AS (
+            INSERT INTO {links} ({template_id}, {tag_id})
+            SELECT t.id, g.id
+            FROM {templates_sql} AS t (id, account_id),
+                {tags_sql} AS g (id, account_id)
+            WHERE t.account_id = g.account_id
+            ON CONFLICT DO NOTHING
+            RETURNING {template_id}
+        ),
+        """
+        + _TOUCH
+    ).format(templates_sql=templates_sql, tags_sql=tags_sql, **_names())
+    changed = _run(sql, (*templates_params, *tags_params, timezone.now()))
+    return sum(changed.values())
+
+
+def remove_tags(templates: QuerySet, tags: QuerySet) -> int:
+    """Remove `tags` from the `templates`, answering the number of changed ones."""
+    templates_sql, templates_params = _subquery(templates)
+    tags_sql, tags_params = _subquery(tags)
+    sql = (
+        """
+        WITH changed AS (
+            DELETE FROM {links}
+            WHERE {template_id} IN (
+                SELECT t.id FROM {templates_sql} AS t (id, account_id)
+            )
+            AND {tag_id} IN (SELECT g.id FROM {tags_sql} AS g (id, account_id))
+            RETURNING {template_id}
+        ),
+        """
+        + _TOUCH
+    ).format(templates_sql=templates_sql, tags_sql=tags_sql, **_names())
+    changed = _run(sql, (*templates_params, *tags_params, timezone.now()))
+    return sum(changed.values())
+
+
+def merge_tags(sources, target: Tag) -> int:
+    """Move the templates of the `sources` tags to `target`, and delete `sources`.
+
+    Answers the number of changed templates. The tags are deleted in the same
+    statement, without their delete signals.
+
+    Raises ValueError if a source tag belongs to another account than `target`.
+    """
+    sources = [tag for tag in sources if tag.pk != target.pk]
+    if any(tag.account_id != target.account_id for tag in sources):
+        raise ValueError("Only tags of the same account can be merged.")
+    source_ids = [tag.pk for tag in sources]
+    if not source_ids:
+        return 0
+    sql = (
+        """
+        WITH moved AS (
+            INSERT INTO {links} ({template_id}, {tag_id})
+            SELECT {template_id}, %s FROM {links} WHERE {tag_id} = ANY(%s)
+            ON CONFLICT DO NOTHING
+        ),
+        changed AS (
+            DELETE FROM {links} WHERE {tag_id} = ANY(%s)
+            RETURNING {template_id}
+        ),
+        deleted AS (
+            DELETE FROM {tags} WHERE {id} = ANY(%s)
+        ),
+        """
+        + _TOUCH
+    ).format(**_names())
+    params = (target.pk, source_ids, source_ids, source_ids, timezone.now())
+    # The tags changed even if no template did.
+    changed = _run(sql, params, target.account_id)
+    return sum(changed.values())
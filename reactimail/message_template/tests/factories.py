@@ -1,6 +1,7 @@
 import factory
 
-from message_template.models import MessageTemplate
+from message_template.compiler import body_digest
+from message_template.models import MessageBody, MessageTemplate
 
 
 class MessageTemplateFactory(factory.django.DjangoModelFactory):
@@ -11,3 +12,11 @@ class MessageTemplateFactory(factory.django.DjangoModelFactory):
     type = MessageTemplate.TYPES.TEXT
     title = factory.Sequence(lambda n: f"title{n}")
     body = factory.Sequence(lambda n: f"body{n}")
+
+
+def unchecked_body_template(body: str, **kwargs) -> MessageTemplate:
+    """A template whose body was saved before placeholders were checked."""
+    template = MessageTemplateFactory(**kwargs)
+    message_body = MessageBody.objects.create(digest=body_digest(body), text=body)
+    MessageTemplate.objects.filter(pk=template.pk).update(message_body=message_body)
+    return MessageTemplate.objects.get(pk=template.pk)
@@ -0,0 +1,70 @@
+import pytest
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+from tag.tests.factories import TagFactory
+from .factories import MessageTemplateFactory
+
+
+@pytest.mark.django_db
+class TestMessageTemplateAPI:
+    def test_list(self, client):
+        account = AccountFactory()
+        template = MessageTemplateFactory(account=account, body="Dear ${name}")
+        template.tags.set([TagFactory(account=account, name=n) for n in ("b", "a")])
+        MessageTemplateFactory()
+
+        client.force_login(account)
+        response = client.get(reverse("message_template_api:list"))
+
+        assert response.status_code == 200
+        [result] = response.json()["results"]
+        assert result["id"] == str(template.pk)
+        assert result["body_parameters"] == ["name"]
+        assert result["tags"] == ["a", "b"]
+
+    def test_detail_not_modified(self, client, django_assert_num_queries):
+        """Should be answered 304 without serializing or querying tags."""
+        account = AccountFactory()
+        template = MessageTemplateFactory(account=account)
+        template.tags.add(TagFactory(account=account))
+
+        client.force_login(account)
+        url = reverse("message_template_api:detail", args=[template.pk])
+        etag = client.get(url)["ETag"]
+        # updated_at only: the session and user are cached.
+        with django_assert_num_queries(1):
+            response = client.get(url, headers={"if-none-match": etag})
+
+        assert response.status_code == 304
+
+    @pytest.mark.parametrize("change", ["add", "remove", "rename", "delete_tag"])
+    def test_tag_changes_modify_template(self, client, change):
+        """Should be changed the ETag when the template's tags change."""
+        account = AccountFactory()
+        template = MessageTemplateFactory(account=account)
+        tag = TagFactory(account=account, name="a")
+        template.tags.add(tag)
+
+        client.force_login(account)
+        url = reverse("message_template_api:detail", args=[template.pk])
+        etag = client.get(url)["ETag"]
+        if change == "add":
+            template.tags.add(TagFactory(account=account, name="b"))
+        elif change == "remove":
+            tag.message_templates.remove(template)
+        elif change == "rename":
+            tag.name = "c"
+            tag.save()
+        else:
+            tag.delete()
+        response = client.get(url, headers={"if-none-match": etag})
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_others_template(self, client):
+        client.force_login(AccountFactory())
+        url = reverse("message_template_api:detail", args=[MessageTemplateFactory().pk])
+
+        assert client.get(url).status_code == 404
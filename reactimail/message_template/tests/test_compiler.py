@@ -0,0 +1,119 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test import override_settings
+
+from message_template.compiler import (
+    CompiledTemplateCache,
+    body_digest,
+    compile_body,
+    escape_invalid_placeholders,
+    get_compiled,
+)
+
+
+class TestCompileBody:
+    def test_segments_and_slots(self):
+        """Should split the body into literals around each placeholder."""
+        compiled = compile_body("Hello ${name}, order ${order_id}.")
+
+        assert compiled.segments == ("Hello ", ", order ", ".")
+        assert compiled.slots == ("name", "order_id")
+
+    def test_parameters_are_sorted(self):
+        compiled = compile_body("${b} ${a} ${c}")
+
+        assert compiled.parameters == ["a", "b", "c"]
+
+    def test_escaped_dollar(self):
+        """Should treat `$$` as a literal dollar, not a placeholder."""
+        compiled = compile_body("Price: $${amount} ${currency}")
+
+        assert compiled.slots == ("currency",)
+        assert compiled.render({"currency": "JPY"}) == "Price: ${amount} JPY"
+
+    def test_render(self):
+        compiled = compile_body("Dear ${last_name}, welcome ${last_name}!")
+
+        assert compiled.render({"last_name": "Sato"}) == "Dear Sato, welcome Sato!"
+
+    def test_render_missing_parameter(self):
+        compiled = compile_body("Dear ${last_name}")
+
+        with pytest.raises(KeyError):
+            compiled.render({})
+
+    @pytest.mark.parametrize(
+        "body, message",
+        [
+            ("Invalid body ${missing_curly", "line 1, col 14"),
+            ("first\nsecond ${}", "line 2, col 8"),
+        ],
+    )
+    def test_invalid_placeholder(self, body, message):
+        with pytest.raises(ValueError, match=message):
+            compile_body(body)
+
+    def test_escape_invalid_placeholders(self):
+        """Should escape only the malformed `${`, which then renders as is."""
+        body = escape_invalid_placeholders("${user.name} $${x} ${name} ${")
+
+        assert body == "$${user.name} $${x} ${name} $${"
+        assert (
+            compile_body(body).render({"name": "Sato"}) == "${user.name} ${x} Sato ${"
+        )
+
+
+class TestCompiledTemplateCache:
+    def test_hit_returns_same_object(self):
+        cache = CompiledTemplateCache(maxsize=2)
+
+        first = cache.get("digest-a", "${a}")
+
+        assert cache.get("digest-a", "${a}") is first
+
+    def test_evicts_least_recently_used(self):
+        cache = CompiledTemplateCache(maxsize=2)
+        first = cache.get("digest-a", "${a}")
+        cache.get("digest-b", "${b}")
+        cache.get("digest-a", "${a}")
+        cache.get("digest-c", "${c}")
+
+        assert list(cache._entries) == ["digest-a", "digest-c"]
+        assert cache.get("digest-a", "${a}") is first
+
+    @override_settings(
+        CACHES={"shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    )
+    def test_shared_tier(self):
+        """Should reuse a body compiled by another process."""
+        other_process = CompiledTemplateCache(maxsize=2, alias="shared")
+        other_process.get("digest-a", "${a}")
+        cache = CompiledTemplateCache(maxsize=2, alias="shared")
+
+        assert cache.get("digest-a", "${a}").slots == ("a",)
+        assert caches["shared"].get(f"{cache.key_prefix}:digest-a") is not None
+
+
+class TestGetCompiled:
+    def test_cached_by_body(self):
+        """Should compile equal bodies, e.g. of two templates, once."""
+        first = get_compiled("${a} ${b}")
+
+        assert get_compiled("${a} ${b}") is first
+        assert get_compiled("${a} ${b}", body_digest("${a} ${b}")) is first
+
+    def test_invalid_body(self):
+        with pytest.raises(ValueError):
+            get_compiled("${")
+
+    def test_digest_matches_postgres(self, db):
+        """Should be computed like the migration of existing bodies does."""
+        body = "Grüße ${name} 🎉"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT encode(sha256(convert_to(%s, 'UTF8')), 'hex')", [body]
+            )
+            [digest] = cursor.fetchone()
+
+        assert digest == body_digest(body)
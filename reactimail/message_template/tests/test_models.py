@@ -1,9 +1,19 @@
+from datetime import timedelta
+from importlib import import_module
+from io import StringIO
+
 import pytest
+from django.apps import apps
+from django.core.management import call_command
+from django.core.exceptions import ValidationError
+from django.core.management.base import CommandError
+from django.db.models import F
 
 from account.tests.factories import AccountFactory
 from tag.models import Tag
-from message_template.models import MessageTemplate
-from .factories import MessageTemplateFactory
+from message_template.compiler import body_digest
+from message_template.models import MessageBody, MessageTemplate
+from .factories import MessageTemplateFactory, unchecked_body_template
 
 
 @pytest.mark.django_db
@@ -52,3 +62,140 @@ class TestMessageTemplateModel:
         tag_names = message_template.tag_names
 
         assert tag_names == ""
+
+    def test_body_parameters_are_persisted(self):
+        """Should store the parameters on save, so lists don't parse bodies."""
+        user = AccountFactory()
+        message_template = MessageTemplateFactory(account=user, body="${b} ${a}")
+
+        message_template.body = "${c}"
+        message_template.save(update_fields=["body"])
+        message_template.refresh_from_db()
+
+        assert message_template.body_parameters == ["c"]
+
+    def test_using_parameter(self):
+        user = AccountFactory()
+        with_order = MessageTemplateFactory(account=user, body="Order ${order_id}")
+        MessageTemplateFactory(account=user, body="Hello ${name}")
+
+        found = MessageTemplate.objects.using_parameter("order_id")
+
+        assert list(found) == [with_order]
+
+    @pytest.mark.parametrize(
+        "match, expected", [("all", ["both"]), ("any", ["both", "vip only"])]
+    )
+    def test_with_tags(self, match, expected):
+        user = AccountFactory()
+        vip, new = Tag.objects.bulk_create(
+            [Tag(account=user, name="vip"), Tag(account=user, name="new")]
+        )
+        MessageTemplateFactory(account=user, title="both").tags.set([vip, new])
+        MessageTemplateFactory(account=user, title="vip only").tags.set([vip])
+        MessageTemplateFactory(account=user, title="untagged")
+
+        found = MessageTemplate.objects.with_tags([vip.pk, new.pk], match)
+
+        assert sorted(found.values_list("title", flat=True)) == expected
+        assert MessageTemplate.objects.with_tags([]).count() == 3
+
+
+@pytest.mark.django_db
+class TestMessageBody:
+    def test_equal_bodies_are_stored_once(self):
+        """Should share one stored body between templates of any account."""
+        first = MessageTemplateFactory(body="<p>Dear ${name}</p>")
+        second = MessageTemplateFactory(body="<p>Dear ${name}</p>")
+
+        assert MessageBody.objects.count() == 1
+        assert first.message_body_id == second.message_body_id
+        assert second.message_body_id == body_digest("<p>Dear ${name}</p>")
+        second.refresh_from_db()
+        assert second.body == "<p>Dear ${name}</p>"
+        assert second.body_parameters == ["name"]
+
+    def test_edit_does_not_change_other_templates(self):
+        first = MessageTemplateFactory(body="${a}")
+        second = MessageTemplateFactory(body="${a}")
+
+        first.body = "${b}"
+        first.save()
+
+        second.refresh_from_db()
+        assert second.body == "${a}"
+        assert MessageBody.objects.count() == 2
+
+    def test_bulk_create(self):
+        """Should store the bodies of bulk created templates."""
+        account = AccountFactory()
+
+        MessageTemplate.objects.bulk_create(
+            MessageTemplate(account=account, type="text", title=str(n), body="${x}")
+            for n in range(3)
+        )
+
+        assert MessageBody.objects.get().parameters == ["x"]
+        assert MessageTemplate.objects.using_parameter("x").count() == 3
+
+    def test_save_invalid_body(self):
+        template = MessageTemplateFactory.build(account=AccountFactory())
+        template.body = "Dear ${user.name}"
+
+        with pytest.raises(ValidationError) as excinfo:
+            template.save()
+
+        assert "body" in excinfo.value.message_dict
+        assert not MessageBody.objects.exists()
+
+    def test_escape_invalid_placeholders_migration(self):
+        """Should move templates to their body with the malformed `${` escaped."""
+        migration = import_module(
+            "message_template.migrations.0006_escape_invalid_placeholders"
+        )
+        template = unchecked_body_template("Dear ${user.name}")
+        valid = MessageTemplateFactory(body="Dear ${name}")
+
+        migration.escape_bodies(apps, None)
+
+        template.refresh_from_db()
+        assert template.body == "Dear $${user.name}"
+        assert template.body_parameters == []
+        assert not MessageBody.objects.filter(text="Dear ${user.name}").exists()
+        valid.refresh_from_db()
+        assert valid.body == "Dear ${name}"
+
+    def test_search_body(self):
+        template = MessageTemplateFactory(title="Hello", body="Your invoice is ready")
+
+        assert list(MessageTemplate.objects.search("invoice")) == [template]
+
+    def test_prune(self):
+        """Should delete old bodies no template uses, and keep the others."""
+        template = MessageTemplateFactory(body="old")
+        template.body = "new"
+        template.save()
+        MessageBody.objects.update(created_at=F("created_at") - timedelta(hours=2))
+        MessageBody.objects.store(["just stored"])
+        stderr = StringIO()
+
+        call_command("prune_message_bodies", stderr=stderr)
+
+        assert sorted(MessageBody.objects.values_list("text", flat=True)) == [
+            "just stored",
+            "new",
+        ]
+        assert "Deleted 1 unused message bodies" in stderr.getvalue()
+
+    def test_store_refreshes_old_bodies(self):
+        """Should keep a reused body from being pruned before its template is saved."""
+        MessageBody.objects.store(["reused"])
+        MessageBody.objects.update(created_at=F("created_at") - timedelta(hours=2))
+
+        MessageBody.objects.store(["reused"])
+
+        assert not MessageBody.objects.unused().exists()
+
+    def test_prune_min_age(self):
+        with pytest.raises(CommandError):
+            call_command("prune_message_bodies", min_age_minutes=1)
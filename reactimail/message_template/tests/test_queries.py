@@ -0,0 +1,69 @@
+"""Query-count regression tests: the number of queries must not grow with rows."""
+
+import pytest
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+from message_template.models import MessageTemplate
+from tag.tests.factories import TagFactory
+
+ROW_COUNTS = [10, 1_000, 10_000]
+
+
+def create_templates(account, count: int) -> None:
+    """Bulk create `count` templates with two tags each."""
+    tags = [TagFactory(account=account, name=name) for name in ("b", "a", "c")]
+    templates = MessageTemplate.objects.bulk_create(
+        MessageTemplate(
+            account=account,
+            type=MessageTemplate.TYPES.TEXT,
+            title=f"title{n}",
+            body=f"Dear ${{name}} {n}",
+        )
+        for n in range(count)
+    )
+    Through = MessageTemplate.tags.through
+    Through.objects.bulk_create(
+        Through(messagetemplate_id=template.id, tag_id=tag.id)
+        for template in templates
+        for tag in tags[:2]
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("count", ROW_COUNTS)
+class TestQueryCounts:
+    def test_str_with_tag_names(self, count, django_assert_num_queries):
+        account = AccountFactory()
+        create_templates(account, count)
+
+        with django_assert_num_queries(1):
+            names = [
+                str(t) for t in MessageTemplate.objects.with_tag_names().iterator()
+            ]
+
+        assert len(names) == count
+        assert all(name.endswith(" (tags=a,b)") for name in names)
+
+    def test_list_view(self, count, client, django_assert_num_queries):
+        account = AccountFactory()
+        create_templates(account, count)
+        client.force_login(account)
+
+        # user (cached from then on, like the session) and templates.
+        with django_assert_num_queries(2):
+            response = client.get(reverse("message_template:list"))
+
+        assert response.status_code == 200
+
+    def test_admin_changelist(self, count, admin_client, django_assert_num_queries):
+        account = AccountFactory()
+        create_templates(account, count)
+
+        # user, count (x2 for the filtered and total counts) and rows.
+        with django_assert_num_queries(4):
+            response = admin_client.get(
+                reverse("admin:message_template_messagetemplate_changelist")
+            )
+
+        assert response.status_code == 200
@@ -0,0 +1,154 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from account.tests.factories import AccountFactory
+from message_template.compiler import compile_body
+from message_template.render import InvalidRow, bulk_render, read_rows, render_rows
+from .factories import MessageTemplateFactory, unchecked_body_template
+
+
+class TestReadRows:
+    def test_csv(self):
+        rows = list(read_rows(StringIO("name,order_id\nSato,1\nSuzuki,2\n"), "csv"))
+
+        assert rows == [
+            {"name": "Sato", "order_id": "1"},
+            {"name": "Suzuki", "order_id": "2"},
+        ]
+
+    def test_jsonl_skips_blank_lines(self):
+        rows = list(
+            read_rows(StringIO('{"name": "Sato"}\n\n{"name": "Suzuki"}\n'), "jsonl")
+        )
+
+        assert rows == [{"name": "Sato"}, {"name": "Suzuki"}]
+
+    def test_jsonl_invalid_line(self):
+        """Should report a malformed line, and read the next ones."""
+        rows = list(read_rows(StringIO('{"name": \n{"name": "Sato"}\n'), "jsonl"))
+
+        assert isinstance(rows[0], InvalidRow)
+        assert rows[0].error.startswith("Invalid JSON")
+        assert rows[1] == {"name": "Sato"}
+
+    def test_unsupported_format(self):
+        with pytest.raises(ValueError):
+            list(read_rows(StringIO(""), "xml"))
+
+
+class TestRenderRows:
+    def test_reports_missing_parameters(self):
+        compiled = compile_body("Dear ${name}, order ${order_id}")
+        rows = [{"name": "Sato", "order_id": 1}, {"extra": "x"}]
+
+        results = list(render_rows(compiled, rows))
+
+        assert results[0].body == "Dear Sato, order 1"
+        assert results[1].body is None
+        assert results[1].missing == ("name", "order_id")
+
+    def test_none_is_missing(self):
+        """Should report the values missing from a short CSV row."""
+        compiled = compile_body("Dear ${name}, order ${order_id}")
+        rows = read_rows(StringIO("name,order_id\nSato\n"), "csv")
+
+        [result] = render_rows(compiled, rows)
+
+        assert result.missing == ("order_id",)
+        assert result.as_dict() == {"line": 1, "error": "Missing parameters: order_id"}
+
+    def test_invalid_rows(self):
+        compiled = compile_body("Dear ${name}")
+        rows = [InvalidRow("Invalid JSON: oops"), ["Sato"], {"name": "Sato"}]
+
+        results = [result.as_dict() for result in render_rows(compiled, rows)]
+
+        assert results == [
+            {"line": 1, "error": "Invalid JSON: oops"},
+            {"line": 2, "error": "A row must be an object."},
+            {"line": 3, "body": "Dear Sato"},
+        ]
+
+    def test_process_pool_keeps_order(self):
+        compiled = compile_body("${n}")
+        rows = ({"n": n} for n in range(1000))
+
+        results = list(render_rows(compiled, rows, workers=2, chunk_size=64))
+
+        assert [result.body for result in results] == [str(n) for n in range(1000)]
+        assert [result.line for result in results] == list(range(1, 1001))
+
+
+class TestBulkRender:
+    def test_writes_json_lines_and_counts(self):
+        compiled = compile_body("Dear ${name}")
+        destination = StringIO()
+
+        stats = bulk_render(compiled, StringIO("name\nSato\n\n"), destination)
+
+        assert [json.loads(line) for line in destination.getvalue().splitlines()] == [
+            {"line": 1, "body": "Dear Sato"},
+        ]
+        assert stats.rows == 1
+        assert stats.failed == 0
+
+
+@pytest.mark.django_db
+class TestRenderMessageTemplateCommand:
+    def test_render_jsonl_file(self, tmp_path):
+        template = MessageTemplateFactory(account=AccountFactory(), body="Dear ${name}")
+        source = tmp_path / "rows.jsonl"
+        source.write_text('{"name": "Sato"}\n{"other": 1}\n')
+        output = tmp_path / "out.jsonl"
+        stderr = StringIO()
+
+        call_command(
+            "render_message_template",
+            str(template.id),
+            str(source),
+            output=str(output),
+            stderr=stderr,
+        )
+
+        assert [json.loads(line) for line in output.read_text().splitlines()] == [
+            {"line": 1, "body": "Dear Sato"},
+            {"line": 2, "error": "Missing parameters: name"},
+        ]
+        assert "Rendered 2 rows (1 failed)" in stderr.getvalue()
+        assert "rows/sec" in stderr.getvalue()
+
+    def test_unknown_template(self, tmp_path):
+        source = tmp_path / "rows.csv"
+        source.write_text("name\n")
+
+        with pytest.raises(CommandError):
+            call_command(
+                "render_message_template",
+                "00000000-0000-0000-0000-000000000000",
+                str(source),
+            )
+
+    def test_invalid_body(self, tmp_path):
+        template = unchecked_body_template("Dear ${user.name}")
+        source = tmp_path / "rows.csv"
+        source.write_text("name\n")
+
+        with pytest.raises(CommandError, match="Template syntax error"):
+            call_command("render_message_template", str(template.id), str(source))
+
+    def test_unreadable_file(self, tmp_path):
+        """Should fail with a command error, e.g. for a file that isn't UTF-8."""
+        template = MessageTemplateFactory(body="Dear ${name}")
+        source = tmp_path / "rows.csv"
+        source.write_bytes("name\n\u540d\n".encode("shift_jis"))
+
+        with pytest.raises(CommandError, match="Cannot render"):
+            call_command("render_message_template", str(template.id), str(source))
+        with pytest.raises(CommandError, match="Cannot render"):
+            call_command(
+                "render_message_template", str(template.id), str(tmp_path / "no.csv")
+            )
@@ -0,0 +1,92 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from account.models import ReactiMailUser
+from message_template.compiler import compile_body
+from message_template.models import MessageTemplate
+from message_template.seeding import seed
+from tag.models import Tag
+
+
+@pytest.mark.django_db
+class TestSeed:
+    def test_seed(self):
+        stats = seed(accounts=2, tags=5, templates=30, job_size=7, seed="test")
+
+        assert (stats.accounts, stats.tags, stats.templates) == (2, 10, 60)
+        accounts = ReactiMailUser.objects.filter(email__startswith="seed-test-")
+        assert accounts.count() == 2
+        # All accounts share one hash, which still checks.
+        assert len({account.password for account in accounts}) == 1
+        assert accounts[0].check_password("password")
+        for account in accounts:
+            assert Tag.objects.filter(account=account).count() == 5
+            assert MessageTemplate.objects.filter(account=account).count() == 30
+        template = MessageTemplate.objects.filter(account__in=accounts).first()
+        assert template.body_parameters == compile_body(template.body).parameters
+        assert "first_name" in template.body_parameters
+
+    def test_tags_of_the_account(self):
+        seed(accounts=2, tags=3, templates=50, seed="test")
+
+        for template in MessageTemplate.objects.prefetch_related("tags"):
+            assert {tag.account_id for tag in template.tags.all()} <= {
+                template.account_id
+            }
+        assert MessageTemplate.tags.through.objects.exists()
+
+    def test_same_seed_again(self):
+        """Should refuse to create the same emails again."""
+        seed(accounts=1, tags=0, templates=1, seed="test")
+
+        with pytest.raises(ValueError, match="already exist"):
+            seed(accounts=1, tags=0, templates=1, seed="test")
+
+        assert ReactiMailUser.objects.filter(email__startswith="seed-").count() == 1
+
+    def test_without_tags(self):
+        stats = seed(accounts=1, tags=0, templates=3)
+
+        assert stats.templates == 3
+        assert not MessageTemplate.tags.through.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_seed_in_worker_processes():
+    stats = seed(accounts=2, tags=3, templates=20, workers=2, job_size=10)
+
+    assert stats.templates == 40
+    assert MessageTemplate.objects.count() == 40
+
+
+@pytest.mark.django_db
+class TestSeedCommand:
+    def test_seed(self):
+        stderr = StringIO()
+
+        call_command(
+            "seed_reactimail",
+            accounts=1,
+            tags=2,
+            templates=3,
+            seed="cmd",
+            stderr=stderr,
+        )
+
+        assert ReactiMailUser.objects.filter(email="seed-cmd-0@example.com").exists()
+        assert "Created 1 accounts, 2 tags and 3 message templates" in (
+            stderr.getvalue()
+        )
+
+    def test_same_seed_again(self):
+        call_command("seed_reactimail", accounts=1, templates=0, seed="cmd")
+
+        with pytest.raises(CommandError, match="already exist"):
+            call_command("seed_reactimail", accounts=1, templates=0, seed="cmd")
+
+    def test_negative(self):
+        with pytest.raises(CommandError):
+            call_command("seed_reactimail", templates=-1)
@@ -0,0 +1,224 @@
+import pytest
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+from message_template.models import MessageTemplate
+from message_template.tagging import add_tags, merge_tags, remove_tags
+from reactimail.cache import get_listing_version
+from tag.models import Tag
+from tag.tests.factories import TagFactory
+from .factories import MessageTemplateFactory
+
+
+def tag_names(template):
+    return MessageTemplate.objects.with_tag_names().get(pk=template.pk).tag_names
+
+
+@pytest.mark.django_db
+class TestTagging:
+    def test_add_tags(self):
+        account = AccountFactory()
+        vip = TagFactory(account=account, name="vip")
+        new = TagFactory(account=account, name="new")
+        tagged, untagged = MessageTemplateFactory.create_batch(2, account=account)
+        tagged.tags.add(vip)
+        other = MessageTemplateFactory()
+        version = get_listing_version(account.pk)
+
+        updated = add_tags(
+            MessageTemplate.objects.filter(pk__in=[tagged.pk, untagged.pk, other.pk]),
+            Tag.objects.filter(pk__in=[vip.pk, new.pk]),
+        )
+
+        assert updated == 2
+        assert tag_names(tagged) == "new,vip"
+        assert tag_names(untagged) == "new,vip"
+        # Tags of another account are not added.
+        assert tag_names(other) == ""
+        assert get_listing_version(account.pk) == version + 1
+
+    def test_add_tags_again(self):
+        account = AccountFactory()
+        vip = TagFactory(account=account)
+        template = MessageTemplateFactory(account=account)
+        template.tags.add(vip)
+        updated_at = MessageTemplate.objects.get(pk=template.pk).updated_at
+
+        updated = add_tags(
+            MessageTemplate.objects.filter(pk=template.pk),
+            Tag.objects.filter(pk=vip.pk),
+        )
+
+        assert updated == 0
+        assert MessageTemplate.objects.get(pk=template.pk).updated_at == updated_at
+
+    def test_remove_tags(self):
+        account = AccountFactory()
+        vip, new = TagFactory.create_batch(2, account=account)
+        template = MessageTemplateFactory(account=account)
+        template.tags.add(vip, new)
+        updated_at = MessageTemplate.objects.get(pk=template.pk).updated_at
+
+        updated = remove_tags(
+            MessageTemplate.objects.filter(account=account),
+            Tag.objects.filter(pk=vip.pk),
+        )
+
+        assert updated == 1
+        assert list(template.tags.all()) == [new]
+        assert MessageTemplate.objects.get(pk=template.pk).updated_at > updated_at
+
+    def test_merge_tags(self):
+        account = AccountFactory()
+        old = TagFactory(account=account, name="old")
+        older = TagFactory(account=account, name="older")
+        target = TagFactory(account=account, name="target")
+        both = MessageTemplateFactory(account=account)
+        both.tags.add(old, target)
+        only_old = MessageTemplateFactory(account=account)
+        only_old.tags.add(old, older)
+        version = get_listing_version(account.pk)
+
+        updated = merge_tags([old, older], target)
+
+        assert updated == 2
+        assert tag_names(both) == "target"
+        assert tag_names(only_old) == "target"
+        assert list(Tag.objects.filter(account=account)) == [target]
+        assert get_listing_version(account.pk) == version + 1
+
+    def test_merge_unused_tag(self):
+        account = AccountFactory()
+        unused, target = TagFactory.create_batch(2, account=account)
+
+        assert merge_tags([unused], target) == 0
+        assert not Tag.objects.filter(pk=unused.pk).exists()
+
+    def test_merge_other_accounts_tag(self):
+        with pytest.raises(ValueError):
+            merge_tags([TagFactory()], TagFactory())
+
+
+@pytest.mark.django_db
+class TestTaggingAPI:
+    def test_add_and_remove(self, client):
+        account = AccountFactory()
+        vip, new = TagFactory.create_batch(2, account=account)
+        template = MessageTemplateFactory(account=account)
+        template.tags.add(vip)
+        others = MessageTemplateFactory()
+
+        client.force_login(account)
+        response = client.post(
+            reverse("message_template_api:tags"),
+            {
+                "templates": [str(template.pk), str(others.pk)],
+                "add": [str(new.pk)],
+                "remove": [str(vip.pk)],
+            },
+            content_type="application/json",
+        )
+
+        assert response.json() == {"added": 1, "removed": 1}
+        assert list(template.tags.all()) == [new]
+        assert not others.tags.exists()
+
+    @pytest.mark.parametrize(
+        "data", [[], {"templates": "all"}, {"templates": ["1"], "add": [1]}]
+    )
+    def test_invalid(self, client, data):
+        client.force_login(AccountFactory())
+
+        response = client.post(
+            reverse("message_template_api:tags"), data, content_type="application/json"
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("name", ["message_template_api:tags", "tag_api:merge"])
+    def test_too_large(self, client, settings, name):
+        """Should be answered 413 past `DATA_UPLOAD_MAX_MEMORY_SIZE`."""
+        settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 100
+        client.force_login(AccountFactory())
+
+        response = client.post(
+            reverse(name), {"templates": ["x" * 100]}, content_type="application/json"
+        )
+
+        assert response.status_code == 413
+
+    def test_merge(self, client):
+        account = AccountFactory()
+        old, target = TagFactory.create_batch(2, account=account)
+        others = TagFactory()
+        template = MessageTemplateFactory(account=account)
+        template.tags.add(old)
+
+        client.force_login(account)
+        response = client.post(
+            reverse("tag_api:merge"),
+            {"tags": [str(old.pk), str(others.pk)], "into": str(target.pk)},
+            content_type="application/json",
+        )
+
+        assert response.json() == {"merged": 1, "updated": 1}
+        assert list(template.tags.all()) == [target]
+        assert Tag.objects.filter(pk=others.pk).exists()
+
+    def test_merge_into_others_tag(self, client):
+        account = AccountFactory()
+        old = TagFactory(account=account)
+
+        client.force_login(account)
+        response = client.post(
+            reverse("tag_api:merge"),
+            {"tags": [str(old.pk)], "into": str(TagFactory().pk)},
+            content_type="application/json",
+        )
+
+        assert response.status_code == 404
+        assert Tag.objects.filter(pk=old.pk).exists()
+
+
+@pytest.mark.django_db
+class TestTaggingAdmin:
+    def test_add_named_tags(self, admin_client):
+        account = AccountFactory()
+        TagFactory(account=account, name="vip")
+        template = MessageTemplateFactory(account=account)
+        other = MessageTemplateFactory()
+        TagFactory(account=other.account, name="vip")
+
+        admin_client.post(
+            reverse("admin:message_template_messagetemplate_changelist"),
+            {
+                "action": "add_named_tags",
+                "_selected_action": [template.pk, other.pk],
+                "tag_names": "vip, missing",
+            },
+        )
+
+        assert tag_names(template) == "vip"
+        assert tag_names(other) == "vip"
+        assert other.tags.get().account == other.account
+
+    def test_merge(self, admin_client):
+        account = AccountFactory()
+        old = TagFactory(account=account, name="old")
+        target = TagFactory(account=account, name="new")
+        template = MessageTemplateFactory(account=account)
+        template.tags.add(old)
+        unmatched = TagFactory(name="lonely")
+
+        admin_client.post(
+            reverse("admin:tag_tag_changelist"),
+            {
+                "action": "merge",
+                "_selected_action": [old.pk, target.pk, unmatched.pk],
+                "into": "new",
+            },
+        )
+
+        assert list(template.tags.all()) == [target]
+        assert not Tag.objects.filter(pk=old.pk).exists()
+        assert Tag.objects.filter(pk=unmatched.pk).exists()
@@ -0,0 +1,209 @@
+import json
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import AsyncClient
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+from message_template.models import MessageTemplate
+from message_template.transfer import export_templates, import_templates, parse_row
+from tag.models import Tag
+from tag.tests.factories import TagFactory
+from .factories import MessageTemplateFactory
+
+JSONL = (
+    '{"type": "text", "title": "Welcome", "body": "Dear ${name}", '
+    '"tags": ["onboarding", "vip"]}\n'
+    '{"title": "Bad", "body": "Dear ${name"}\n'
+    '{"type": "html", "title": "Bye", "body": "<p>${name} ${plan}</p>", '
+    '"tags": ["vip"]}\n'
+)
+
+
+class TestParseRow:
+    def test_valid(self):
+        row = parse_row({"title": " t ", "body": "${b} ${a}", "tags": " vip, ,new,vip"})
+
+        assert row.type == "text"
+        assert row.title == "t"
+        assert row.parameters == ["a", "b"]
+        assert row.tags == ("vip", "new")
+
+    @pytest.mark.parametrize(
+        "row, error",
+        [
+            ({"type": "pdf", "title": "t", "body": "b"}, "Invalid type: pdf"),
+            ({"title": " ", "body": "b"}, "The title is required."),
+            ({"title": "t" * 201, "body": "b"}, "The title is too long."),
+            ({"title": "t"}, "The body is required."),
+            ({"title": "t", "body": ""}, "The body is required."),
+            ({"title": "t", "body": "${"}, "Template syntax error"),
+            ({"title": "t", "body": "b", "tags": [1]}, "must be a list"),
+            (["t"], "A row must be an object."),
+            ({"title": "t\x00", "body": "b"}, "NUL characters"),
+            ({"title": "t", "body": "b", "tags": ["v\x00"]}, "NUL characters"),
+        ],
+    )
+    def test_invalid(self, row, error):
+        with pytest.raises(ValueError, match=error):
+            parse_row(row)
+
+
+@pytest.mark.django_db
+class TestImportTemplates:
+    def test_import_jsonl(self):
+        account = AccountFactory()
+        TagFactory(account=account, name="vip")
+
+        stats = import_templates(account, StringIO(JSONL), chunk_size=2)
+
+        assert (stats.rows, stats.created, stats.failed) == (3, 2, 1)
+        assert stats.errors[0]["line"] == 2
+        assert stats.errors[0]["error"].startswith("Template syntax error")
+        welcome = MessageTemplate.objects.get(account=account, title="Welcome")
+        assert welcome.body_parameters == ["name"]
+        assert welcome.tag_names == "onboarding,vip"
+        bye = MessageTemplate.objects.get(account=account, title="Bye")
+        assert bye.type == "html"
+        assert bye.body_parameters == ["name", "plan"]
+        assert Tag.objects.filter(account=account).count() == 2
+
+    def test_searchable_after_import(self):
+        account = AccountFactory()
+
+        import_templates(account, StringIO(JSONL))
+
+        assert [t.title for t in MessageTemplate.objects.search("welcome")] == [
+            "Welcome"
+        ]
+
+    def test_does_not_use_other_accounts_tags(self):
+        account = AccountFactory()
+        other_tag = TagFactory(name="vip")
+
+        import_templates(account, StringIO(JSONL))
+
+        assert not other_tag.message_templates.exists()
+        assert Tag.objects.filter(account=account, name="vip").exists()
+
+    def test_export_roundtrip_csv(self):
+        source = AccountFactory()
+        import_templates(source, StringIO(JSONL))
+        welcome = MessageTemplate.objects.get(account=source, title="Welcome")
+        welcome.tags.add(TagFactory(account=source, name='a, "b"'))
+        target = AccountFactory()
+
+        csv = "".join(export_templates(source, format="csv"))
+        stats = import_templates(target, StringIO(csv), format="csv")
+
+        assert csv.splitlines()[0] == "type,title,body,tags"
+        assert (stats.rows, stats.failed) == (2, 0)
+        assert Tag.objects.filter(account=target, name='a, "b"').exists()
+        assert list(export_templates(target, format="jsonl")) == list(
+            export_templates(source, format="jsonl")
+        )
+
+
+@pytest.mark.django_db
+class TestTransferCommands:
+    def test_import_and_export(self, tmp_path):
+        account = AccountFactory(email="owner@example.com")
+        source = tmp_path / "templates.jsonl"
+        source.write_text(JSONL)
+        output = tmp_path / "out.jsonl"
+        stderr = StringIO()
+
+        call_command(
+            "import_message_templates", "owner@example.com", str(source), stderr=stderr
+        )
+        call_command("export_message_templates", "owner@example.com", output=output)
+
+        assert MessageTemplate.objects.filter(account=account).count() == 2
+        assert '"line": 2' in stderr.getvalue()
+        assert "Imported 2 of 3 rows (1 failed)" in stderr.getvalue()
+        assert [json.loads(line)["title"] for line in output.open()] == [
+            "Bye",
+            "Welcome",
+        ]
+
+    def test_unknown_account(self, tmp_path):
+        source = tmp_path / "templates.jsonl"
+        source.write_text(JSONL)
+
+        with pytest.raises(CommandError):
+            call_command("import_message_templates", "nobody@example.com", str(source))
+
+
+@pytest.mark.django_db
+class TestTransferViews:
+    def test_upload(self, client):
+        account = AccountFactory()
+        client.force_login(account)
+        upload = SimpleUploadedFile("templates.jsonl", JSONL.encode())
+
+        response = client.post(reverse("message_template:import"), {"file": upload})
+
+        assert response.status_code == 200
+        assert response.context["stats"].created == 2
+        assert "Line 2: Template syntax error" in response.content.decode()
+        assert MessageTemplate.objects.filter(account=account).count() == 2
+
+    def test_upload_unknown_format(self, client):
+        client.force_login(AccountFactory())
+        upload = SimpleUploadedFile("templates.txt", JSONL.encode())
+
+        response = client.post(reverse("message_template:import"), {"file": upload})
+
+        assert response.context["form"].errors
+        assert not MessageTemplate.objects.exists()
+
+    def test_upload_broken_json(self, client):
+        """Should report the malformed line, and import the others."""
+        client.force_login(AccountFactory())
+        upload = SimpleUploadedFile(
+            "templates.jsonl", b'{not json\n{"title": "Ok", "body": "x"}\n'
+        )
+
+        response = client.post(reverse("message_template:import"), {"file": upload})
+
+        assert "Line 1: Invalid JSON" in response.content.decode()
+        assert MessageTemplate.objects.filter(title="Ok").exists()
+
+    def test_upload_not_utf8(self, client):
+        client.force_login(AccountFactory())
+        upload = SimpleUploadedFile("templates.csv", "\u540d".encode("shift_jis"))
+
+        response = client.post(reverse("message_template:import"), {"file": upload})
+
+        assert "Cannot read the file" in response.content.decode()
+
+    def test_export_streams_own_templates(self):
+        account = AccountFactory()
+        MessageTemplateFactory(account=account, title="Mine", body="${x}")
+        MessageTemplateFactory(title="Others")
+        client = AsyncClient()
+
+        async def run():
+            await client.aforce_login(account)
+            url = reverse("message_template:export")
+            response = await client.get(url, {"format": "csv"})
+            return response, b"".join([part async for part in response])
+
+        response, content = async_to_sync(run)()
+
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+        content = content.decode()
+        assert content.splitlines() == ["type,title,body,tags", "text,Mine,${x},"]
+
+    def test_export_unknown_format(self, client):
+        client.force_login(AccountFactory())
+
+        response = client.get(reverse("message_template:export"), {"format": "xml"})
+
+        assert response.status_code == 400
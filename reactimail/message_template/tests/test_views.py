@@ -1,10 +1,13 @@
+from uuid import uuid4
+
 import pytest
 
 from django.urls import reverse
 
 from account.tests.factories import AccountFactory
 from message_template.models import MessageTemplate
-from .factories import MessageTemplateFactory
+from tag.tests.factories import TagFactory
+from .factories import MessageTemplateFactory, unchecked_body_template
 
 
 @pytest.mark.django_db
@@ -44,6 +47,51 @@ class TestMessageTemplateAdd:
         assert response.status_code == 200  # Form reloads on error
         assert form.errors  # Errors present
 
+    def test_message_template_add_invalid_placeholder(self, target, client):
+        account = AccountFactory()
+
+        client.force_login(account)
+        data = {
+            "type": "text",
+            "title": "Sample Message",
+            "body": "Invalid body ${missing_curly",
+        }
+        response = client.post(target, data)
+        form = response.context["form"]
+
+        assert response.status_code == 200
+        assert "Template syntax error" in form.errors["body"][0]
+        assert not MessageTemplate.objects.exists()
+
+    def test_message_template_add_accepts_own_tags(self, target, client):
+        account = AccountFactory()
+        own = TagFactory(account=account, name="own")
+        TagFactory(account=AccountFactory(), name="other")
+
+        client.force_login(account)
+        response = client.get(target)
+        field = response.context["form"].fields["tags"]
+
+        assert list(field.queryset) == [own]
+        assert field.widget.choices == []
+        assert "data-autocomplete-url" in response.content.decode()
+
+    def test_message_template_add_rejects_other_accounts_tag(self, target, client):
+        account = AccountFactory()
+        other_tag = TagFactory(account=AccountFactory())
+
+        client.force_login(account)
+        data = {
+            "type": "text",
+            "title": "Sample Message",
+            "body": "Hello",
+            "tags": [other_tag.id],
+        }
+        response = client.post(target, data)
+
+        assert response.status_code == 200
+        assert "tags" in response.context["form"].errors
+
 
 @pytest.mark.django_db
 class TestMessageTemplateList:
@@ -82,6 +130,70 @@ class TestMessageTemplateList:
         assert response.status_code == 200
         assert len(response.context["object_list"]) == 5
 
+    def test_message_template_list_cache_invalidation(self, target, client):
+        """Should show tag changes of a cached listing."""
+        account = AccountFactory()
+        message_template = MessageTemplateFactory(account=account)
+        tag = TagFactory(account=account, name="before")
+
+        client.force_login(account)
+        client.get(target)
+        message_template.tags.add(tag)
+        added = client.get(target)
+        tag.name = "after"
+        tag.save()
+        renamed = client.get(target)
+
+        assert added.context["object_list"][0].tag_names == "before"
+        assert renamed.context["object_list"][0].tag_names == "after"
+
+    def test_message_template_list_paginate_by_cursor(self, target, client):
+        account = AccountFactory()
+        titles = sorted(f"title{n:03}" for n in range(60))
+        for title in titles:
+            MessageTemplateFactory(account=account, title=title)
+        MessageTemplateFactory(account=account, title=titles[49])  # same title
+
+        client.force_login(account)
+        first = client.get(target)
+        second = client.get(target, {"after": first.context["cursor_page"].next_cursor})
+        pages = first.context["object_list"] + second.context["object_list"]
+
+        assert len(first.context["object_list"]) == 50
+        assert [t.title for t in pages] == sorted(titles + [titles[49]])
+        assert len({t.id for t in pages}) == 61
+
+    def test_message_template_list_filter_by_tags(self, target, client):
+        account = AccountFactory()
+        vip = TagFactory(account=account, name="vip")
+        new = TagFactory(account=account, name="new")
+        MessageTemplateFactory(account=account, title="both").tags.set([vip, new])
+        MessageTemplateFactory(account=account, title="vip only").tags.set([vip])
+        MessageTemplateFactory(account=account, title="untagged")
+
+        client.force_login(account)
+        tagged = {"tag": [str(vip.pk), str(new.pk)]}
+        all_tags = client.get(target, tagged)
+        any_tag = client.get(target, {**tagged, "match": "any"})
+
+        assert [t.title for t in all_tags.context["object_list"]] == ["both"]
+        assert [t.title for t in any_tag.context["object_list"]] == [
+            "both",
+            "vip only",
+        ]
+        assert [tag.name for tag in all_tags.context["filter_tags"]] == ["new", "vip"]
+        assert "Match any" in all_tags.content.decode()
+
+    @pytest.mark.parametrize(
+        "params", [{"tag": "invalid"}, {"tag": str(uuid4()), "match": "none"}]
+    )
+    def test_message_template_list_invalid_tag_filter(self, target, client, params):
+        client.force_login(AccountFactory())
+
+        response = client.get(target, params)
+
+        assert response.status_code == 404
+
 
 @pytest.mark.django_db
 class TestMessageTemplateDetail:
@@ -140,6 +252,20 @@ class TestMessageTemplateUpdate:
         assert response.status_code == 302
         assert message_template.title == "Updated Title"
 
+    def test_message_template_update_renders_selected_tags_only(self, target, client):
+        account = AccountFactory()
+        selected = TagFactory(account=account, name="selected")
+        TagFactory(account=account, name="unselected")
+        message_template = MessageTemplateFactory(account=account)
+        message_template.tags.add(selected)
+
+        client.force_login(account)
+        response = client.get(target(message_template))
+        widget = response.context["form"].fields["tags"].widget
+
+        assert widget.choices == [(selected.id, "selected")]
+        assert "unselected" not in response.content.decode()
+
     def test_message_template_update_validation_error(self, target, client):
         account = AccountFactory()
         message_template = MessageTemplateFactory(account=account)
@@ -195,3 +321,179 @@ class TestMessageTemplateDelete:
 
         assert response.status_code == 404
         assert MessageTemplate.objects.filter(id=message_template.id).exists()
+
+
+@pytest.mark.django_db
+class TestMessageTemplateSearch:
+    @pytest.fixture
+    def target(self):
+        return reverse("message_template:search")
+
+    def test_search_ranks_title_above_body(self, target, client):
+        account = AccountFactory()
+        in_body = MessageTemplateFactory(
+            account=account, title="Newsletter", body="Our invoice is attached."
+        )
+        in_title = MessageTemplateFactory(
+            account=account, title="Invoice", body="Dear ${name}, thank you."
+        )
+        MessageTemplateFactory(account=account, title="Welcome", body="Hello!")
+
+        client.force_login(account)
+        response = client.get(target, {"q": "invoices"})
+
+        assert response.status_code == 200
+        assert list(response.context["object_list"]) == [in_title, in_body]
+
+    def test_search_fuzzy_title(self, target, client):
+        account = AccountFactory()
+        welcome = MessageTemplateFactory(account=account, title="Welcome")
+
+        client.force_login(account)
+        response = client.get(target, {"q": "Welcom"})
+
+        assert list(response.context["object_list"]) == [welcome]
+
+    def test_search_excludes_other_accounts(self, target, client):
+        account = AccountFactory()
+        MessageTemplateFactory(account=AccountFactory(), title="Invoice")
+
+        client.force_login(account)
+        response = client.get(target, {"q": "invoice"})
+
+        assert list(response.context["object_list"]) == []
+
+    def test_search_empty_query(self, target, client):
+        account = AccountFactory()
+        MessageTemplateFactory(account=account, title="Invoice")
+
+        client.force_login(account)
+        response = client.get(target)
+
+        assert response.status_code == 200
+        assert list(response.context["object_list"]) == []
+
+    def test_admin_search(self, admin_client):
+        invoice = MessageTemplateFactory(account=AccountFactory(), title="Invoice")
+        MessageTemplateFactory(account=AccountFactory(), title="Welcome")
+
+        response = admin_client.get(
+            reverse("admin:message_template_messagetemplate_changelist"),
+            {"q": "invoice"},
+        )
+
+        assert response.status_code == 200
+        assert list(response.context["cl"].result_list) == [invoice]
+
+
+@pytest.mark.django_db
+class TestMessageTemplatePreview:
+    @pytest.fixture
+    def template(self):
+        return MessageTemplateFactory(body="Dear ${first} ${last}, $$${amount}")
+
+    def test_preview_query_parameters(self, client, template):
+        """Should be rendered, with the timings in the Server-Timing header."""
+        client.force_login(template.account)
+        url = reverse("message_template:preview", args=[template.pk])
+        response = client.get(url, {"first": "Ichiro", "last": "Sato", "amount": 5})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "body": "Dear Ichiro Sato, $5",
+            "missing": [],
+            "extra": [],
+        }
+        assert response["Server-Timing"].startswith("db;dur=")
+        assert "render;dur=" in response["Server-Timing"]
+
+    def test_preview_missing_and_extra(self, client, template):
+        client.force_login(template.account)
+        url = reverse("message_template:preview", args=[template.pk])
+        response = client.post(
+            url, {"first": "Ichiro", "plan": "pro"}, content_type="application/json"
+        )
+
+        assert response.json() == {
+            "body": None,
+            "missing": ["amount", "last"],
+            "extra": ["plan"],
+        }
+
+    def test_preview_invalid_json(self, client, template):
+        client.force_login(template.account)
+        url = reverse("message_template:preview", args=[template.pk])
+
+        assert (
+            client.post(url, "[1]", content_type="application/json").status_code == 400
+        )
+        assert client.post(url, "{", content_type="application/json").status_code == 400
+
+    def test_preview_others_template(self, client, template):
+        client.force_login(AccountFactory())
+        url = reverse("message_template:preview", args=[template.pk])
+
+        assert client.get(url).status_code == 404
+
+    @pytest.mark.parametrize("name, data", [("preview", {}), ("preview_batch", [{}])])
+    def test_preview_invalid_body(self, client, name, data):
+        """Should be answered 422 for a body saved before placeholders were checked."""
+        template = unchecked_body_template("Dear ${user.name}")
+        client.force_login(template.account)
+        url = reverse(f"message_template:{name}", args=[template.pk])
+
+        response = client.post(url, data, content_type="application/json")
+
+        assert response.status_code == 422
+        assert "Template syntax error" in response.content.decode()
+
+    def test_batch(self, client, template):
+        client.force_login(template.account)
+        url = reverse("message_template:preview_batch", args=[template.pk])
+        parameter_sets = [
+            {"first": "A", "last": str(n), "amount": n} for n in range(10_000)
+        ]
+        parameter_sets[1] = {"first": "B"}
+        response = client.post(url, parameter_sets, content_type="application/json")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["results"]) == 10_000
+        assert data["failed"] == 1
+        assert data["results"][0]["body"] == "Dear A 0, $0"
+        assert data["results"][1]["missing"] == ["amount", "last"]
+        assert data["results"][9_999]["body"] == "Dear A 9999, $9999"
+        assert "render;dur=" in response["Server-Timing"]
+
+    def test_batch_too_large(self, client, template):
+        client.force_login(template.account)
+        url = reverse("message_template:preview_batch", args=[template.pk])
+        response = client.post(url, [{}] * 10_001, content_type="application/json")
+
+        assert response.status_code == 400
+
+    def test_too_large(self, client, template, settings):
+        """Should be answered 413 past the limit, larger for batches."""
+        settings.DATA_UPLOAD_MAX_MEMORY_SIZE = 100
+        client.force_login(template.account)
+        parameters = {"first": "x" * 100}
+
+        response = client.post(
+            reverse("message_template:preview", args=[template.pk]),
+            parameters,
+            content_type="application/json",
+        )
+        batch_response = client.post(
+            reverse("message_template:preview_batch", args=[template.pk]),
+            [parameters],
+            content_type="application/json",
+        )
+
+        assert response.status_code == 413
+        assert batch_response.status_code == 200
+
+    def test_batch_post_only(self, client, template):
+        client.force_login(template.account)
+        url = reverse("message_template:preview_batch", args=[template.pk])
+
+        assert client.get(url).status_code == 405
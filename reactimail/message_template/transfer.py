@@ -0,0 +1,274 @@
+"""Streaming bulk import and export of an account's message templates.
+
+Rows are CSV (with a `type,title,body,tags` header) or JSONL (`{"type": ...,
+"title": ..., "body": ..., "tags": [...]}`). In CSV the tags are one comma
+separated cell, itself quoted like CSV when a name has a comma (`vip,"a, b"`).
+An export can be imported again as is.
+
+Imports are processed in chunks: the chunk's tag names are resolved to ids
+with one query (missing tags are created), new bodies are stored, then
+templates and their tags are loaded with Postgres COPY. Memory use only depends on the chunk size.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from time import perf_counter
+from typing import IO, AsyncIterator, Iterable, Iterator, Mapping
+from uuid import uuid4
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from reactimail.cache import invalidate_listings
+from tag.models import Tag
+from .compiler import get_compiled
+from .models import MessageBody, MessageTemplate, MessageTemplateTypes
+from .render import FORMATS, InvalidRow, read_rows
+
+COLUMNS = ("type", "title", "body", "tags")
+"""The fields of an imported or exported row."""
+
+MAX_REPORTED_ERRORS = 100
+
+COPY_COLUMNS = (
+    "id",
+    "created_at",
+    "updated_at",
+    "account_id",
+    "type",
+    "title",
+    "message_body_id",
+)
+"""The columns of message templates loaded with COPY."""
+
+
+@dataclass(frozen=True)
+class TemplateRow:
+    type: str
+    title: str
+    body: str
+    parameters: list[str]
+    tags: tuple[str, ...]
+
+
+@dataclass
+class ImportStats:
+    rows: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+    errors: list[dict] = field(default_factory=list)
+    """The first `MAX_REPORTED_ERRORS` errors, as `{"line": n, "error": ...}`."""
+
+    @property
+    def created(self) -> int:
+        return self.rows - self.failed
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def parse_row(row: Mapping[str, object] | InvalidRow) -> TemplateRow:
+    """Validate one row, like `MessageTemplateForm` does.
+
+    Raises ValueError with the reason if the row is invalid.
+    """
+    if isinstance(row, InvalidRow):
+        raise ValueError(row.error)
+    if not isinstance(row, Mapping):
+        raise ValueError("A row must be an object.")
+    template_type = row.get("type") or MessageTemplateTypes.TEXT
+    if not isinstance(template_type, str) or (
+        template_type not in MessageTemplateTypes.values
+    ):
+        raise ValueError(f"Invalid type: {template_type}")
+    title = row.get("title")
+    if isinstance(title, str):
+        title = title.strip()
+    if not isinstance(title, str) or not title:
+        raise ValueError("The title is required.")
+    if len(title) > MessageTemplate._meta.get_field("title").max_length:
+        raise ValueError("The title is too long.")
+    body = row.get("body")
+    if not isinstance(body, str) or not body:
+        raise ValueError("The body is required.")
+    try:
+        parameters = get_compiled(body).parameters
+    except ValueError as e:
+        raise ValueError(f"Template syntax error: {e}") from e
+
+    tags = row.get("tags") or []
+    if isinstance(tags, str):
+        tags = split_tags(tags)
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError("The tags must be a list of names.")
+    names = tuple(dict.fromkeys(name.strip() for name in tags if name.strip()))
+    if any(len(name) > Tag._meta.get_field("name").max_length for name in names):
+        raise ValueError("A tag name is too long.")
+    # Postgres text can't store them, and COPY would fail the whole chunk.
+    if any("\x00" in value for value in (title, body, *names)):
+        raise ValueError("The text must not contain NUL characters.")
+    return TemplateRow(template_type, title, body, parameters, names)
+
+
+def join_tags(names: Iterable[str]) -> str:
+    """The CSV cell of tag names, quoting the names with a comma."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(names)
+    return buffer.getvalue().removesuffix("\r\n")
+
+
+def split_tags(value: str) -> list[str]:
+    """The tag names of a CSV cell of `join_tags()`, or of plain `a,b` names."""
+    return next(csv.reader(io.StringIO(value, newline="")), [])
+
+
+def resolve_tags(account, names: Iterable[str], tag_ids: dict) -> None:
+    """Add the ids of tag `names` to `tag_ids`, creating the missing tags."""
+    missing = set(names) - tag_ids.keys()
+    if not missing:
+        return
+    Tag.objects.bulk_create(
+        [Tag(account=account, name=name) for name in missing], ignore_conflicts=True
+    )
+    tag_ids.update(
+        Tag.objects.filter(account=account, name__in=missing).values_list("name", "id")
+    )
+
+
+def copy_rows(cursor, model, columns: Iterable[str], rows: Iterable[tuple]) -> None:
+    """Load `rows` into the table of `model` with Postgres COPY."""
+    quote = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN".format(
+        quote(model._meta.db_table), ", ".join(quote(column) for column in columns)
+    )
+    with cursor.copy(sql) as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def _import_chunk(account, chunk: list[TemplateRow], tag_ids: dict) -> None:
+    resolve_tags(account, {name for row in chunk for name in row.tags}, tag_ids)
+    bodies = MessageBody.objects.store({row.body for row in chunk})
+    now = timezone.now()
+    pks = [uuid4() for _ in chunk]
+    tags = MessageTemplate.tags.field
+    with transaction.atomic(), connection.cursor() as cursor:
+        copy_rows(
+            cursor,
+            MessageTemplate,
+            COPY_COLUMNS,
+            (
+                (
+                    pk,
+                    now,
+                    now,
+                    account.pk,
+                    row.type,
+                    row.title,
+                    bodies[row.body].digest,
+                )
+                for pk, row in zip(pks, chunk)
+            ),
+        )
+        copy_rows(
+            cursor,
+            tags.remote_field.through,
+            (tags.m2m_column_name(), tags.m2m_reverse_name()),
+            ((pk, tag_ids[name]) for pk, row in zip(pks, chunk) for name in row.tags),
+        )
+
+
+def import_templates(
+    account, source: IO[str], format: str = "jsonl", chunk_size: int = 2000
+) -> ImportStats:
+    """Create a message template of the account for every valid row of `source`.
+
+    Each chunk is committed on its own, invalid rows are skipped and reported
+    in the returned stats.
+
+    Example:
+        with open("templates.jsonl") as src:
+            stats = import_templates(account, src)
+    """
+    stats = ImportStats()
+    started = perf_counter()
+    tag_ids: dict = {}
+    numbered = enumerate(read_rows(source, format), start=1)
+    while rows := list(islice(numbered, chunk_size)):
+        chunk = []
+        for line, row in rows:
+            stats.rows += 1
+            try:
+                chunk.append(parse_row(row))
+            except ValueError as e:
+                stats.failed += 1
+                if len(stats.errors) < MAX_REPORTED_ERRORS:
+                    stats.errors.append({"line": line, "error": str(e)})
+        if chunk:
+            _import_chunk(account, chunk, tag_ids)
+            invalidate_listings(account.pk)
+    stats.seconds = perf_counter() - started
+    return stats
+
+
+def _export_queryset(account):
+    return (
+        MessageTemplate.objects.filter(account=account)
+        .with_tag_list()
+        .order_by("title", "id")
+        # Instances rather than values_list(), which aiterator() runs eagerly.
+        .only("type", "title", "message_body__text")
+    )
+
+
+class _RowWriter:
+    """Format exported rows as lines of CSV or JSONL."""
+
+    def __init__(self, format: str):
+        if format not in FORMATS:
+            raise ValueError(f"Unsupported format: {format}")
+        self.format = format
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def header(self) -> Iterator[str]:
+        if self.format == "csv":
+            yield self._csv(COLUMNS)
+
+    def line(self, template: MessageTemplate) -> str:
+        values = (template.type, template.title, template.body)
+        if self.format == "csv":
+            return self._csv((*values, join_tags(template.tag_list)))
+        row = dict(zip(COLUMNS, (*values, template.tag_list)))
+        return json.dumps(row, ensure_ascii=False) + "\n"
+
+    def _csv(self, values) -> str:
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.writer.writerow(values)
+        return self.buffer.getvalue()
+
+
+def export_templates(
+    account, format: str = "jsonl", chunk_size: int = 2000
+) -> Iterator[str]:
+    """Yield the account's message templates as lines, ordered by title."""
+    writer = _RowWriter(format)
+    yield from writer.header()
+    for template in _export_queryset(account).iterator(chunk_size=chunk_size):
+        yield writer.line(template)
+
+
+async def aexport_templates(
+    account, format: str = "jsonl", chunk_size: int = 2000
+) -> AsyncIterator[str]:
+    """See `export_templates()`, for streaming responses under ASGI."""
+    writer = _RowWriter(format)
+    for header in writer.header():
+        yield header
+    async for template in _export_queryset(account).aiterator(chunk_size=chunk_size):
+        yield writer.line(template)
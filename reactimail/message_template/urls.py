@@ -6,7 +6,20 @@ app_name = "message_template"
 urlpatterns = [
     path("add/", views.MessageTemplateCreateView.as_view(), name="add"),
     path("", views.MessageTemplateListView.as_view(), name="list"),
+    path("search/", views.MessageTemplateSearchView.as_view(), name="search"),
+    path("import/", views.MessageTemplateImportView.as_view(), name="import"),
+    path("export/", views.MessageTemplateExportView.as_view(), name="export"),
     path("<uuid:pk>/", views.MessageTemplateDetailView.as_view(), name="detail"),
+    path(
+        "<uuid:pk>/preview/",
+        views.MessageTemplatePreviewView.as_view(),
+        name="preview",
+    ),
+    path(
+        "<uuid:pk>/preview/batch/",
+        views.MessageTemplateBatchPreviewView.as_view(),
+        name="preview_batch",
+    ),
     path("<uuid:pk>/edit/", views.MessageTemplateUpdateView.as_view(), name="edit"),
     path("<uuid:pk>/delete/", views.MessageTemplateDeleteView.as_view(), name="delete"),
 ]
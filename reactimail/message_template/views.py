@@ -1,24 +1,48 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.generic import (
-    ListView,
-    DetailView,
-    CreateView,
-    UpdateView,
-    DeleteView,
+import csv
+import io
+from functools import cached_property
+from time import perf_counter
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import RequestDataTooBig
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
 )
+from django.shortcuts import render
 from django.urls import reverse_lazy
-from .models import MessageTemplate
-from .forms import MessageTemplateForm
+from django.views import View
+from reactimail.api import read_json
+from reactimail.cache import CachedKeysetPaginationMixin
+from reactimail.timing import server_timing
+from reactimail.views import (
+    AsyncCreateView,
+    AsyncDeleteView,
+    AsyncDetailView,
+    AsyncListView,
+    AsyncLoginRequiredMixin,
+    AsyncSingleObjectMixin,
+    AsyncUpdateView,
+)
+from tag.models import Tag
+from .models import MessageTemplate, TagMatches
+from .forms import MessageTemplateForm, MessageTemplateImportForm
+from .render import preview_row
+from .transfer import FORMATS, aexport_templates, import_templates
 
 
-class MessageTemplateCreateView(LoginRequiredMixin, CreateView):
+class MessageTemplateCreateView(AsyncCreateView):
     model = MessageTemplate
     form_class = MessageTemplateForm
     template_name = "message_template/form.html"
     success_url = reverse_lazy("message_template:list")
 
-    def get_form_kwargs(self):
-        kwargs = super().get_form_kwargs()
+    def get_form_kwargs(self, instance):
+        kwargs = super().get_form_kwargs(instance)
         kwargs["account"] = self.request.user  # Pass the account to the form
         return kwargs
 
@@ -27,36 +51,235 @@ class MessageTemplateCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class MessageTemplateListView(LoginRequiredMixin, ListView):
+class MessageTemplateListView(CachedKeysetPaginationMixin, AsyncListView):
     model = MessageTemplate
     template_name = "message_template/list.html"
+    keyset = ("title", "id")
+    listing_name = "message_templates"
+    max_filter_tags = 10
+
+    @cached_property
+    def tag_filter(self) -> tuple[list[UUID], str]:
+        """The tag ids and match of `?tag=<id>&tag=<id>&match=all|any`."""
+        try:
+            tag_ids = sorted({UUID(value) for value in self.request.GET.getlist("tag")})
+        except ValueError as e:
+            raise Http404("Invalid tag.") from e
+        match = self.request.GET.get("match", TagMatches.ALL)
+        if match not in TagMatches.values or len(tag_ids) > self.max_filter_tags:
+            raise Http404("Invalid tag filter.")
+        return tag_ids, match
 
     def get_queryset(self):
-        return MessageTemplate.objects.filter(account=self.request.user)
+        return (
+            MessageTemplate.objects.filter(account=self.request.user)
+            .with_tags(*self.tag_filter)
+            .with_tag_names()
+        )
+
+    def get_listing_parts(self):
+        tag_ids, match = self.tag_filter
+        return (match, *map(str, tag_ids)) if tag_ids else ()
+
+    async def aget_context_data(self, **kwargs):
+        tag_ids, match = self.tag_filter
+        if tag_ids:
+            tags = Tag.objects.filter(account=self.request.user, pk__in=tag_ids)
+            kwargs["filter_tags"] = [tag async for tag in tags.only("name")]
+            kwargs["tag_match"] = match
+        return await super().aget_context_data(**kwargs)
+
+
+class MessageTemplateSearchView(AsyncLoginRequiredMixin, View):
+    template_name = "message_template/search.html"
+    max_results = 50
+
+    async def get(self, request, *args, **kwargs):
+        query = request.GET.get("q", "").strip()
+        object_list = []
+        if query:
+            queryset = (
+                MessageTemplate.objects.filter(account=request.user)
+                .search(query)
+                .with_tag_names()[: self.max_results]
+            )
+            object_list = [obj async for obj in queryset]
+        context = {"view": self, "object_list": object_list, "query": query}
+        return render(request, self.template_name, context)
 
 
-class MessageTemplateDetailView(LoginRequiredMixin, DetailView):
+class MessageTemplateDetailView(AsyncDetailView):
     model = MessageTemplate
     template_name = "message_template/detail.html"
 
     def get_queryset(self):
-        return MessageTemplate.objects.filter(account=self.request.user)
+        return MessageTemplate.objects.filter(
+            account=self.request.user
+        ).with_tag_names()
 
 
-class MessageTemplateUpdateView(LoginRequiredMixin, UpdateView):
+class MessageTemplateUpdateView(AsyncUpdateView):
     model = MessageTemplate
     form_class = MessageTemplateForm
     template_name = "message_template/form.html"
     success_url = reverse_lazy("message_template:list")
 
+    def get_form_kwargs(self, instance):
+        kwargs = super().get_form_kwargs(instance)
+        kwargs["account"] = self.request.user  # Pass the account to the form
+        return kwargs
+
     def get_queryset(self):
         return MessageTemplate.objects.filter(account=self.request.user)
 
 
-class MessageTemplateDeleteView(LoginRequiredMixin, DeleteView):
+class MessageTemplateDeleteView(AsyncDeleteView):
     model = MessageTemplate
     template_name = "message_template/confirm_delete.html"
     success_url = reverse_lazy("message_template:list")
 
     def get_queryset(self):
         return MessageTemplate.objects.filter(account=self.request.user)
+
+
+class MessageTemplateImportView(AsyncLoginRequiredMixin, View):
+    template_name = "message_template/import.html"
+
+    async def get(self, request, *args, **kwargs):
+        form = MessageTemplateImportForm()
+        return render(request, self.template_name, {"view": self, "form": form})
+
+    async def post(self, request, *args, **kwargs):
+        form = MessageTemplateImportForm(request.POST, request.FILES)
+        stats = None
+        if form.is_valid():
+            # Large uploads are spooled to a temporary file, and read in chunks.
+            source = io.TextIOWrapper(
+                form.cleaned_data["file"].file, encoding="utf-8", newline=""
+            )
+            try:
+                stats = await sync_to_async(import_templates)(
+                    request.user, source, format=form.cleaned_data["format"]
+                )
+            except (ValueError, csv.Error) as e:
+                form.add_error("file", f"Cannot read the file: {e}")
+        context = {"view": self, "form": form, "stats": stats}
+        return render(request, self.template_name, context)
+
+
+class MessageTemplateExportView(AsyncLoginRequiredMixin, View):
+    content_types = {
+        "csv": "text/csv; charset=utf-8",
+        "jsonl": "application/x-ndjson; charset=utf-8",
+    }
+
+    async def get(self, request, *args, **kwargs):
+        format = request.GET.get("format", "jsonl")
+        if format not in FORMATS:
+            return HttpResponseBadRequest(f"Unsupported format: {format}")
+        response = StreamingHttpResponse(
+            aexport_templates(request.user, format),
+            content_type=self.content_types[format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="message-templates.{format}"'
+        )
+        return response
+
+
+class MessageTemplatePreviewView(AsyncLoginRequiredMixin, AsyncSingleObjectMixin, View):
+    """Render the template with `?name=value` parameters, or a POSTed JSON object.
+
+    Answers `{"body": ..., "missing": [...], "extra": [...]}`, with the time
+    spent loading and rendering in the Server-Timing header.
+    """
+
+    raise_exception = True
+    max_body_size: int | None = None
+    """The bytes of a POSTed body, `DATA_UPLOAD_MAX_MEMORY_SIZE` if None."""
+
+    def get_queryset(self):
+        # Only what rendering needs (see `MessageTemplate.compiled_body`).
+        return MessageTemplate.objects.filter(account=self.request.user).only(
+            "message_body__text"
+        )
+
+    async def get(self, request, *args, **kwargs):
+        return await self._preview(request.GET.dict())
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            parameters = read_json(request, self.max_body_size)
+        except RequestDataTooBig as e:
+            return HttpResponse(str(e), status=413)
+        except ValueError:
+            return HttpResponseBadRequest("Invalid JSON.")
+        return await self._preview(parameters)
+
+    async def _preview(self, parameters):
+        if not isinstance(parameters, dict):
+            return HttpResponseBadRequest("Expected a JSON object of parameters.")
+        started = perf_counter()
+        template = await self.aget_object()
+        loaded = perf_counter()
+        try:
+            compiled = template.compiled_body
+        except ValueError as e:
+            return self._invalid_body(e)
+        data = preview_row(compiled, parameters)
+        return self._timed_response(
+            data, db=loaded - started, render=perf_counter() - loaded
+        )
+
+    def _invalid_body(self, error):
+        # A body saved before placeholders were checked, e.g. `${user.name}`.
+        return HttpResponse(f"Template syntax error: {error}", status=422)
+
+    def _timed_response(self, data, **durations):
+        response = JsonResponse(data)
+        response.headers["Server-Timing"] = server_timing(**durations)
+        return response
+
+
+class MessageTemplateBatchPreviewView(MessageTemplatePreviewView):
+    """Render the template for a POSTed JSON array of parameter objects.
+
+    Answers `{"results": [...], "failed": n}`, one result per parameter set
+    in order, as in `MessageTemplatePreviewView`.
+    """
+
+    http_method_names = ["post"]
+    max_batch_size = 10_000
+    # About 1KB per parameter set, more than `DATA_UPLOAD_MAX_MEMORY_SIZE`.
+    max_body_size = 10 * 1024 * 1024
+
+    async def _preview(self, parameter_sets):
+        if not isinstance(parameter_sets, list) or not all(
+            isinstance(parameters, dict) for parameters in parameter_sets
+        ):
+            return HttpResponseBadRequest("Expected a JSON array of objects.")
+        if len(parameter_sets) > self.max_batch_size:
+            return HttpResponseBadRequest(
+                f"At most {self.max_batch_size} parameter sets per request."
+            )
+        started = perf_counter()
+        template = await self.aget_object()
+        loaded = perf_counter()
+        try:
+            compiled = template.compiled_body
+        except ValueError as e:
+            return self._invalid_body(e)
+        # Off the event loop, a full batch takes a while.
+        results = await sync_to_async(
+            lambda: [
+                preview_row(compiled, parameters) for parameters in parameter_sets
+            ],
+            thread_sensitive=False,
+        )()
+        data = {
+            "results": results,
+            "failed": sum(1 for result in results if result["body"] is None),
+        }
+        return self._timed_response(
+            data, db=loaded - started, render=perf_counter() - loaded
+        )
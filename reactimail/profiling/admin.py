@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import ProfilingRule
+
+
+@admin.register(ProfilingRule)
+class ProfilingRuleAdmin(admin.ModelAdmin):
+    model = ProfilingRule
+    list_display = (
+        "path_prefix",
+        "account",
+        "sample_percent",
+        "format",
+        "expires_at",
+        "is_active",
+    )
+    list_editable = ("is_active",)
+    list_filter = ("is_active", "format")
+    raw_id_fields = ("account",)
+    ordering = ("-created_at",)
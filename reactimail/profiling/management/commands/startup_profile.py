@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from profiling.startup import (
+    DEFERRED_MODULES,
+    PROJECT_IMPORT_BUDGET_SECONDS,
+    profile_startup,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Start a new worker process, and report its time to first request and "
+        "the import time of the slowest modules."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", default="/login/", help="The first request (default: /login/)"
+        )
+        parser.add_argument(
+            "--limit", type=int, default=20, help="The modules to list (default: 20)"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            profile = profile_startup(options["path"])
+        except RuntimeError as e:
+            raise CommandError(str(e)) from e
+
+        phases = ", ".join(
+            f"{name} {seconds * 1000:.0f}ms" for name, seconds in profile.phases.items()
+        )
+        self.stdout.write(
+            f"First request ({options['path']}, {profile.status}) after "
+            f"{profile.first_request_seconds * 1000:.0f}ms: {phases}. "
+            f"The process ran {profile.process_seconds * 1000:.0f}ms."
+        )
+        self.stdout.write(
+            f"Project imports: {profile.project_import_seconds * 1000:.1f}ms "
+            f"(budget: {PROJECT_IMPORT_BUDGET_SECONDS * 1000:.0f}ms)"
+        )
+        self.stdout.write("Slowest imports (ms, with what they import):")
+        for module in profile.slowest(options["limit"]):
+            self.stdout.write(f"{module.cumulative_seconds * 1000:9.1f}  {module.name}")
+        for name in DEFERRED_MODULES:
+            if profile.imported(name):
+                self.stderr.write(f"{name} is imported at startup, import it lazily.")
@@ -0,0 +1,157 @@
+"""Profile the requests matching an armed `ProfilingRule`, without a restart.
+
+Rules are edited in the admin. Each process loads the armed rules at most
+every `settings.PROFILING_RULES_REFRESH` seconds (at once in the process
+saving a rule), so while no rule is armed a request costs a clock read.
+Profiles are written to `settings.PROFILING_OUTPUT_DIR`, named after the
+time and path of the request.
+
+Under ASGI the sampler records the event loop thread, which is shared with
+concurrent requests, and the thread running the request's sync code (the
+ORM). cProfile only traces the event loop thread.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from random import random
+from time import monotonic
+from uuid import uuid4
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import ProfileFormats, ProfilingRule
+from .profilers import CProfiler, ProfilerBusy, StackSampler
+
+logger = logging.getLogger(__name__)
+
+
+class ArmedRules:
+    """The armed rules, reloaded at most every `PROFILING_RULES_REFRESH` seconds."""
+
+    def __init__(self):
+        self.rules: list[ProfilingRule] = []
+        self.refresh_at = 0.0
+
+    def expire(self) -> None:
+        self.refresh_at = 0.0
+
+    def _loaded(self, rules: list[ProfilingRule]) -> list[ProfilingRule]:
+        self.rules = rules
+        self.refresh_at = monotonic() + settings.PROFILING_RULES_REFRESH
+        return rules
+
+    def get(self) -> list[ProfilingRule]:
+        if monotonic() < self.refresh_at:
+            return self.rules
+        return self._loaded(list(ProfilingRule.objects.armed()))
+
+    async def aget(self) -> list[ProfilingRule]:
+        if monotonic() < self.refresh_at:
+            return self.rules
+        return self._loaded([rule async for rule in ProfilingRule.objects.armed()])
+
+
+armed_rules = ArmedRules()
+
+
+def match(rules: list[ProfilingRule], path: str, user_id) -> ProfilingRule | None:
+    """The first rule matching the request, if it is sampled."""
+    now = timezone.now()
+    for rule in rules:
+        if (
+            (rule.expires_at is None or rule.expires_at > now)
+            and path.startswith(rule.path_prefix)
+            and (rule.account_id is None or rule.account_id == user_id)
+        ):
+            return rule if random() * 100 < rule.sample_percent else None
+    return None
+
+
+def start_profiler(
+    rule: ProfilingRule, thread_id: int | None = None
+) -> StackSampler | CProfiler:
+    """Start the profiler of the rule, also sampling thread `thread_id`.
+
+    cProfile traces one request of the process at a time, so while it is
+    busy the request is sampled instead.
+    """
+    if rule.format == ProfileFormats.CPROFILE:
+        profiler = CProfiler()
+        try:
+            profiler.start()
+            return profiler
+        except ProfilerBusy:
+            logger.info("cProfile is busy, sampling the request instead.")
+    sampler = StackSampler(settings.PROFILING_SAMPLE_INTERVAL)
+    if thread_id is not None:
+        sampler.add_thread(thread_id)
+    sampler.start()
+    return sampler
+
+
+def write_profile(profiler: StackSampler | CProfiler, request) -> Path:
+    directory = Path(settings.PROFILING_OUTPUT_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = "-".join(
+        (
+            timezone.now().strftime("%Y%m%dT%H%M%S"),
+            uuid4().hex[:8],
+            slugify(request.path) or "root",
+        )
+    )
+    path = directory / f"{name}.{profiler.suffix}"
+    profiler.dump(path)
+    logger.info("Profiled %s %s: %s", request.method, request.path, path)
+    return path
+
+
+class ProfilingMiddleware:
+    """See the module docstring. Place it after `AuthenticationMiddleware`."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not (rules := armed_rules.get()):
+            return self.get_response(request)
+        # Only load the user when a rule needs it.
+        user_id = request.user.pk if any(r.account_id for r in rules) else None
+        if not (rule := match(rules, request.path, user_id)):
+            return self.get_response(request)
+
+        profiler = start_profiler(rule)
+        try:
+            return self.get_response(request)
+        finally:
+            profiler.stop()
+            write_profile(profiler, request)
+
+    async def __acall__(self, request):
+        if not (rules := await armed_rules.aget()):
+            return await self.get_response(request)
+        user_id = (
+            (await request.auser()).pk if any(r.account_id for r in rules) else None
+        )
+        if not (rule := match(rules, request.path, user_id)):
+            return await self.get_response(request)
+
+        profiler = start_profiler(rule, await sync_to_async(threading.get_ident)())
+        try:
+            return await self.get_response(request)
+        finally:
+            profiler.stop()
+            await sync_to_async(write_profile, thread_sensitive=False)(
+                profiler, request
+            )
@@ -0,0 +1,95 @@
+# Generated by Django 5.1.2 on 2026-10-18 15:11
+
+import django.core.validators
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProfilingRule",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("is_active", models.BooleanField(default=True, verbose_name="Active")),
+                (
+                    "path_prefix",
+                    models.CharField(
+                        blank=True,
+                        help_text="Only requests whose path starts with this, e.g. /message-templates/",
+                        max_length=200,
+                        verbose_name="Path Prefix",
+                    ),
+                ),
+                (
+                    "sample_percent",
+                    models.FloatField(
+                        default=100,
+                        help_text="The percentage of the matching requests to profile",
+                        validators=[
+                            django.core.validators.MinValueValidator(0),
+                            django.core.validators.MaxValueValidator(100),
+                        ],
+                        verbose_name="Sample Percent",
+                    ),
+                ),
+                (
+                    "format",
+                    models.CharField(
+                        choices=[
+                            ("collapsed", "Collapsed stacks (flamegraph)"),
+                            ("cprofile", "cProfile"),
+                        ],
+                        default="collapsed",
+                        max_length=20,
+                        verbose_name="Format",
+                    ),
+                ),
+                (
+                    "expires_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Stop profiling after this time",
+                        null=True,
+                        verbose_name="Expires At",
+                    ),
+                ),
+                (
+                    "account",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Only the requests of this account",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Account",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Profiling Rule",
+                "verbose_name_plural": "Profiling Rules",
+                "ordering": ["-created_at"],
+            },
+        ),
+    ]
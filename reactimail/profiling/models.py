@@ -0,0 +1,69 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from reactimail.models import BaseModelMixin
+
+
+class ProfileFormats(models.TextChoices):
+    COLLAPSED = "collapsed", "Collapsed stacks (flamegraph)"
+    CPROFILE = "cprofile", "cProfile"
+
+
+class ProfilingRuleQuerySet(models.QuerySet):
+    def armed(self):
+        """The active rules that have not expired."""
+        return self.filter(
+            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()),
+            is_active=True,
+        )
+
+
+class ProfilingRule(BaseModelMixin):
+    """Profile the requests matching all of the rule's conditions."""
+
+    is_active = models.BooleanField(default=True, verbose_name="Active")
+    path_prefix = models.CharField(
+        max_length=200,
+        blank=True,
+        verbose_name="Path Prefix",
+        help_text="Only requests whose path starts with this, e.g. /message-templates/",
+    )
+    account = models.ForeignKey(
+        "account.ReactiMailUser",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Account",
+        help_text="Only the requests of this account",
+    )
+    sample_percent = models.FloatField(
+        default=100,
+        validators=[MinValueValidator(0), MaxValueValidator(100)],
+        verbose_name="Sample Percent",
+        help_text="The percentage of the matching requests to profile",
+    )
+    format = models.CharField(
+        max_length=20,
+        choices=ProfileFormats.choices,
+        default=ProfileFormats.COLLAPSED,
+        verbose_name="Format",
+    )
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Expires At",
+        help_text="Stop profiling after this time",
+    )
+
+    objects = ProfilingRuleQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Profiling Rule"
+        verbose_name_plural = "Profiling Rules"
+
+    def __str__(self):
+        return f"{self.path_prefix or '/'} ({self.get_format_display()})"
@@ -0,0 +1,96 @@
+"""Profilers of one request, started and stopped by `ProfilingMiddleware`.
+
+`StackSampler` is a sampling profiler: a background thread records the
+stacks of the request's threads every `interval` seconds, which costs the
+request little however deep its calls are. It writes collapsed stacks
+(`module:function;module:function count` lines), the input of flamegraph.pl,
+speedscope and inferno.
+
+`CProfiler` traces every call of the current thread with cProfile, and
+writes a dump for `pstats` or snakeviz. Only one traces at a time in a
+process: since Python 3.12 enabling a second one raises (before, it silently
+took over the first one's thread).
+"""
+
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+
+def collapse(frame) -> str:
+    """The stack ending at `frame`, outermost call first."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    suffix = "collapsed"
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.thread_ids = {threading.get_ident()}
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def add_thread(self, thread_id: int) -> None:
+        self.thread_ids.add(thread_id)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in self.thread_ids:
+                if frame := frames.get(thread_id):
+                    self.stacks[collapse(frame)] += 1
+
+    def dump(self, path: Path) -> None:
+        with path.open("w") as file:
+            for stack, count in self.stacks.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+class ProfilerBusy(Exception):
+    """Another request, or another profiling tool, already uses cProfile."""
+
+
+_cprofile_lock = threading.Lock()
+
+
+class CProfiler:
+    suffix = "prof"
+
+    def __init__(self):
+        import cProfile  # Only imported once a request is profiled with it.
+
+        self.profile = cProfile.Profile()
+
+    def start(self) -> None:
+        """Raises ProfilerBusy if a cProfile is already enabled."""
+        if not _cprofile_lock.acquire(blocking=False):
+            raise ProfilerBusy
+        try:
+            self.profile.enable()
+        except ValueError as e:  # Another tool, e.g. a debugger (Python 3.12+).
+            _cprofile_lock.release()
+            raise ProfilerBusy from e
+
+    def stop(self) -> None:
+        self.profile.disable()
+        _cprofile_lock.release()
+
+    def dump(self, path: Path) -> None:
+        self.profile.dump_stats(path)
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .middleware import armed_rules
+from .models import ProfilingRule
+
+
+@receiver([post_save, post_delete], sender=ProfilingRule)
+def expire_armed_rules(sender, instance, **kwargs):
+    # Other processes see the change on their next refresh.
+    armed_rules.expire()
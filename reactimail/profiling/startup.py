@@ -0,0 +1,228 @@
+"""Cold start profile of a worker: import time per module, time to first request.
+
+`profile_startup()` runs a new interpreter with `python -X importtime`, which
+sets Django up, builds the ASGI application and serves one request to it in
+process, as a new uvicorn worker does. It answers the import tree and the
+seconds of each phase.
+
+`project_import_seconds` counts the imports of the project's packages,
+including what they import (e.g. a third-party module imported at module
+level), but not Django's own startup. The benchmarks keep it under
+`PROJECT_IMPORT_BUDGET_SECONDS`, and the test suite checks that
+`DEFERRED_MODULES` are not imported at startup.
+
+This module is also the entry point of the profiled interpreter, so it must
+only import the standard library at module level.
+"""
+
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+
+PROJECT_PACKAGES = (
+    "account",
+    "home",
+    "message_template",
+    "profiling",
+    "reactimail",
+    "tag",
+)
+"""The packages of this repository, whose imports are counted."""
+
+DEFERRED_MODULES = ("faker", "cProfile", "multiprocessing")
+"""Heavy optional modules, only imported when first used."""
+
+PROJECT_IMPORT_BUDGET_SECONDS = 0.05
+"""About 5 times the imports of the project today (about 10ms)."""
+
+
+@dataclass(frozen=True)
+class ModuleImport:
+    name: str
+    depth: int
+    """The nesting in the import tree, 0 for a module imported at top level."""
+    self_seconds: float
+    cumulative_seconds: float
+    """Including the modules it imported first."""
+    project_seconds: float = 0.0
+    """`cumulative_seconds` if it is the outermost project module, else 0."""
+
+
+@dataclass
+class StartupProfile:
+    imports: list[ModuleImport] = field(default_factory=list)
+    phases: dict[str, float] = field(default_factory=dict)
+    """Seconds of `setup`, `application` and `first_request`."""
+    status: int = 0
+    """The status code of the first request."""
+    process_seconds: float = 0.0
+    """The wall time of the profiled interpreter, from start to exit."""
+
+    @property
+    def first_request_seconds(self) -> float:
+        """The seconds from setting Django up to answering the first request."""
+        return sum(self.phases.values())
+
+    @property
+    def project_import_seconds(self) -> float:
+        return sum(module.project_seconds for module in self.imports)
+
+    def imported(self, name: str) -> bool:
+        """Whether module `name` (or one of its submodules) was imported."""
+        return any(
+            module.name == name or module.name.startswith(f"{name}.")
+            for module in self.imports
+        )
+
+    def slowest(self, limit: int) -> list[ModuleImport]:
+        """The `limit` top-level imports taking the longest, with what they import."""
+        return sorted(
+            (module for module in self.imports if module.depth == 0),
+            key=lambda module: module.cumulative_seconds,
+            reverse=True,
+        )[:limit]
+
+
+def _is_project(name: str) -> bool:
+    return name.partition(".")[0] in PROJECT_PACKAGES
+
+
+def parse_importtime(output: str) -> list[ModuleImport]:
+    """The module imports of `python -X importtime` stderr `output`, in its order.
+
+    Lines look like `import time:  123 |  4567 |   package.module`, where the
+    indentation is the nesting, and a module follows the modules it imported.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # The header.
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+
+    # Walk the tree parents first, to know which modules a project module imported.
+    under_project = [False] * len(rows)
+    stack: list[tuple[int, bool]] = []
+    for index in reversed(range(len(rows))):
+        name, depth, _, _ = rows[index]
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        under_project[index] = bool(stack) and stack[-1][1]
+        stack.append((depth, under_project[index] or _is_project(name)))
+
+    return [
+        ModuleImport(
+            name,
+            depth,
+            self_us / 1e6,
+            cumulative_us / 1e6,
+            (
+                cumulative_us / 1e6
+                if _is_project(name) and not under_project[index]
+                else 0.0
+            ),
+        )
+        for index, (name, depth, self_us, cumulative_us) in enumerate(rows)
+    ]
+
+
+def profile_startup(path: str = "/login/") -> StartupProfile:
+    """Profile the cold start of a new worker serving `path` as its first request.
+
+    The worker uses this process' database (e.g. the test database).
+
+    Raises RuntimeError if the worker fails.
+    """
+    from django.conf import settings
+    from django.db import connections
+
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE,
+        "STARTUP_PROFILE_DATABASE": connections["default"].settings_dict["NAME"],
+    }
+    started = perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", __name__, path],
+        capture_output=True,
+        text=True,
+        cwd=Path(settings.BASE_DIR),
+        env=env,
+    )
+    process_seconds = perf_counter() - started
+    if result.returncode:
+        raise RuntimeError(f"The profiled worker failed:\n{result.stderr[-2000:]}")
+    report = json.loads(result.stdout.splitlines()[-1])
+    return StartupProfile(
+        imports=parse_importtime(result.stderr),
+        phases=report["phases"],
+        status=report["status"],
+        process_seconds=process_seconds,
+    )
+
+
+async def _request(application, path: str) -> int:
+    from asgiref.testing import ApplicationCommunicator
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    communicator = ApplicationCommunicator(application, scope)
+    await communicator.send_input({"type": "http.request", "body": b""})
+    start = await communicator.receive_output(timeout=60)
+    while (await communicator.receive_output(timeout=60)).get("more_body"):
+        pass
+    await communicator.wait()
+    return start["status"]
+
+
+def _main(path: str) -> None:
+    """Start like a worker, and print the phases' seconds as JSON."""
+    import asyncio
+
+    from asgiref.testing import ApplicationCommunicator  # noqa: F401 (not timed)
+
+    phases = {}
+    started = perf_counter()
+    import django
+
+    django.setup(set_prefix=False)
+    from django.db import connections
+
+    # The parent may use another database, e.g. the test database.
+    connections["default"].settings_dict["NAME"] = os.environ[
+        "STARTUP_PROFILE_DATABASE"
+    ]
+    phases["setup"] = perf_counter() - started
+
+    started = perf_counter()
+    from django.core.handlers.asgi import ASGIHandler
+
+    application = ASGIHandler()
+    phases["application"] = perf_counter() - started
+
+    started = perf_counter()
+    status = asyncio.run(_request(application, path))
+    phases["first_request"] = perf_counter() - started
+    print(json.dumps({"phases": phases, "status": status}))
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1])
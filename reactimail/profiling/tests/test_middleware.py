@@ -0,0 +1,146 @@
+import pstats
+from datetime import timedelta
+from time import perf_counter
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from django.utils import timezone
+
+from account.tests.factories import AccountFactory
+from profiling.middleware import armed_rules
+from profiling.models import ProfileFormats, ProfilingRule
+from profiling.profilers import CProfiler, ProfilerBusy, StackSampler
+
+
+@pytest.fixture(autouse=True)
+def profiles(settings, tmp_path):
+    settings.PROFILING_OUTPUT_DIR = str(tmp_path)
+    settings.PROFILING_SAMPLE_INTERVAL = 0.001
+    yield tmp_path
+    # Rolled back rules do not send signals.
+    armed_rules.expire()
+
+
+def busy(seconds):
+    started = perf_counter()
+    while perf_counter() - started < seconds:
+        pass
+
+
+def test_stack_sampler(tmp_path):
+    sampler = StackSampler(interval=0.001)
+
+    sampler.start()
+    busy(0.05)
+    sampler.stop()
+    sampler.dump(tmp_path / "out.collapsed")
+
+    lines = (tmp_path / "out.collapsed").read_text().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 1
+    assert stack.endswith(
+        "profiling.tests.test_middleware:test_stack_sampler;"
+        "profiling.tests.test_middleware:busy"
+    )
+
+
+def test_one_cprofile_at_a_time():
+    first, second = CProfiler(), CProfiler()
+
+    first.start()
+    try:
+        with pytest.raises(ProfilerBusy):
+            second.start()
+    finally:
+        first.stop()
+    second.start()
+    second.stop()
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    def test_account_rule(self, client, profiles):
+        """Should be profiled the matching requests of the account."""
+        account = AccountFactory()
+        ProfilingRule.objects.create(account=account, path_prefix="/message-templates/")
+        client.force_login(account)
+
+        client.get(reverse("message_template:list"))
+        client.get(reverse("tag:list"))
+
+        [profile] = profiles.iterdir()
+        assert profile.name.endswith("-message-templates.collapsed")
+
+    def test_other_account(self, client, profiles):
+        """Should not be profiled the requests of other accounts."""
+        ProfilingRule.objects.create(account=AccountFactory())
+        client.force_login(AccountFactory())
+
+        client.get(reverse("message_template:list"))
+
+        assert not list(profiles.iterdir())
+
+    @pytest.mark.parametrize(
+        "rule",
+        [
+            {"sample_percent": 0},
+            {"is_active": False},
+            {"expires_at": timezone.now() - timedelta(minutes=1)},
+        ],
+    )
+    def test_not_armed(self, client, profiles, rule):
+        """Should not be profiled unsampled requests, or with disarmed rules."""
+        ProfilingRule.objects.create(**rule)
+        client.force_login(AccountFactory())
+
+        client.get(reverse("message_template:list"))
+
+        assert not list(profiles.iterdir())
+
+    def test_disarm(self, client, profiles):
+        """Should be applied a changed rule without a restart."""
+        rule = ProfilingRule.objects.create()
+        client.force_login(AccountFactory())
+        client.get(reverse("message_template:list"))
+
+        rule.is_active = False
+        rule.save()
+        client.get(reverse("message_template:list"))
+
+        assert len(list(profiles.iterdir())) == 1
+
+    def test_cprofile_under_asgi(self, profiles):
+        """Should be written a cProfile dump, also for async requests."""
+        account = AccountFactory()
+        ProfilingRule.objects.create(account=account, format=ProfileFormats.CPROFILE)
+        client = AsyncClient()
+
+        async def run():
+            await client.aforce_login(account)
+            return await client.get(reverse("message_template:list"))
+
+        response = async_to_sync(run)()
+
+        assert response.status_code == 200
+        [profile] = profiles.iterdir()
+        assert profile.suffix == ".prof"
+        functions = {name for _, _, name in pstats.Stats(str(profile)).stats}
+        assert "get" in functions
+
+    def test_cprofile_busy(self, client, profiles):
+        """Should be sampled instead while cProfile traces another request."""
+        ProfilingRule.objects.create(format=ProfileFormats.CPROFILE)
+        client.force_login(AccountFactory())
+        other = CProfiler()
+
+        other.start()
+        try:
+            response = client.get(reverse("message_template:list"))
+        finally:
+            other.stop()
+
+        assert response.status_code == 200
+        [profile] = profiles.iterdir()
+        assert profile.suffix == ".collapsed"
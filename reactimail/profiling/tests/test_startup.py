@@ -0,0 +1,69 @@
+import pytest
+from django.core.management import call_command
+
+from profiling.startup import (
+    DEFERRED_MODULES,
+    parse_importtime,
+    profile_startup,
+)
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     faker.providers
+import time:       200 |        300 |   faker
+import time:        50 |        350 | reactimail.models
+import time:        20 |         20 |   django.utils
+import time:        10 |         30 | django.db
+Some warning printed meanwhile
+"""
+
+
+@pytest.fixture(scope="module")
+def startup(django_db_setup, django_db_blocker):
+    """The profile of a new worker using the test database."""
+    with django_db_blocker.unblock():
+        return profile_startup()
+
+
+def test_parse_importtime():
+    modules = {module.name: module for module in parse_importtime(IMPORTTIME)}
+
+    assert list(modules) == [
+        "faker.providers",
+        "faker",
+        "reactimail.models",
+        "django.utils",
+        "django.db",
+    ]
+    assert modules["faker"].depth == 1
+    assert modules["faker"].self_seconds == 0.0002
+    assert modules["reactimail.models"].cumulative_seconds == 0.00035
+    # Faker is counted in the project module importing it.
+    assert [module.project_seconds for module in modules.values()] == [
+        0,
+        0,
+        0.00035,
+        0,
+        0,
+    ]
+
+
+def test_first_request(startup):
+    assert startup.status == 200
+    assert list(startup.phases) == ["setup", "application", "first_request"]
+    assert startup.first_request_seconds > 0
+
+
+@pytest.mark.parametrize("name", DEFERRED_MODULES)
+def test_deferred_modules(startup, name):
+    """Should import heavy optional modules on first use, not at startup."""
+    assert not startup.imported(name)
+
+
+@pytest.mark.django_db
+def test_command(capsys):
+    call_command("startup_profile", "--limit", "3")
+
+    out = capsys.readouterr().out
+    assert "First request (/login/, 200)" in out
+    assert len(out.splitlines()) == 6
@@ -0,0 +1,129 @@
+"""JSON variants of the list and detail views, with conditional GET.
+
+Mix `JSONListMixin` or `JSONDetailMixin` into a list or detail view to answer
+with JSON instead of HTML. The view's `get_queryset()`, and so its account
+scoping, is kept.
+
+Responses carry a strong ETag and Last-Modified derived from `updated_at`. A
+client revalidating with If-None-Match or If-Modified-Since gets a 304 after
+one aggregate or single-column query, before anything is serialized. Those
+queries leave out the queryset's annotations (e.g. tag names), so
+`get_queryset()` may annotate what `serialize()` needs.
+"""
+
+import json
+from hashlib import blake2b
+from uuid import UUID
+
+from django.conf import settings
+from django.core.exceptions import RequestDataTooBig
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def make_etag(*parts) -> str:
+    """A strong (quoted) ETag of `parts`."""
+    digest = blake2b(":".join(map(str, parts)).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def _conditional_response(request, etag: str, last_modified):
+    """The 304 (or 412) response if the client's copy is current, else None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def _set_validators(response, etag: str, last_modified):
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
+
+
+def parse_ids(values) -> list[UUID]:
+    """The ids of a JSON array of UUID strings.
+
+    Raises ValueError if `values` is not one.
+    """
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise ValueError("Expected an array of ids.")
+    return [UUID(value) for value in values]
+
+
+def read_json(request, max_size: int | None = None):
+    """The JSON value of the request body, of at most `max_size` bytes.
+
+    `max_size` defaults to `DATA_UPLOAD_MAX_MEMORY_SIZE`, which `request.body`
+    enforces, but not reading the request as a stream. A longer body is not
+    read past the limit.
+
+    Raises RequestDataTooBig if the body is longer, ValueError if it is not
+    JSON.
+    """
+    if max_size is None:
+        max_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    if max_size is None:
+        return json.load(request)
+    if int(request.META.get("CONTENT_LENGTH") or 0) > max_size:
+        raise RequestDataTooBig(f"The request body exceeds {max_size} bytes.")
+    data = request.read(max_size + 1)
+    if len(data) > max_size:
+        raise RequestDataTooBig(f"The request body exceeds {max_size} bytes.")
+    return json.loads(data)
+
+
+class JSONMixin:
+    # Answer 403 instead of redirecting to the login page.
+    raise_exception = True
+
+    def serialize(self, obj) -> dict:
+        raise NotImplementedError
+
+
+class JSONListMixin(JSONMixin):
+    """A page of objects, `{"results": [...], "next_cursor": ..., ...}`.
+
+    The ETag is computed from the number of objects and their latest
+    `updated_at`, which change on every create, update and delete.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()  # type: ignore[attr-defined]
+        state = await queryset.order_by().aaggregate(
+            count=Count("pk"), last_modified=Max("updated_at")
+        )
+        last_modified = state["last_modified"]
+        etag = make_etag(state["count"], last_modified, request.GET.urlencode())
+        if response := _conditional_response(request, etag, last_modified):
+            return response
+
+        page = await self.apaginate_keyset(queryset)  # type: ignore[attr-defined]
+        data = {
+            "results": [self.serialize(obj) for obj in page.object_list],
+            "next_cursor": page.next_cursor,
+            "previous_cursor": page.previous_cursor,
+        }
+        return _set_validators(JsonResponse(data), etag, last_modified)
+
+
+class JSONDetailMixin(JSONMixin):
+    """One object. The ETag is computed from its id and `updated_at`."""
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()  # type: ignore[attr-defined]
+        pk = self.kwargs["pk"]  # type: ignore[attr-defined]
+        updated_at = await aget_object_or_404(
+            queryset.values_list("updated_at", flat=True), pk=pk
+        )
+        if response := _conditional_response(
+            request, make_etag(pk, updated_at), updated_at
+        ):
+            return response
+
+        obj = await aget_object_or_404(queryset, pk=pk)
+        # The object may have changed since the first query.
+        etag = make_etag(obj.pk, obj.updated_at)
+        return _set_validators(JsonResponse(self.serialize(obj)), etag, obj.updated_at)
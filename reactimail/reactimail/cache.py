@@ -0,0 +1,142 @@
+"""Per-account versioned caching of listings.
+
+Every cached listing of an account (e.g. its tag and message template pages)
+is keyed by a version number of that account. Changing any tag or message
+template of the account bumps the version (see the `signals` modules), which
+invalidates all of them at once.
+
+Like sessions (see `reactimail.sessions`), cache errors are logged: listings
+are then built uncached, and saves keep working. A listing that could not be
+invalidated then stays until it expires (`LISTING_CACHE_TIMEOUT`).
+"""
+
+import logging
+from hashlib import blake2b
+from time import time_ns
+from typing import Awaitable, Callable, TypeVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django_ratelimit.checks import KNOWN_BROKEN_CACHE_BACKENDS
+
+from .pagination import KeysetPage, KeysetPaginationMixin
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+_missing = object()
+
+
+def require_shared_cache() -> None:
+    """Check that rate limit counters are shared between the serving processes.
+
+    Raises ImproperlyConfigured without DEBUG if they are per process (i.e.
+    without REDIS_URL): each worker would then allow the full rate.
+    """
+    backend = settings.CACHES[settings.RATELIMIT_USE_CACHE]["BACKEND"]
+    if not settings.DEBUG and backend in KNOWN_BROKEN_CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f"REDIS_URL is required to serve requests with DEBUG=False: the rate "
+            f"limit cache {backend} {KNOWN_BROKEN_CACHE_BACKENDS[backend]}."
+        )
+
+
+def _version_key(account_id) -> str:
+    return f"listings:{account_id}:version"
+
+
+def get_listing_version(account_id) -> int:
+    version = cache.get(_version_key(account_id))
+    if version is None:
+        # Start from a timestamp, so an evicted version is never reused.
+        cache.add(_version_key(account_id), time_ns(), timeout=None)
+        version = cache.get(_version_key(account_id), time_ns())
+    return version
+
+
+async def aget_listing_version(account_id) -> int:
+    version = await cache.aget(_version_key(account_id))
+    if version is None:
+        await cache.aadd(_version_key(account_id), time_ns(), timeout=None)
+        version = await cache.aget(_version_key(account_id), time_ns())
+    return version
+
+
+def invalidate_listings(*account_ids) -> None:
+    """Drop every cached listing of the accounts, if the cache is available."""
+    for account_id in set(account_ids):
+        try:
+            try:
+                cache.incr(_version_key(account_id))
+            except ValueError:
+                cache.set(_version_key(account_id), time_ns(), timeout=None)
+        except Exception:
+            logger.exception("Error using the cache (%s)", cache)
+
+
+def _listing_key(account_id, version: int, name: str, parts) -> str:
+    variant = blake2b(":".join(parts).encode(), digest_size=16).hexdigest()
+    return f"listings:{account_id}:{version}:{name}:{variant}"
+
+
+def cached_listing(account_id, name: str, build: Callable[[], T], *parts: str) -> T:
+    """Return the cached listing `name` of the account, or build and cache it.
+
+    `parts` identify the variant of the listing, e.g. the page cursor.
+    """
+    try:
+        key = _listing_key(account_id, get_listing_version(account_id), name, parts)
+        value = cache.get(key, _missing)
+    except Exception:
+        logger.exception("Error using the cache (%s)", cache)
+        return build()
+    if value is _missing:
+        value = build()
+        try:
+            cache.set(key, value, timeout=settings.LISTING_CACHE_TIMEOUT)
+        except Exception:
+            logger.exception("Error using the cache (%s)", cache)
+    return value  # type: ignore[return-value]
+
+
+async def acached_listing(
+    account_id, name: str, build: Callable[[], Awaitable[T]], *parts: str
+) -> T:
+    """See `cached_listing()`, with an async `build`."""
+    try:
+        version = await aget_listing_version(account_id)
+        key = _listing_key(account_id, version, name, parts)
+        value = await cache.aget(key, _missing)
+    except Exception:
+        logger.exception("Error using the cache (%s)", cache)
+        return await build()
+    if value is _missing:
+        value = await build()
+        try:
+            await cache.aset(key, value, timeout=settings.LISTING_CACHE_TIMEOUT)
+        except Exception:
+            logger.exception("Error using the cache (%s)", cache)
+    return value  # type: ignore[return-value]
+
+
+class CachedKeysetPaginationMixin(KeysetPaginationMixin):
+    """Keyset pagination whose pages are cached per account."""
+
+    listing_name: str
+
+    def get_listing_parts(self) -> tuple[str, ...]:
+        """What else than the cursor selects the page, e.g. filters."""
+        return ()
+
+    async def apaginate_keyset(self, queryset) -> KeysetPage:
+        request = self.request  # type: ignore[attr-defined]
+        return await acached_listing(
+            request.user.pk,
+            self.listing_name,
+            lambda: super(CachedKeysetPaginationMixin, self).apaginate_keyset(queryset),
+            request.GET.get("after", ""),
+            request.GET.get("before", ""),
+            *self.get_listing_parts(),
+        )
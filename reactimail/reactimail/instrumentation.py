@@ -0,0 +1,198 @@
+"""Opt-in instrumentation of requests: view, rendering and database time.
+
+`RequestInstrumentationMiddleware` records every database query (through
+`connection.execute_wrapper()`) and the time spent rendering templates with
+the `DjangoTemplates` backend below. It adds them, and the rest of the time
+spent in the view, to the `Server-Timing` header and logs one JSON line per
+request to the `reactimail.instrumentation` logger.
+
+Queries with the same SQL run more than once in a request, e.g. one
+`tag_names` query per listed template, are reported as duplicates and the
+line is logged as a warning.
+
+`settings.REQUEST_INSTRUMENTATION` selects the instrumented requests:
+
+- "off": none, and the middleware is removed from the stack.
+- "staff": those of staff users sending an `X-Reactimail-Instrument` header.
+- "all": every request.
+
+Only queries run on the request's thread are recorded, not those run by
+`sync_to_async(thread_sensitive=False)`. The time of streaming responses
+ends when their streaming starts.
+"""
+
+import json
+import logging
+from contextlib import ExitStack, contextmanager
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+
+from .timing import server_timing
+
+logger = logging.getLogger(__name__)
+
+HEADER = "HTTP_X_REACTIMAIL_INSTRUMENT"
+"""The `META` key of the header enabling instrumentation for staff."""
+
+MAX_REPORTED_DUPLICATES = 5
+
+
+class QueryRecorder:
+    """An execute wrapper counting and timing queries by SQL."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.by_sql: dict[str, list] = {}
+        """`[count, seconds]` of each SQL."""
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            stats = self.by_sql.setdefault(sql, [0, 0.0])
+            stats[0] += 1
+            stats[1] += elapsed
+
+    @contextmanager
+    def installed(self):
+        """Record the queries of every database on the current thread."""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    def duplicates(self) -> list[dict]:
+        """The most repeated queries, as `{"sql": ..., "count": n, "ms": ...}`."""
+        repeated = sorted(
+            (
+                (count, seconds, sql)
+                for sql, (count, seconds) in self.by_sql.items()
+                if count > 1
+            ),
+            reverse=True,
+        )
+        return [
+            {"sql": sql, "count": count, "ms": round(seconds * 1000, 3)}
+            for count, seconds, sql in repeated[:MAX_REPORTED_DUPLICATES]
+        ]
+
+
+class RequestMeasurement:
+    """The timings of one request, available as `request.instrumentation`."""
+
+    def __init__(self):
+        self.queries = QueryRecorder()
+        self.started = perf_counter()
+        self.render_seconds = 0.0
+
+    def finish(self, request, response):
+        total = perf_counter() - self.started
+        durations = {
+            "total": total,
+            "view": total - self.render_seconds,
+            "render": self.render_seconds,
+            "db": self.queries.seconds,
+        }
+        timing = server_timing(**durations)
+        if existing := response.headers.get("Server-Timing"):
+            timing = f"{existing}, {timing}"
+        response.headers["Server-Timing"] = timing
+
+        duplicates = self.queries.duplicates()
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **{f"{name}_ms": round(s * 1000, 3) for name, s in durations.items()},
+            "queries": self.queries.count,
+            "duplicate_queries": duplicates,
+        }
+        level = logging.WARNING if duplicates else logging.INFO
+        logger.log(level, json.dumps(record))
+        return response
+
+
+class RequestInstrumentationMiddleware:
+    """See the module docstring. Place it after `AuthenticationMiddleware`."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.mode = settings.REQUEST_INSTRUMENTATION
+        if self.mode not in ("staff", "all"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        # Cheap checks first, so that other requests skip the user lookup.
+        if self.mode != "all" and not (
+            request.META.get(HEADER) and request.user.is_staff
+        ):
+            return self.get_response(request)
+
+        measurement = request.instrumentation = RequestMeasurement()
+        with measurement.queries.installed():
+            response = self.get_response(request)
+        return measurement.finish(request, response)
+
+    async def __acall__(self, request):
+        if self.mode != "all" and not (
+            request.META.get(HEADER) and (await request.auser()).is_staff
+        ):
+            return await self.get_response(request)
+
+        measurement = request.instrumentation = RequestMeasurement()
+        # Database connections are per thread, so install the recorder on the
+        # thread running the request's sync code (the ORM queries).
+        stack = ExitStack()
+        await sync_to_async(stack.enter_context)(measurement.queries.installed())
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return measurement.finish(request, response)
+
+
+class Template(django_backend.Template):
+    def render(self, context=None, request=None):
+        measurement = getattr(request, "instrumentation", None)
+        if measurement is None:
+            return super().render(context, request)
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            measurement.render_seconds += perf_counter() - started
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Django's template backend, timing renders of instrumented requests.
+
+    Included and extended templates are rendered within the outer template.
+    """
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
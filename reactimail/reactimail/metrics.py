@@ -0,0 +1,32 @@
+"""Runtime metrics for operators (staff only)."""
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import JsonResponse
+
+from account.hashing import login_hashing_stats
+
+
+def database_pool_stats() -> dict[str, dict | None]:
+    """The psycopg pool statistics of this process, by database alias.
+
+    `pool_size` is the number of open connections, `pool_available` the idle
+    ones and `requests_waiting` the requests waiting for a connection. The
+    counters (e.g. `requests_num`, `connections_num`) are since the pool was
+    opened. The value is None for a database without a pool.
+    """
+    stats = {}
+    for alias in connections:
+        pool = getattr(connections[alias], "pool", None)
+        stats[alias] = pool.get_stats() if pool is not None else None
+    return stats
+
+
+@staff_member_required
+def database_pool_metrics(request):
+    return JsonResponse(database_pool_stats())
+
+
+@staff_member_required
+def login_hashing_metrics(request):
+    return JsonResponse(login_hashing_stats())
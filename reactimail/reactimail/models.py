@@ -1,13 +1,15 @@
-from random import randint
+import random
 from uuid import uuid4
 
-from faker import Faker
 from django.db import models
 
+from .words import load_words, random_nickname
+
+_random = random.Random()
+
 
 def generate_random_nickname():
-    faker = Faker()
-    return f"{faker.word()}-{faker.word()}-{randint(100000, 999999)}"
+    return random_nickname(_random, load_words())
 
 
 class BaseModelMixin(models.Model):
@@ -0,0 +1,108 @@
+"""Keyset (cursor) pagination for list views.
+
+Pages are selected with a range condition on a unique ordering, e.g.
+`(name, id)`, instead of OFFSET, so page N costs the same index range scan as
+page 1.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
+from django.http import Http404
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    next_cursor: str | None = None
+    previous_cursor: str | None = None
+
+    @property
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    return urlsafe_base64_encode(
+        json.dumps(list(values), cls=DjangoJSONEncoder).encode()
+    )
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        values = json.loads(urlsafe_base64_decode(cursor))
+    except ValueError as e:
+        raise Http404("Invalid cursor.") from e
+    if not isinstance(values, list) or len(values) != size:
+        raise Http404("Invalid cursor.")
+    return values
+
+
+def keyset_condition(fields: Sequence[str], values: Sequence[Any], op: str) -> Q:
+    """Build `(fields) > (values)` (or `<` with `op="lt"`).
+
+    The leading field is also bounded with `>=`, so the database can use it for
+    an index range scan. For `("name", "id")` this is
+    `name >= x AND (name > x OR id > y)`.
+    """
+    field, *rest_fields = fields
+    value, *rest_values = values
+    if not rest_fields:
+        return Q(**{f"{field}__{op}": value})
+    return Q(**{f"{field}__{op}e": value}) & (
+        Q(**{f"{field}__{op}": value}) | keyset_condition(rest_fields, rest_values, op)
+    )
+
+
+class KeysetPaginationMixin:
+    """Paginate a list view by `?after=<cursor>` / `?before=<cursor>`.
+
+    `keyset` must be a unique ordering, ending with a unique field such as `id`.
+    """
+
+    keyset: Sequence[str] = ("id",)
+    page_size = 50
+
+    async def apaginate_keyset(self, queryset: QuerySet) -> KeysetPage:
+        after = self.request.GET.get("after")  # type: ignore[attr-defined]
+        before = self.request.GET.get("before")  # type: ignore[attr-defined]
+
+        if before:
+            values = decode_cursor(before, len(self.keyset))
+            ordering = [f"-{field}" for field in self.keyset]
+            queryset = queryset.filter(keyset_condition(self.keyset, values, "lt"))
+            rows = [
+                obj async for obj in queryset.order_by(*ordering)[: self.page_size + 1]
+            ]
+            has_more = len(rows) > self.page_size
+            rows = rows[: self.page_size][::-1]
+            return KeysetPage(
+                object_list=rows,
+                next_cursor=self._cursor(rows[-1]) if rows else None,
+                previous_cursor=self._cursor(rows[0]) if has_more else None,
+            )
+
+        if after:
+            values = decode_cursor(after, len(self.keyset))
+            queryset = queryset.filter(keyset_condition(self.keyset, values, "gt"))
+        rows = [
+            obj async for obj in queryset.order_by(*self.keyset)[: self.page_size + 1]
+        ]
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        return KeysetPage(
+            object_list=rows,
+            next_cursor=self._cursor(rows[-1]) if has_more else None,
+            previous_cursor=self._cursor(rows[0]) if after and rows else None,
+        )
+
+    def _cursor(self, obj) -> str:
+        return encode_cursor([getattr(obj, field) for field in self.keyset])
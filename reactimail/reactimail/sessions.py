@@ -0,0 +1,80 @@
+"""The session engine: sessions cached in Redis, and saved in the database.
+
+Like Django's `cached_db` engine, sessions are read from the cache, and from
+the database on a miss, so a logged in request runs no session query. Here
+every cache error falls back to the database (and is logged), so requests
+keep working while Redis is unavailable. A session deleted meanwhile (e.g. at
+logout) may then stay in the cache until its expiry.
+"""
+
+import logging
+
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+logger = logging.getLogger("django.contrib.sessions")
+
+
+class SessionStore(CachedDBStore):
+    def _cache_call(self, method: str, *args):
+        try:
+            return getattr(self._cache, method)(*args)
+        except Exception:
+            logger.exception("Error using the cache (%s)", self._cache)
+            return None
+
+    async def _acache_call(self, method: str, *args):
+        try:
+            return await getattr(self._cache, method)(*args)
+        except Exception:
+            logger.exception("Error using the cache (%s)", self._cache)
+            return None
+
+    def load(self):
+        data = self._cache_call("get", self.cache_key)
+        if data is None:
+            session = self._get_session_from_db()
+            if not session:
+                return {}
+            data = self.decode(session.session_data)
+            expiry_age = self.get_expiry_age(expiry=session.expire_date)
+            self._cache_call("set", self.cache_key, data, expiry_age)
+        return data
+
+    async def aload(self):
+        cache_key = await self.acache_key()
+        data = await self._acache_call("aget", cache_key)
+        if data is None:
+            session = await self._aget_session_from_db()
+            if not session:
+                return {}
+            data = self.decode(session.session_data)
+            expiry_age = await self.aget_expiry_age(expiry=session.expire_date)
+            await self._acache_call("aset", cache_key, data, expiry_age)
+        return data
+
+    def exists(self, session_key):
+        if session_key and self._cache_call(
+            "has_key", self.cache_key_prefix + session_key
+        ):
+            return True
+        return DBStore.exists(self, session_key)
+
+    async def aexists(self, session_key):
+        if session_key and await self._acache_call(
+            "ahas_key", self.cache_key_prefix + session_key
+        ):
+            return True
+        return await DBStore.aexists(self, session_key)
+
+    def delete(self, session_key=None):
+        DBStore.delete(self, session_key)
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            self._cache_call("delete", self.cache_key_prefix + session_key)
+
+    async def adelete(self, session_key=None):
+        await DBStore.adelete(self, session_key)
+        session_key = session_key or self.session_key
+        if session_key is not None:
+            await self._acache_call("adelete", self.cache_key_prefix + session_key)
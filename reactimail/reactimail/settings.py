@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 
 from os import getenv
 from pathlib import Path
+from typing import Any
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,9 +39,12 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
+    "django_ratelimit",
     "account.apps.AccountConfig",
     "tag.apps.TagConfig",
     "message_template.apps.MessageTemplateConfig",
+    "profiling.apps.ProfilingConfig",
 ]
 
 MIDDLEWARE = [
@@ -49,6 +53,8 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "reactimail.instrumentation.RequestInstrumentationMiddleware",
+    "profiling.middleware.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -57,7 +63,8 @@ ROOT_URLCONF = "reactimail.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # Django's backend, timing renders (see reactimail.instrumentation).
+        "BACKEND": "reactimail.instrumentation.DjangoTemplates",
         "DIRS": [
             BASE_DIR / "templates",
         ],
@@ -79,7 +86,7 @@ WSGI_APPLICATION = "reactimail.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
+DATABASES: dict[str, dict[str, Any]] = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
         "NAME": getenv("POSTGRES_DB"),
@@ -87,12 +94,103 @@ DATABASES = {
         "PASSWORD": getenv("POSTGRES_PASSWORD"),
         "HOST": getenv("POSTGRES_HOST"),
         "PORT": getenv("POSTGRES_PORT"),
+        # Check a reused connection before a request uses it.
+        "CONN_HEALTH_CHECKS": True,
     }
 }
 
+# Reuse connections instead of connecting to Postgres for every request.
+# By default each process keeps a psycopg pool, which also works under ASGI.
+# With POSTGRES_POOL_MAX_SIZE=0 there is no pool, and each thread keeps its
+# connection for POSTGRES_CONN_MAX_AGE seconds (0: close after each request).
+# https://docs.djangoproject.com/en/5.1/ref/databases/#connection-pool
+POSTGRES_POOL_MIN_SIZE = int(getenv("POSTGRES_POOL_MIN_SIZE", "2"))
+POSTGRES_POOL_MAX_SIZE = int(getenv("POSTGRES_POOL_MAX_SIZE", "10"))
+
+if POSTGRES_POOL_MAX_SIZE > 0:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": min(POSTGRES_POOL_MIN_SIZE, POSTGRES_POOL_MAX_SIZE),
+            "max_size": POSTGRES_POOL_MAX_SIZE,
+        }
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(getenv("POSTGRES_CONN_MAX_AGE", "60"))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+REDIS_URL = getenv("REDIS_URL")
+
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+        if REDIS_URL
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    )
+}
+
+# Rate limit counters (e.g. login attempts) must be shared between workers and
+# incremented atomically, which the Redis cache does with INCR and key TTLs.
+# https://django-ratelimit.readthedocs.io/en/stable/installation.html
+RATELIMIT_USE_CACHE = "default"
+
+SILENCED_SYSTEM_CHECKS = [
+    # Django's own Redis backend is not on django-ratelimit's list, but works.
+    "django_ratelimit.W001",
+    # Per-process counters are acceptable for local development and management
+    # commands only. Serving requests without DEBUG requires a shared cache
+    # instead (see `require_shared_cache()` in reactimail/cache.py).
+    "django_ratelimit.E003",
+]
+
+# The seconds to keep a cached tag or message template listing of an account.
+LISTING_CACHE_TIMEOUT = int(getenv("LISTING_CACHE_TIMEOUT", str(60 * 10)))
+
+# Password hashing of logins (see account/hashing.py): the threads hashing at
+# once per process, and the logins that may wait for one (others get a 503).
+LOGIN_HASHING_WORKERS = int(getenv("LOGIN_HASHING_WORKERS", "2"))
+LOGIN_HASHING_MAX_QUEUE = int(getenv("LOGIN_HASHING_MAX_QUEUE", "32"))
+
+# Which requests report their view, render and query timings: "off", "staff"
+# (staff users sending an X-Reactimail-Instrument header) or "all".
+REQUEST_INSTRUMENTATION = getenv("REQUEST_INSTRUMENTATION", "staff")
+
+# Profiles of the requests matching a profiling rule (see the admin).
+PROFILING_OUTPUT_DIR = getenv("PROFILING_OUTPUT_DIR", str(BASE_DIR / "profiles"))
+# The seconds between two stack samples of a profiled request.
+PROFILING_SAMPLE_INTERVAL = float(getenv("PROFILING_SAMPLE_INTERVAL", "0.005"))
+# The seconds after which a process sees changed profiling rules.
+PROFILING_RULES_REFRESH = float(getenv("PROFILING_RULES_REFRESH", "10"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "reactimail.instrumentation": {"handlers": ["console"], "level": "INFO"},
+        "profiling": {"handlers": ["console"], "level": "INFO"},
+    },
+}
+
 
 # Authentication settings
 AUTH_USER_MODEL = "account.ReactiMailUser"
+AUTHENTICATION_BACKENDS = ["account.backends.CachedModelBackend"]
+# The seconds to cache the user of a session (0: load it on every request).
+AUTH_USER_CACHE_TIMEOUT = int(getenv("AUTH_USER_CACHE_TIMEOUT", "300"))
+
+# Sessions are cached (in Redis) in front of the database (see
+# reactimail/sessions.py). Without REDIS_URL the cache is per process, so a
+# logout is only seen by its own process until the session expires there:
+# acceptable for local development only.
+SESSION_ENGINE = "reactimail.sessions"
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -138,3 +236,10 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Home url.
 LOGIN_URL = "/login/"
+
+
+# Compiled message template cache.
+# The number of compiled bodies kept per process.
+MESSAGE_TEMPLATE_CACHE_SIZE = int(getenv("MESSAGE_TEMPLATE_CACHE_SIZE", "1024"))
+# The alias in `CACHES` shared between processes (e.g. Redis). Disabled if unset.
+MESSAGE_TEMPLATE_CACHE_ALIAS = getenv("MESSAGE_TEMPLATE_CACHE_ALIAS") or None
@@ -0,0 +1,81 @@
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+from reactimail.cache import cached_listing, require_shared_cache
+from tag.tests.factories import TagFactory
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+REDIS = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379",
+    }
+}
+
+
+class TestRequireSharedCache:
+    def test_per_process_cache(self, settings):
+        """Should refuse to serve requests with per-process rate limits."""
+        settings.DEBUG = False
+        settings.CACHES = LOCMEM
+
+        with pytest.raises(ImproperlyConfigured, match="REDIS_URL is required"):
+            require_shared_cache()
+
+    def test_debug(self, settings):
+        settings.DEBUG = True
+        settings.CACHES = LOCMEM
+
+        require_shared_cache()
+
+    def test_redis(self, settings):
+        settings.DEBUG = False
+        settings.CACHES = REDIS
+
+        require_shared_cache()
+
+    def test_management_commands(self, settings):
+        """Should not fail the system checks of management commands."""
+        settings.DEBUG = False
+        settings.CACHES = LOCMEM
+
+        call_command("check")
+
+
+def broken_cache():
+    methods = ("get", "set", "add", "incr", "delete", "has_key")
+    return mock.patch.multiple(
+        cache,
+        **{
+            prefix + method: mock.Mock(side_effect=ConnectionError)
+            for method in methods
+            for prefix in ("", "a")
+        },
+    )
+
+
+@pytest.mark.django_db
+class TestCacheErrors:
+    def test_cached_listing(self):
+        with broken_cache():
+            assert cached_listing(1, "tags", lambda: ["a"]) == ["a"]
+
+    def test_list_page_and_save(self, client):
+        """Should list and save uncached while the cache fails."""
+        account = AccountFactory()
+        tag = TagFactory(account=account, name="a")
+        client.force_login(account)
+
+        with broken_cache():
+            tag.name = "b"
+            tag.save()
+            response = client.get(reverse("tag:list"))
+
+        assert response.status_code == 200
+        assert "b" in [tag.name for tag in response.context["object_list"]]
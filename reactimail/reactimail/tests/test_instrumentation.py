@@ -0,0 +1,119 @@
+import json
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import AsyncClient
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+from reactimail.instrumentation import RequestInstrumentationMiddleware
+from message_template.tests.factories import MessageTemplateFactory
+from tag.models import Tag
+from tag.tests.factories import TagFactory
+
+HEADER = {"X-Reactimail-Instrument": "1"}
+
+
+def records(caplog):
+    return [
+        json.loads(record.message)
+        for record in caplog.records
+        if record.name == "reactimail.instrumentation"
+    ]
+
+
+@pytest.mark.django_db
+class TestRequestInstrumentationMiddleware:
+    def test_staff_with_header(self, client, caplog):
+        """Should be reported the timings of a staff user's request."""
+        account = AccountFactory(is_staff=True)
+        TagFactory(account=account)
+        client.force_login(account)
+
+        with caplog.at_level(logging.INFO, "reactimail.instrumentation"):
+            response = client.get(reverse("tag:list"), headers=HEADER)
+
+        names = [item.split(";")[0] for item in response["Server-Timing"].split(", ")]
+        assert names == ["total", "view", "render", "db"]
+        [record] = records(caplog)
+        assert record["path"] == reverse("tag:list")
+        assert record["status"] == 200
+        assert record["queries"] >= 1
+        assert record["render_ms"] > 0
+
+    def test_not_staff(self, client, caplog):
+        """Should be ignored the header of other users."""
+        client.force_login(AccountFactory())
+
+        with caplog.at_level(logging.INFO, "reactimail.instrumentation"):
+            response = client.get(reverse("tag:list"), headers=HEADER)
+
+        assert "Server-Timing" not in response
+        assert not records(caplog)
+
+    def test_without_header(self, client):
+        """Should not be instrumented a staff user's requests by default."""
+        client.force_login(AccountFactory(is_staff=True))
+
+        response = client.get(reverse("tag:list"))
+
+        assert "Server-Timing" not in response
+
+    def test_all(self, client, settings):
+        """Should be instrumented every request in the "all" mode."""
+        settings.REQUEST_INSTRUMENTATION = "all"
+
+        response = client.get(reverse("account:login"))
+
+        assert "Server-Timing" in response
+
+    def test_appends_to_server_timing(self, caplog):
+        """Should be kept the Server-Timing of the view, under ASGI too."""
+        account = AccountFactory(is_staff=True)
+        template = MessageTemplateFactory(account=account, body="${name}")
+        client = AsyncClient()
+
+        async def run():
+            await client.aforce_login(account)
+            url = reverse("message_template:preview", args=[template.pk])
+            return await client.get(url, {"name": "x"}, headers=HEADER)
+
+        with caplog.at_level(logging.INFO, "reactimail.instrumentation"):
+            response = async_to_sync(run)()
+
+        assert response.status_code == 200
+        # The view's queries run on another thread.
+        assert records(caplog)[0]["queries"] >= 1
+        names = [item.split(";")[0] for item in response["Server-Timing"].split(", ")]
+        assert names == ["db", "render", "total", "view", "render", "db"]
+
+    def test_duplicate_queries(self, rf, caplog):
+        """Should be logged as a warning repeated queries (N+1)."""
+        account = AccountFactory(is_staff=True)
+        TagFactory.create_batch(3, account=account)
+
+        def view(request):
+            for tag in Tag.objects.filter(account=account):
+                list(tag.message_templates.all())
+            return HttpResponse()
+
+        request = rf.get("/", headers=HEADER)
+        request.user = account
+        with caplog.at_level(logging.INFO, "reactimail.instrumentation"):
+            RequestInstrumentationMiddleware(view)(request)
+
+        [record] = records(caplog)
+        assert caplog.records[-1].levelno == logging.WARNING
+        assert record["queries"] == 4
+        assert record["duplicate_queries"][0]["count"] == 3
+        assert "message_template" in record["duplicate_queries"][0]["sql"]
+
+    def test_off(self, settings):
+        """Should be removed from the stack when off."""
+        settings.REQUEST_INSTRUMENTATION = "off"
+
+        with pytest.raises(MiddlewareNotUsed):
+            RequestInstrumentationMiddleware(lambda request: HttpResponse())
@@ -0,0 +1,40 @@
+from unittest import mock
+
+import pytest
+from django.db import connections
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+
+
+class TestDatabasePoolMetrics:
+    @pytest.mark.django_db
+    def test_staff(self, client, settings):
+        """Should be returned the pool statistics of each database."""
+        client.force_login(AccountFactory(is_staff=True))
+        response = client.get(reverse("database_pool_metrics"))
+
+        assert response.status_code == 200
+        stats = response.json()["default"]
+        assert stats["pool_max"] == settings.POSTGRES_POOL_MAX_SIZE
+        assert stats["pool_size"] >= 1
+
+    @pytest.mark.django_db
+    def test_without_pool(self, client):
+        """Should be returned null for a database without a pool."""
+        client.force_login(AccountFactory(is_staff=True))
+        options = connections["default"].settings_dict["OPTIONS"]
+        with mock.patch.dict(options):
+            del options["pool"]
+            response = client.get(reverse("database_pool_metrics"))
+
+        assert response.json() == {"default": None}
+
+    @pytest.mark.django_db
+    def test_not_staff(self, client):
+        """Should be redirected to the admin login unless staff."""
+        client.force_login(AccountFactory())
+        response = client.get(reverse("database_pool_metrics"))
+
+        assert response.status_code == 302
+        assert response.url.startswith(reverse("admin:login"))
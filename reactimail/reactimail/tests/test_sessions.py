@@ -0,0 +1,75 @@
+from unittest import mock
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.urls import reverse
+
+from account.constants import SESSION_EXPIRE_SECONDS
+from account.tests.factories import AccountFactory
+from reactimail.sessions import SessionStore
+
+
+def broken_cache():
+    return mock.patch.multiple(
+        cache,
+        get=mock.Mock(side_effect=ConnectionError),
+        set=mock.Mock(side_effect=ConnectionError),
+        has_key=mock.Mock(side_effect=ConnectionError),
+        delete=mock.Mock(side_effect=ConnectionError),
+    )
+
+
+@pytest.mark.django_db
+class TestSessionStore:
+    def test_cached(self, django_assert_num_queries):
+        session = SessionStore()
+        session["key"] = "value"
+        session.save()
+
+        with django_assert_num_queries(0):
+            assert SessionStore(session.session_key)["key"] == "value"
+
+    def test_cache_error_falls_back_to_database(self):
+        session = SessionStore()
+        session["key"] = "value"
+        session.save()
+
+        with broken_cache():
+            assert SessionStore(session.session_key)["key"] == "value"
+            assert SessionStore().exists(session.session_key)
+            session.delete()
+
+        assert not Session.objects.filter(session_key=session.session_key).exists()
+
+    def test_cycle_key(self):
+        session = SessionStore()
+        session["key"] = "value"
+        session.save()
+        old_key = session.session_key
+
+        session.cycle_key()
+
+        assert session["key"] == "value"
+        assert not SessionStore().exists(old_key)
+        assert SessionStore(session.session_key)["key"] == "value"
+
+    def test_login_expiry(self, client):
+        """Should be cached no longer than the session of a login lasts."""
+        AccountFactory(email="testuser@example.com", password="testpassword")
+        cache.clear()  # reset ratelimit.
+
+        with mock.patch.object(cache, "set", wraps=cache.set) as cache_set:
+            client.post(
+                reverse("account:login"),
+                {"email": "testuser@example.com", "password": "testpassword"},
+            )
+
+        session_key = client.cookies["sessionid"].value
+        timeouts = [
+            call.args[2]
+            for call in cache_set.call_args_list
+            if session_key in call.args[0]
+        ]
+        # The last save is the one after set_expiry().
+        assert timeouts[-1] == SESSION_EXPIRE_SECONDS
@@ -0,0 +1,13 @@
+"""Helpers for reporting server-side timings to clients."""
+
+
+def server_timing(**durations: float) -> str:
+    """Format durations in seconds as a `Server-Timing` header value.
+
+    Example:
+        response.headers["Server-Timing"] = server_timing(db=0.002, render=0.01)
+        # "db;dur=2.000, render;dur=10.000" (milliseconds)
+    """
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.3f}" for name, seconds in durations.items()
+    )
@@ -18,6 +18,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, re_path, path
 
+from .metrics import database_pool_metrics, login_hashing_metrics
+
 urlpatterns = [
     re_path(r"", include(("home.urls", "home"), namespace="home")),
     re_path(r"", include(("account.urls", "account"), namespace="account")),
@@ -26,5 +28,20 @@ urlpatterns = [
         "message-templates/",
         include("message_template.urls", namespace="message_template"),
     ),
+    path("api/tags/", include("tag.api_urls", namespace="tag_api")),
+    path(
+        "api/message-templates/",
+        include("message_template.api_urls", namespace="message_template_api"),
+    ),
+    path(
+        "metrics/database-pool/",
+        database_pool_metrics,
+        name="database_pool_metrics",
+    ),
+    path(
+        "metrics/login-hashing/",
+        login_hashing_metrics,
+        name="login_hashing_metrics",
+    ),
     path("admin/", admin.site.urls),
 ]
@@ -0,0 +1,139 @@
+"""Async generic views for account-scoped CRUD pages.
+
+Django's generic class-based views are synchronous, so under ASGI each
+request is handed to a thread pool. These views keep the same contract
+(`model`, `form_class`, `template_name`, `success_url`, `get_queryset()`)
+but await the ORM, so one process can serve many concurrent slow clients.
+Form validation and saving are still synchronous in Django and run through
+`sync_to_async`.
+"""
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.mixins import AccessMixin
+from django.db.models import Model
+from django.forms import BaseForm
+from django.http import HttpResponseRedirect
+from django.shortcuts import aget_object_or_404, render
+from django.views import View
+
+
+class AsyncLoginRequiredMixin(AccessMixin):
+    """LoginRequiredMixin for views with async handlers."""
+
+    def dispatch(self, request, *args, **kwargs):
+        return self._adispatch(request, *args, **kwargs)
+
+    async def _adispatch(self, request, *args, **kwargs):
+        # Load the user without blocking, and keep it for sync code paths.
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncSingleObjectMixin:
+    model: type[Model] | None = None
+    template_name: str
+    kwargs: dict
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    async def aget_object(self):
+        return await aget_object_or_404(self.get_queryset(), pk=self.kwargs["pk"])
+
+    def get_context_data(self, **kwargs):
+        kwargs.setdefault("view", self)
+        return kwargs
+
+
+class AsyncListView(AsyncLoginRequiredMixin, View):
+    """A list page. Mix in `KeysetPaginationMixin` for `apaginate_keyset()`."""
+
+    model: type[Model] | None = None
+    template_name: str
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    async def aget_context_data(self, **kwargs):
+        kwargs.setdefault("view", self)
+        return kwargs
+
+    async def get(self, request, *args, **kwargs):
+        page = await self.apaginate_keyset(self.get_queryset())
+        context = await self.aget_context_data(
+            object_list=page.object_list,
+            cursor_page=page,
+            is_paginated=page.has_next or page.has_previous,
+        )
+        return render(request, self.template_name, context)
+
+
+class AsyncDetailView(AsyncLoginRequiredMixin, AsyncSingleObjectMixin, View):
+    async def get(self, request, *args, **kwargs):
+        obj = await self.aget_object()
+        return render(request, self.template_name, self.get_context_data(object=obj))
+
+
+class AsyncBaseFormView(AsyncLoginRequiredMixin, AsyncSingleObjectMixin, View):
+    """Shared handling of the create and update views."""
+
+    form_class: type[BaseForm] | None = None
+    success_url = None
+
+    def get_form_kwargs(self, instance):
+        kwargs = {"instance": instance}
+        if self.request.method == "POST":
+            kwargs.update(data=self.request.POST, files=self.request.FILES)
+        return kwargs
+
+    def get_form(self, instance):
+        return self.form_class(**self.get_form_kwargs(instance))
+
+    def form_valid(self, form):
+        form.save()
+
+    async def aget_instance(self):
+        raise NotImplementedError
+
+    async def get(self, request, *args, **kwargs):
+        instance = await self.aget_instance()
+        # Model forms may query (e.g. initial M2M values) while being built.
+        form = await sync_to_async(self.get_form)(instance)
+        return self._render_form(form, instance)
+
+    async def post(self, request, *args, **kwargs):
+        instance = await self.aget_instance()
+        form = await sync_to_async(self.get_form)(instance)
+        if await sync_to_async(form.is_valid)():
+            await sync_to_async(self.form_valid)(form)
+            return HttpResponseRedirect(str(self.success_url))
+        return self._render_form(form, instance)
+
+    def _render_form(self, form, instance):
+        context = self.get_context_data(form=form, object=instance)
+        return render(self.request, self.template_name, context)
+
+
+class AsyncCreateView(AsyncBaseFormView):
+    async def aget_instance(self):
+        return None
+
+
+class AsyncUpdateView(AsyncBaseFormView):
+    async def aget_instance(self):
+        return await self.aget_object()
+
+
+class AsyncDeleteView(AsyncLoginRequiredMixin, AsyncSingleObjectMixin, View):
+    success_url = None
+
+    async def get(self, request, *args, **kwargs):
+        obj = await self.aget_object()
+        return render(request, self.template_name, self.get_context_data(object=obj))
+
+    async def post(self, request, *args, **kwargs):
+        obj = await self.aget_object()
+        await obj.adelete()
+        return HttpResponseRedirect(str(self.success_url))
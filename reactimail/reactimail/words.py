@@ -0,0 +1,20 @@
+"""Random words and nicknames, from a word list loaded once per process.
+
+Building a `Faker()` takes milliseconds, too slow to do per generated row.
+"""
+
+import random
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def load_words() -> tuple[str, ...]:
+    """The word list of Faker's lorem provider, which `Faker().word()` uses."""
+    from faker.providers.lorem.en_US import Provider
+
+    return tuple(Provider.word_list)
+
+
+def random_nickname(rng: random.Random, words: tuple[str, ...]) -> str:
+    """A nickname like `word-word-123456`."""
+    return f"{rng.choice(words)}-{rng.choice(words)}-{rng.randint(100000, 999999)}"
@@ -0,0 +1,35 @@
+"""Process pools whose workers can use Django (and its ORM).
+
+Workers are spawned rather than forked: forked workers would share the
+parent's database connections and pool. This module must not import models,
+as spawned workers import it before Django is set up.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _setup_worker(database_name: str) -> None:
+    import django
+    from django.db import connections
+
+    django.setup()
+    # The parent may use another database, e.g. the test database.
+    connections["default"].settings_dict["NAME"] = database_name
+
+
+def django_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """A process pool of `max_workers` workers using the parent's database.
+
+    Example:
+        with django_process_pool(4) as executor:
+            results = list(executor.map(func, jobs))
+    """
+    from django.db import connections
+
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_setup_worker,
+        initargs=(connections["default"].settings_dict["NAME"],),
+    )
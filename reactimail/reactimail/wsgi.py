@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "reactimail.settings")
 
 application = get_wsgi_application()
+
+from reactimail.cache import require_shared_cache  # noqa: E402 (needs the settings)
+
+require_shared_cache()
@@ -1,8 +1,20 @@
-from django.contrib import admin
+from itertools import groupby
+from operator import attrgetter
 
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+
+from message_template.tagging import merge_tags
 from .models import Tag
 
 
+class MergeActionForm(ActionForm):
+    into = forms.CharField(
+        required=False, help_text="The name of the tag to merge the selected into"
+    )
+
+
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
     model = Tag
@@ -11,4 +23,27 @@ class TagAdmin(admin.ModelAdmin):
         "name",
     )
     ordering = ("account", "name")
-    search_fields = ("account", "name")
+    search_fields = ("name", "account__email")
+    action_form = MergeActionForm
+    actions = ["merge"]
+
+    @admin.action(description="Merge the selected tags into the named tag")
+    def merge(self, request, queryset):
+        name = request.POST.get("into", "").strip()
+        merged = updated = 0
+        by_account = groupby(queryset.order_by("account"), attrgetter("account_id"))
+        for account_id, tags in by_account:
+            target = Tag.objects.filter(account_id=account_id, name=name).first()
+            if target is None:
+                self.message_user(
+                    request,
+                    f"Account {account_id} has no tag named {name!r}.",
+                    messages.WARNING,
+                )
+                continue
+            sources = [tag for tag in tags if tag.pk != target.pk]
+            updated += merge_tags(sources, target)
+            merged += len(sources)
+        self.message_user(
+            request, f"Merged {merged} tags, {updated} message templates changed."
+        )
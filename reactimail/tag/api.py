@@ -0,0 +1,92 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import RequestDataTooBig
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import aget_object_or_404
+from django.views import View
+
+from message_template.tagging import merge_tags
+from reactimail.api import JSONDetailMixin, JSONListMixin, parse_ids, read_json
+from reactimail.views import AsyncLoginRequiredMixin
+
+from .models import Tag
+from .views import TagDetailView, TagListView
+
+
+def serialize_tag(tag) -> dict:
+    return {
+        "id": tag.pk,
+        "name": tag.name,
+        "created_at": tag.created_at,
+        "updated_at": tag.updated_at,
+    }
+
+
+class TagListAPIView(JSONListMixin, TagListView):
+    # Cached apart from the HTML pages, which annotate template counts.
+    listing_name = "api_tags"
+
+    def get_queryset(self):
+        # Without template counts, which the ETag of tags doesn't cover.
+        return Tag.objects.filter(account=self.request.user)
+
+    def serialize(self, obj):
+        return serialize_tag(obj)
+
+
+class TagDetailAPIView(JSONDetailMixin, TagDetailView):
+    def serialize(self, obj):
+        return serialize_tag(obj)
+
+
+class TagAutocompleteAPIView(AsyncLoginRequiredMixin, View):
+    """The account's tags starting with `?q=`, `{"results": [{"id", "name"}]}`.
+
+    At most `limit` tags, ordered by name ignoring case.
+    """
+
+    raise_exception = True
+    limit = 20
+
+    async def get(self, request, *args, **kwargs):
+        prefix = request.GET.get("q", "").strip()
+        results = []
+        if prefix:
+            tags = (
+                Tag.objects.filter(account=request.user)
+                .autocomplete(prefix)
+                .values("id", "name")[: self.limit]
+            )
+            results = [tag async for tag in tags]
+        return JsonResponse({"results": results})
+
+
+class TagMergeAPIView(AsyncLoginRequiredMixin, View):
+    """Merge tags into another one: POST `{"tags": [id, ...], "into": id}`.
+
+    The templates of the merged tags get the `into` tag, then the merged tags
+    are deleted. Answers `{"merged": n, "updated": n}`, the numbers of merged
+    tags and changed templates.
+    """
+
+    raise_exception = True
+    http_method_names = ["post"]
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            data = read_json(request)
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object.")
+            source_ids = parse_ids(data.get("tags", []))
+            [target_id] = parse_ids([data.get("into")])
+        except RequestDataTooBig as e:
+            return HttpResponse(str(e), status=413)
+        except ValueError as e:
+            return HttpResponseBadRequest(f"Invalid request: {e}")
+
+        tags = Tag.objects.filter(account=request.user)
+        target = await aget_object_or_404(tags, pk=target_id)
+        sources = [
+            tag async for tag in tags.filter(pk__in=source_ids).exclude(pk=target.pk)
+        ]
+        updated = await sync_to_async(merge_tags)(sources, target)
+        return JsonResponse({"merged": len(sources), "updated": updated})
@@ -0,0 +1,11 @@
+from django.urls import path
+from . import api
+
+app_name = "tag_api"
+
+urlpatterns = [
+    path("", api.TagListAPIView.as_view(), name="list"),
+    path("autocomplete/", api.TagAutocompleteAPIView.as_view(), name="autocomplete"),
+    path("merge/", api.TagMergeAPIView.as_view(), name="merge"),
+    path("<uuid:pk>/", api.TagDetailAPIView.as_view(), name="detail"),
+]
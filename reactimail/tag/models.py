@@ -1,8 +1,37 @@
+from django.contrib.postgres.indexes import OpClass
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Upper
 
 from reactimail.models import BaseModelMixin
 
 
+class TagQuerySet(models.QuerySet):
+    def with_template_counts(self):
+        """Annotate `template_count`, the number of message templates per tag.
+
+        A correlated subquery rather than a join with GROUP BY, so that it is
+        only evaluated for the rows of a page, each with an index-only scan of
+        the tag's rows in the tags table of message templates.
+        """
+        counts = (
+            self.model.message_templates.through.objects.filter(tag_id=OuterRef("pk"))
+            .order_by()
+            .values("tag_id")
+            .annotate(count=Count("*"))
+            .values("count")
+        )
+        return self.annotate(template_count=Coalesce(Subquery(counts), Value(0)))
+
+    def autocomplete(self, prefix: str):
+        """Tags whose name starts with `prefix`, ignoring case.
+
+        Filter by account first: together they are an index range scan of
+        `tag_name_prefix_idx`, already in the returned order.
+        """
+        return self.filter(name__istartswith=prefix).order_by(Upper("name"), "id")
+
+
 class Tag(BaseModelMixin):
     account = models.ForeignKey(
         "account.ReactiMailUser",
@@ -15,8 +44,18 @@ class Tag(BaseModelMixin):
         max_length=200, verbose_name="Tag Name", help_text="The name of the tag"
     )
 
+    objects = TagQuerySet.as_manager()
+
     class Meta:
         unique_together = ["account", "name"]
+        indexes = [
+            # For `autocomplete()`: LIKE 'prefix%' of UPPER(name), by account.
+            models.Index(
+                F("account"),
+                OpClass(Upper("name"), name="text_pattern_ops"),
+                name="tag_name_prefix_idx",
+            ),
+        ]
         ordering = ["name"]
         verbose_name = "Tag"
         verbose_name_plural = "Tags"
@@ -0,0 +1,20 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from reactimail.cache import invalidate_listings
+
+from .models import Tag
+
+
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_tag_listings(sender, instance, **kwargs):
+    invalidate_listings(instance.account_id)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_message_templates_of_tag(sender, instance, **kwargs):
+    # Renaming or deleting a tag changes the message templates that have it.
+    if not kwargs.get("created"):
+        instance.message_templates.update(updated_at=timezone.now())
@@ -0,0 +1,53 @@
+// Adds a search input to the tag selects of `TagAutocompleteWidget`. Typed
+// prefixes are completed from the autocomplete API, and a picked tag is added
+// to the select as a selected option.
+document.addEventListener("DOMContentLoaded", () => {
+  for (const select of document.querySelectorAll("select[data-autocomplete-url]")) {
+    const input = document.createElement("input");
+    const suggestions = document.createElement("datalist");
+    suggestions.id = `${select.id}_suggestions`;
+    input.type = "search";
+    input.placeholder = "Add a tag";
+    input.setAttribute("list", suggestions.id);
+    select.before(input, suggestions);
+
+    let timer;
+    let latest = 0;
+    input.addEventListener("input", () => {
+      clearTimeout(timer);
+      const picked = [...suggestions.options].find((option) => option.value === input.value);
+      if (picked) {
+        const existing = [...select.options].find((option) => option.value === picked.dataset.id);
+        if (existing) {
+          existing.selected = true;
+        } else {
+          select.add(new Option(picked.value, picked.dataset.id, true, true));
+        }
+        input.value = "";
+        suggestions.replaceChildren();
+        return;
+      }
+      const prefix = input.value.trim();
+      if (!prefix) {
+        suggestions.replaceChildren();
+        return;
+      }
+      timer = setTimeout(async () => {
+        const request = ++latest;
+        const url = `${select.dataset.autocompleteUrl}?${new URLSearchParams({ q: prefix })}`;
+        const response = await fetch(url, { headers: { Accept: "application/json" } });
+        if (!response.ok || request !== latest) {
+          return;
+        }
+        const { results } = await response.json();
+        suggestions.replaceChildren(
+          ...results.map(({ id, name }) => {
+            const option = new Option(name);
+            option.dataset.id = id;
+            return option;
+          }),
+        );
+      }, 200);
+    });
+  }
+});
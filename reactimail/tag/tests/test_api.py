@@ -0,0 +1,174 @@
+import pytest
+from django.urls import reverse
+
+from account.tests.factories import AccountFactory
+from message_template.tests.factories import MessageTemplateFactory
+from tag.api import TagAutocompleteAPIView, TagListAPIView
+from .factories import TagFactory
+
+
+@pytest.mark.django_db
+class TestTagListAPI:
+    @pytest.fixture
+    def target(self):
+        return reverse("tag_api:list")
+
+    def test_list(self, target, client):
+        """Should be listed only the account's tags, with validators."""
+        account = AccountFactory()
+        TagFactory(account=account, name="b")
+        TagFactory(account=account, name="a")
+        TagFactory(name="others")
+
+        client.force_login(account)
+        response = client.get(target)
+
+        assert response.status_code == 200
+        assert [tag["name"] for tag in response.json()["results"]] == ["a", "b"]
+        assert response.json()["next_cursor"] is None
+        assert response["ETag"].startswith('"')
+        assert "Last-Modified" in response
+
+    def test_not_modified(self, target, client, django_assert_num_queries):
+        """Should be answered 304 after the aggregate query only."""
+        account = AccountFactory()
+        TagFactory.create_batch(3, account=account)
+
+        client.force_login(account)
+        etag = client.get(target)["ETag"]
+        # The aggregate only: the session and user are cached.
+        with django_assert_num_queries(1):
+            response = client.get(target, headers={"if-none-match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    @pytest.mark.parametrize("change", ["create", "update", "delete"])
+    def test_etag_changes(self, target, client, change):
+        account = AccountFactory()
+        tag = TagFactory(account=account, name="a")
+        TagFactory(account=account, name="b")
+
+        client.force_login(account)
+        etag = client.get(target)["ETag"]
+        if change == "create":
+            TagFactory(account=account)
+        elif change == "update":
+            tag.name = "c"
+            tag.save()
+        else:
+            tag.delete()
+        response = client.get(target, headers={"if-none-match": etag})
+
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_pages(self, target, client, monkeypatch):
+        """Should be paginated by cursor, with an ETag per page."""
+        monkeypatch.setattr(TagListAPIView, "page_size", 2)
+        account = AccountFactory()
+        for name in ("a", "b", "c"):
+            TagFactory(account=account, name=name)
+
+        client.force_login(account)
+        first = client.get(target)
+        second = client.get(target, {"after": first.json()["next_cursor"]})
+
+        assert [tag["name"] for tag in second.json()["results"]] == ["c"]
+        assert second.json()["previous_cursor"] is not None
+        assert first["ETag"] != second["ETag"]
+
+    def test_unauthenticated(self, target, client):
+        """Should be answered 403 instead of a login redirect."""
+        response = client.get(target)
+
+        assert response.status_code == 403
+
+    def test_cached_apart_from_html_list(self, target, client):
+        """Should not serve its page, without template counts, to the HTML list."""
+        account = AccountFactory()
+        tag = TagFactory(account=account, name="a")
+        MessageTemplateFactory(account=account).tags.add(tag)
+
+        client.force_login(account)
+        client.get(target)
+        response = client.get(reverse("tag:list"))
+
+        assert "1 template<" in response.content.decode()
+
+
+@pytest.mark.django_db
+class TestTagDetailAPI:
+    def test_detail(self, client):
+        account = AccountFactory()
+        tag = TagFactory(account=account, name="vip")
+
+        client.force_login(account)
+        response = client.get(reverse("tag_api:detail", args=[tag.pk]))
+
+        assert response.status_code == 200
+        assert response.json()["id"] == str(tag.pk)
+        assert response.json()["name"] == "vip"
+
+    def test_not_modified_since(self, client):
+        account = AccountFactory()
+        tag = TagFactory(account=account)
+
+        client.force_login(account)
+        url = reverse("tag_api:detail", args=[tag.pk])
+        last_modified = client.get(url)["Last-Modified"]
+        response = client.get(url, headers={"if-modified-since": last_modified})
+
+        assert response.status_code == 304
+
+    def test_others_tag(self, client):
+        client.force_login(AccountFactory())
+        response = client.get(reverse("tag_api:detail", args=[TagFactory().pk]))
+
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestTagAutocompleteAPI:
+    @pytest.fixture
+    def target(self):
+        return reverse("tag_api:autocomplete")
+
+    def test_prefix(self, target, client):
+        """Should answer the account's tags starting with the prefix."""
+        account = AccountFactory()
+        for name in ("vip", "Vintage", "new", "avid"):
+            TagFactory(account=account, name=name)
+        TagFactory(name="victory")
+
+        client.force_login(account)
+        response = client.get(target, {"q": "vi"})
+
+        assert [tag["name"] for tag in response.json()["results"]] == [
+            "Vintage",
+            "vip",
+        ]
+
+    def test_limit(self, target, client, monkeypatch):
+        account = AccountFactory()
+        TagFactory.create_batch(3, account=account)
+        monkeypatch.setattr(TagAutocompleteAPIView, "limit", 2)
+
+        client.force_login(account)
+        response = client.get(target, {"q": "tag"})
+
+        assert len(response.json()["results"]) == 2
+
+    def test_empty_prefix(self, target, client):
+        account = AccountFactory()
+        TagFactory(account=account)
+
+        client.force_login(account)
+        response = client.get(target, {"q": " "})
+
+        assert response.json() == {"results": []}
+
+    def test_unauthenticated(self, target, client):
+        response = client.get(target, {"q": "a"})
+
+        assert response.status_code == 403
@@ -1,4 +1,6 @@
 import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
 from django.urls import reverse
 
 from account.tests.factories import AccountFactory
@@ -95,6 +97,70 @@ class TestTagList:
         assert response.status_code == 200
         assert len(response.context["object_list"]) == 5
 
+    def test_paginate_by_cursor(self, target, client):
+        """Should page forward and back through tags ordered by name."""
+        account = AccountFactory()
+        names = sorted(f"tag{n:03}" for n in range(60))
+        for name in names:
+            TagFactory(account=account, name=name)
+
+        client.force_login(account)
+        first = client.get(target)
+        page = first.context["cursor_page"]
+        second = client.get(target, {"after": page.next_cursor})
+        back = client.get(
+            target, {"before": second.context["cursor_page"].previous_cursor}
+        )
+
+        assert [tag.name for tag in first.context["object_list"]] == names[:50]
+        assert [tag.name for tag in second.context["object_list"]] == names[50:]
+        assert not second.context["cursor_page"].has_next
+        assert [tag.name for tag in back.context["object_list"]] == names[:50]
+        assert not back.context["cursor_page"].has_previous
+
+    def test_repeat_load_is_cached(self, target, client, django_assert_num_queries):
+        """Should not query tags again until the account's tags change."""
+        account = AccountFactory()
+        TagFactory.create_batch(5, account=account)
+
+        client.force_login(account)
+        client.get(target)
+        # None: the session and user are cached too.
+        with django_assert_num_queries(0):
+            response = client.get(target)
+        TagFactory(account=account)
+        changed = client.get(target)
+
+        assert len(response.context["object_list"]) == 5
+        assert len(changed.context["object_list"]) == 6
+
+    def test_template_counts(self, target, client):
+        """Should show the number of message templates of each tag."""
+        from message_template.tests.factories import MessageTemplateFactory
+
+        account = AccountFactory()
+        vip = TagFactory(account=account, name="vip")
+        TagFactory(account=account, name="unused")
+        for template in MessageTemplateFactory.create_batch(2, account=account):
+            template.tags.add(vip)
+
+        client.force_login(account)
+        response = client.get(target)
+
+        counts = {
+            tag.name: tag.template_count for tag in response.context["object_list"]
+        }
+        assert counts == {"unused": 0, "vip": 2}
+        assert f"?tag={vip.pk}" in response.content.decode()
+
+    def test_invalid_cursor(self, target, client):
+        account = AccountFactory()
+
+        client.force_login(account)
+        response = client.get(target, {"after": "invalid"})
+
+        assert response.status_code == 404
+
 
 @pytest.mark.django_db
 class TestTagDetail:
@@ -161,6 +227,22 @@ class TestTagUpdate:
         assert response.status_code == 302
         assert tag.name == "Tag Name"
 
+    def test_update_to_existing_name(self, target, client):
+        account = AccountFactory()
+        TagFactory(account=account, name="Existing")
+        tag = TagFactory(account=account, name="Tag Name")
+
+        client.force_login(account)
+        response = client.post(target(tag), {"name": "Existing"})
+
+        tag.refresh_from_db()
+        assert response.status_code == 200
+        assert (
+            "A tag with this name already exists for your account."
+            in response.content.decode()
+        )
+        assert tag.name == "Tag Name"
+
     def test_cannot_update_other_users_tag(self, target, client):
         account = AccountFactory()
         other_account = AccountFactory()
@@ -207,3 +289,38 @@ class TestTagDelete:
 
         assert response.status_code == 404
         assert Tag.objects.filter(id=other_tag.id).exists()
+
+
+@pytest.mark.django_db
+class TestTagAsync:
+    @pytest.mark.parametrize(
+        "view",
+        [
+            "TagCreateView",
+            "TagListView",
+            "TagDetailView",
+            "TagUpdateView",
+            "TagDeleteView",
+        ],
+    )
+    def test_views_are_async(self, view):
+        """Should run natively under ASGI, without a thread per request."""
+        from tag import views
+
+        assert getattr(views, view).view_is_async
+
+    def test_list_under_asgi(self):
+        account = AccountFactory()
+        TagFactory.create_batch(3, account=account)
+        client = AsyncClient()
+
+        async def run():
+            anonymous = await client.get(reverse("tag:list"))
+            await client.aforce_login(account)
+            return anonymous, await client.get(reverse("tag:list"))
+
+        anonymous, response = async_to_sync(run)()
+
+        assert anonymous.status_code == 302
+        assert response.status_code == 200
+        assert len(response.context["object_list"]) == 3
@@ -1,25 +1,26 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
-from django.views.generic import (
-    CreateView,
-    DeleteView,
-    DetailView,
-    ListView,
-    UpdateView,
+
+from reactimail.cache import CachedKeysetPaginationMixin
+from reactimail.views import (
+    AsyncCreateView,
+    AsyncDeleteView,
+    AsyncDetailView,
+    AsyncListView,
+    AsyncUpdateView,
 )
 
 from .forms import TagForm
 from .models import Tag
 
 
-class TagCreateView(LoginRequiredMixin, CreateView):
+class TagCreateView(AsyncCreateView):
     model = Tag
     form_class = TagForm
     template_name = "tag/form.html"
     success_url = reverse_lazy("tag:list")
 
-    def get_form_kwargs(self):
-        kwargs = super().get_form_kwargs()
+    def get_form_kwargs(self, instance):
+        kwargs = super().get_form_kwargs(instance)
         kwargs["account"] = self.request.user  # Pass the account to the form
         return kwargs
 
@@ -28,16 +29,18 @@ class TagCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class TagListView(LoginRequiredMixin, ListView):
+class TagListView(CachedKeysetPaginationMixin, AsyncListView):
     model = Tag
     template_name = "tag/list.html"
+    keyset = ("name", "id")
+    listing_name = "tags"
 
     def get_queryset(self):
         # Filter tags by the logged-in user
-        return Tag.objects.filter(account=self.request.user)
+        return Tag.objects.filter(account=self.request.user).with_template_counts()
 
 
-class TagDetailView(LoginRequiredMixin, DetailView):
+class TagDetailView(AsyncDetailView):
     model = Tag
     template_name = "tag/detail.html"
 
@@ -46,18 +49,23 @@ class TagDetailView(LoginRequiredMixin, DetailView):
         return Tag.objects.filter(account=self.request.user)
 
 
-class TagUpdateView(LoginRequiredMixin, UpdateView):
+class TagUpdateView(AsyncUpdateView):
     model = Tag
     form_class = TagForm
     template_name = "tag/form.html"
     success_url = reverse_lazy("tag:list")
 
+    def get_form_kwargs(self, instance):
+        kwargs = super().get_form_kwargs(instance)
+        kwargs["account"] = self.request.user  # Pass the account to the form
+        return kwargs
+
     def get_queryset(self):
         # Ensure only tags belonging to the user can be edited
         return Tag.objects.filter(account=self.request.user)
 
 
-class TagDeleteView(LoginRequiredMixin, DeleteView):
+class TagDeleteView(AsyncDeleteView):
     model = Tag
     template_name = "tag/confirm_delete.html"
     success_url = reverse_lazy("tag:list")
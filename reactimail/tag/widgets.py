@@ -0,0 +1,18 @@
+from django.forms import SelectMultiple
+from django.urls import reverse
+
+
+class TagAutocompleteWidget(SelectMultiple):
+    """A multi-select of tags, completed from `TagAutocompleteAPIView`.
+
+    Only the options in `choices` are rendered, so set them to the selected
+    tags rather than to every tag of the account.
+    """
+
+    class Media:
+        js = ["tag/autocomplete.js"]
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = reverse("tag_api:autocomplete")
+        return attrs